@@ -0,0 +1,56 @@
+"""Add orders.created_at and daily sales rollup tables
+
+Revision ID: 5c1f0e8b9d2a
+Revises: a27048dbe44e
+Create Date: 2026-10-18 09:12:40.311000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0e8b9d2a'
+down_revision: Union[str, Sequence[str], None] = 'a27048dbe44e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+    op.create_index(op.f('ix_orders_created_at'), 'orders', ['created_at'], unique=False)
+    op.create_table('daily_product_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.DECIMAL(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_table('daily_sales_rep_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sales_rep_id', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.DECIMAL(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['sales_rep_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('day', 'sales_rep_id')
+    )
+    op.create_table('report_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_order_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('report_watermarks')
+    op.drop_table('daily_sales_rep_sales')
+    op.drop_table('daily_product_sales')
+    op.drop_index(op.f('ix_orders_created_at'), table_name='orders')
+    op.drop_column('orders', 'created_at')
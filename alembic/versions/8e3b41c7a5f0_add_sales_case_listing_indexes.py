@@ -0,0 +1,30 @@
+"""Add composite indexes for sales case listing and overdue lookups
+
+Revision ID: 8e3b41c7a5f0
+Revises: 5c1f0e8b9d2a
+Create Date: 2026-10-18 11:02:17.504000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b41c7a5f0'
+down_revision: Union[str, Sequence[str], None] = '5c1f0e8b9d2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sales_cases_rep_status_id', 'sales_cases', ['sales_rep_id', 'status', 'id'], unique=False)
+    op.create_index('ix_sales_cases_status_return_by', 'sales_cases', ['status', 'return_by_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sales_cases_status_return_by', table_name='sales_cases')
+    op.drop_index('ix_sales_cases_rep_status_id', table_name='sales_cases')
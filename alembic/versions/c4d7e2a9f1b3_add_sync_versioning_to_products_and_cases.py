@@ -0,0 +1,34 @@
+"""Add updated_at/version to products and sales cases for delta sync
+
+Revision ID: c4d7e2a9f1b3
+Revises: 8e3b41c7a5f0
+Create Date: 2026-10-18 14:26:41.318000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e2a9f1b3'
+down_revision: Union[str, Sequence[str], None] = '8e3b41c7a5f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('products', 'sales_cases'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_sales_cases_rep_updated_at', 'sales_cases', ['sales_rep_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sales_cases_rep_updated_at', table_name='sales_cases')
+    for table in ('sales_cases', 'products'):
+        op.drop_column(table, 'version')
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,44 @@
+"""Add hot-path indexes for orders, order items, case items and discounts
+
+Revision ID: e7a2c9d4b6f1
+Revises: c4d7e2a9f1b3
+Create Date: 2026-10-18 16:40:52.118000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2c9d4b6f1'
+down_revision: Union[str, Sequence[str], None] = 'c4d7e2a9f1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # sales_cases.sales_rep_id já é coberto pelos índices compostos de 8e3b41c7a5f0/c4d7e2a9f1b3
+    op.create_index('ix_orders_user_id_id', 'orders', ['user_id', 'id'], unique=False)
+    op.create_index('ix_orders_user_status_created_at', 'orders', ['user_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_order_items_order_id_id', 'order_items', ['order_id', 'id'], unique=False)
+    op.create_index('ix_order_items_product_id', 'order_items', ['product_id'], unique=False)
+    op.create_index('ix_sales_case_items_case_id', 'sales_case_items', ['case_id'], unique=False)
+    op.create_index('ix_sales_case_items_product_id_case_id', 'sales_case_items', ['product_id', 'case_id'], unique=False)
+    op.create_index('ix_discounts_product_active_price', 'discounts', ['product_id', 'start_time', 'end_time', 'discount_price'], unique=False)
+    # Redundante: o índice composto acima já lidera com product_id
+    op.drop_index('ix_discounts_product_id', table_name='discounts')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_discounts_product_id', 'discounts', ['product_id'], unique=False)
+    op.drop_index('ix_discounts_product_active_price', table_name='discounts')
+    op.drop_index('ix_sales_case_items_product_id_case_id', table_name='sales_case_items')
+    op.drop_index('ix_sales_case_items_case_id', table_name='sales_case_items')
+    op.drop_index('ix_order_items_product_id', table_name='order_items')
+    op.drop_index('ix_order_items_order_id_id', table_name='order_items')
+    op.drop_index('ix_orders_user_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_user_id_id', table_name='orders')
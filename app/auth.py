@@ -1,13 +1,16 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Callable, List
+import uuid
 # Importar nossos modelos e schemas
 from . import models, schemas, database, crud
 from .models import UserRole
 from .core.config import settings
+from .core.revocation import token_denylist
 
 # --- Configuração do JWT (Token) ---
 # (Em produção, estas chaves DEVEM estar no seu .env!)
@@ -31,29 +34,85 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# --- Dependências (Dependencies) ---
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+def create_user_access_token(user: models.User | schemas.User) -> str:
     """
-    Dependência para validar o token e retornar o usuário atual.
-    Usaremos isso para proteger endpoints.
+    Cria o token de sessão de um utilizador. Além do `sub` (email), leva os
+    claims `uid` e `role`, que permitem autorizar pedidos sem ir ao banco,
+    e `jti`/`iat`, usados na revogação (ver core/revocation.py).
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+    now = datetime.now(timezone.utc)
+    return create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "role": user.role.value,
+            "jti": uuid.uuid4().hex,
+            "iat": int(now.timestamp()),
+        },
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
+
+# --- Dependências (Dependencies) ---
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Valida assinatura, expiração e revogação do token e devolve os seus claims."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    
-    user = crud.get_user_by_email(db, email=token_data.email)
-    
+    if payload.get("sub") is None or token_denylist.is_revoked(payload):
+        raise credentials_exception
+    return payload
+
+def _user_from_claims(payload: dict) -> schemas.User | None:
+    """Snapshot do utilizador montado apenas a partir dos claims (tokens emitidos por create_user_access_token)."""
+    if payload.get("uid") is None or payload.get("role") is None:
+        return None
+    try:
+        return schemas.User(id=payload["uid"], email=payload["sub"], role=UserRole(payload["role"]))
+    except ValueError:
+        return None
+
+async def get_current_user(
+    payload: dict = Depends(get_token_claims),
+    open_session: Callable[[], AsyncSession] = Depends(database.get_async_session_factory),
+) -> schemas.User:
+    """
+    Dependência para validar o token e retornar o usuário atual.
+    Usaremos isso para proteger endpoints.
+
+    Retorna um snapshot (id, email, role) e não o `models.User`. Com
+    `AUTH_TRUST_TOKEN_CLAIMS`, o snapshot vem dos claims assinados do token
+    (nenhuma query nem sessão); caso contrário, ou para tokens antigos sem
+    claims, da cache de autenticação (ver crud_user.user_snapshot_cache),
+    numa sessão assíncrona aberta só nesse caso.
+    Para o `models.User` completo, use `get_current_db_user`.
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        user = _user_from_claims(payload)
+        if user is not None:
+            return user
+
+    async with open_session() as db:
+        user = await db.run_sync(lambda session: crud.user.get_snapshot_by_email(session, email=payload["sub"]))
+
+    if user is None:
+        raise credentials_exception
+    return user
+
+def get_current_db_user(payload: dict = Depends(get_token_claims), db: Session = Depends(database.get_db)) -> models.User:
+    """
+    Como `get_current_user`, mas carrega sempre o `models.User` do banco (para
+    quem precisa da entidade). Usa a sessão síncrona do pedido, para que a
+    entidade possa ser usada pelos endpoints síncronos.
+    """
+    user = crud.user.get_by_email(db, email=payload["sub"])
     if user is None:
         raise credentials_exception
     return user
@@ -62,7 +121,7 @@ async def get_current_admin_user(current_user: schemas.User = Depends(get_curren
     """
     Dependência que REQUER que o usuário atual seja um admin.
     """
-    if not current_user.is_admin:
+    if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="The user does not have administrative privileges"
@@ -74,7 +133,7 @@ def require_role(required_roles: List[UserRole]):
     Uma fábrica de dependências que cria uma dependência que requer que o 
     utilizador tenha um dos 'roles' especificados.
     """
-    def role_checker(current_user: models.User = Depends(get_current_user)):
+    def role_checker(current_user: schemas.User = Depends(get_current_user)):
         if current_user.role not in required_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
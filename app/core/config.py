@@ -10,11 +10,130 @@ class Settings(BaseSettings):
     # O Pydantic automaticamente tentará carregar a variável de ambiente DATABASE_URL.
     # Podemos fornecer um valor padrão para segurança.
     DATABASE_URL: str = "sqlite:///./default.db"
+    # Pool de conexões (ver database.build_engine). Máximo de conexões por
+    # worker = DB_POOL_SIZE + DB_MAX_OVERFLOW; mantenha o total de todos os
+    # workers abaixo do max_connections do servidor.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Segundos à espera de uma conexão livre antes de falhar (TimeoutError)
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # Recicla conexões mais velhas do que isto (evita cortes por firewalls/proxies)
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Testa a conexão no checkout (descarta conexões mortas após reinício do banco)
+    DB_POOL_PRE_PING: bool = True
+    # Perfil SQLite (aplicado a cada nova conexão, ver database.sqlite_pragmas)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    # NORMAL é seguro com WAL (uma queda de energia pode perder só os últimos commits)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KIB: int = 64000
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456
+    # Espera por locks de outros processos antes de "database is locked"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Serializa os caminhos de escrita no processo (o SQLite ignora FOR UPDATE)
+    SQLITE_SERIALIZE_WRITES: bool = True
+    # URL do engine assíncrono; por omissão deriva da DATABASE_URL trocando o
+    # driver (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg).
+    ASYNC_DATABASE_URL: str | None = None
+    # Réplica de leitura opcional: os endpoints GET de listagem/consulta leem
+    # dela (ver database.get_read_db); escritas e checkout ficam no primário.
+    DATABASE_REPLICA_URL: str | None = None
+    # Depois de uma escrita, as leituras do mesmo cliente vão para o primário
+    # durante este tempo (deve cobrir o atraso normal de replicação).
+    READ_YOUR_WRITES_SECONDS: float = 5
+    READ_YOUR_WRITES_MAX_CLIENTS: int = 100000
 
     # --- Configurações de JWT (Autenticação) ---
     SECRET_KEY: str = "super-secret-key-that-should-be-in-env"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Autoriza pedidos a partir dos claims `uid`/`role` do token, sem consultar
+    # o banco. Alterações de role revogam os tokens do utilizador (ver core/revocation.py),
+    # mas essa lista é local a cada processo: com vários workers, um utilizador
+    # removido/despromovido mantém o role antigo até o token expirar. Opt-in.
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    # Threads dedicadas ao bcrypt (login/registo): máximo de hashes em simultâneo
+    # por worker. Idealmente <= número de CPUs disponíveis para o processo.
+    PASSWORD_HASH_POOL_SIZE: int = 4
+    # Custo do bcrypt (2^rounds iterações; cada +1 duplica o tempo por hash).
+    # Hashes com outro custo são refeitos de forma transparente no login.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # Processos usados para os hashes do registo em lote (POST /users/bulk)
+    PASSWORD_BULK_HASH_PROCESSES: int = 4
+    # Máximo de utilizadores por pedido de registo em lote
+    USER_BULK_MAX_SIZE: int = 1000
+    # Mede e regista (log + /admin/metrics) os ms por hash no arranque
+    PASSWORD_HASH_BENCHMARK_ON_STARTUP: bool = True
+
+    # --- Limite de tentativas de login (token bucket, antes do bcrypt) ---
+    LOGIN_THROTTLE_ENABLED: bool = True
+    # Tentativas seguidas permitidas (burst) e ritmo de reposição por minuto
+    LOGIN_THROTTLE_EMAIL_BURST: int = 5
+    LOGIN_THROTTLE_EMAIL_PER_MINUTE: float = 5
+    LOGIN_THROTTLE_IP_BURST: int = 30
+    LOGIN_THROTTLE_IP_PER_MINUTE: float = 30
+    # Máximo de chaves (emails/IPs) guardadas em memória por worker
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    # Com vários workers, partilhe os limites num Redis (requer o pacote `redis`)
+    LOGIN_THROTTLE_REDIS_URL: str | None = None
+
+    # --- Instrumentação de queries por pedido (ver core/query_stats.py) ---
+    QUERY_STATS_ENABLED: bool = True
+    # Orçamento máximo de queries por rota, ex: {"GET /products/": 3}.
+    # Rotas sem entrada usam QUERY_BUDGET_DEFAULT (None = sem limite).
+    QUERY_BUDGETS: dict[str, int] = {}
+    QUERY_BUDGET_DEFAULT: int | None = None
+    # Exceder o orçamento gera erro em vez de aviso (ative nos testes)
+    QUERY_BUDGET_STRICT: bool = False
+    # Repetições do mesmo statement num pedido a partir das quais se avisa de N+1
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # Registo de queries lentas com EXPLAIN (GET /admin/slow-queries). Opt-in.
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    # Entradas guardadas em memória (as mais antigas são descartadas)
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # --- Configurações de Checkout ---
+    # Limite de linhas (produtos distintos) aceite num único pedido.
+    MAX_ORDER_LINES: int = 5000
+    # Tamanho de cada lote processado no checkout (lock, preço e inserção dos itens).
+    CHECKOUT_CHUNK_SIZE: int = 500
+
+    # --- Configurações de Cache ---
+    # Resumo do painel da vendedora (GET /sales-cases/summary)
+    SALES_SUMMARY_CACHE_TTL_SECONDS: int = 30
+    SALES_SUMMARY_CACHE_MAX_SIZE: int = 1000
+    # Utilizador autenticado (email do token -> id, email, role). Alterações ao
+    # utilizador invalidam a entrada; o TTL limita o resto (ex: alterações diretas no banco).
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_USER_CACHE_MAX_SIZE: int = 10000
+
+    # --- Configurações de Sincronização (vendedoras offline) ---
+    # Margem de re-leitura aplicada ao token, para apanhar transações que
+    # fizeram commit depois de a sincronização anterior ter lido os dados.
+    SYNC_OVERLAP_SECONDS: int = 30
+
+    # --- Configurações de Exportação ---
+    # Encomendas lidas por cada transação curta da exportação em streaming.
+    ORDER_EXPORT_WINDOW_SIZE: int = 1000
+    # Linhas buscadas de cada vez do cursor do servidor.
+    ORDER_EXPORT_YIELD_PER: int = 1000
+
+    # --- Configurações de Jobs em Background ---
+    # Desative para correr os jobs num processo dedicado (ou nos testes).
+    SCHEDULER_ENABLED: bool = True
+    REPORTS_ROLLUP_INTERVAL_SECONDS: int = 300
+    # Máximo de encomendas agregadas por transação do job de rollup.
+    REPORTS_ROLLUP_BATCH_SIZE: int = 2000
+    # Encomendas mais recentes do que isto ficam para a próxima execução,
+    # dando tempo às transações de checkout em curso para fazerem commit.
+    REPORTS_ROLLUP_SAFETY_LAG_SECONDS: int = 60
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = 600
+    # Reconciliação de `Product.on_loan_quantity` com os itens dos estojos abertos.
+    # Por omissão o job apenas reporta divergências; a correção é explícita (admin).
+    ON_LOAN_RECONCILE_INTERVAL_SECONDS: int = 3600
+    ON_LOAN_RECONCILE_CHUNK_SIZE: int = 1000
+    ON_LOAN_RECONCILE_AUTO_REPAIR: bool = False
 
         # O nome do arquivo .env a ser procurado
     #env_file = ".env"
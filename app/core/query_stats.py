@@ -0,0 +1,102 @@
+# NOVO ARQUIVO: app/core/query_stats.py
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(RuntimeError): pass
+
+class RequestQueryStats:
+    """Queries executadas durante um pedido: número, tempo total e repetições por statement."""
+    __slots__ = ("count", "total_seconds", "statements", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope # Scope ASGI do pedido (a rota só é conhecida depois do routing)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements idênticos executados `threshold` ou mais vezes (provável N+1)."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+# Estatísticas do pedido em curso (None fora de pedidos: jobs, scripts).
+# O objeto é partilhado (mutável), por isso as queries feitas na threadpool
+# ou no greenlet do run_sync contam para o pedido que as originou.
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        context._query_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+def route_key(scope: dict) -> str:
+    """Identifica a rota pelo método e pelo path "modelo" (ex: "GET /sales-cases/{case_id}")."""
+    route = scope.get("route")
+    return f"{scope.get('method')} {route.path if route is not None else scope.get('path')}"
+
+def current_route() -> Optional[str]:
+    """Rota do pedido em curso, ou None fora de pedidos (jobs, scripts)."""
+    stats = _current_stats.get()
+    if stats is None or stats.scope is None:
+        return None
+    return route_key(stats.scope)
+
+def instrument_engine(db_engine) -> None:
+    """Liga a contagem de queries por pedido a um engine (síncrono ou assíncrono)."""
+    sync_engine = getattr(db_engine, "sync_engine", db_engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+def query_budget_for(route_key: str) -> Optional[int]:
+    """Orçamento de queries da rota ("GET /products/"), ou o orçamento padrão."""
+    return settings.QUERY_BUDGETS.get(route_key, settings.QUERY_BUDGET_DEFAULT)
+
+async def query_stats_middleware(request, call_next):
+    """
+    Middleware HTTP: conta queries e tempo de banco por pedido e devolve-os no
+    header `Server-Timing` (visível nas DevTools do browser). Regista avisos
+    quando a rota excede o seu orçamento ou repete o mesmo statement (N+1);
+    com QUERY_BUDGET_STRICT (testes), exceder o orçamento gera erro.
+    """
+    stats = RequestQueryStats(scope=request.scope)
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    db_ms = stats.total_seconds * 1000
+    response.headers["Server-Timing"] = f'db;dur={db_ms:.1f};desc="{stats.count} queries"'
+
+    key = route_key(request.scope)
+    logger.debug("%s: %d queries, %.1f ms no banco.", key, stats.count, db_ms)
+
+    for statement, count in stats.repeated_statements(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning("Possível N+1 em %s: statement executado %d vezes: %.200s", key, count, statement)
+
+    budget = query_budget_for(key)
+    if budget is not None and stats.count > budget:
+        message = f"{key} executed {stats.count} queries (budget: {budget})."
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
@@ -0,0 +1,162 @@
+# NOVO ARQUIVO: app/core/rate_limit.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Um balde: (chave, capacidade, tokens repostos por segundo)
+Bucket = tuple[str, float, float]
+
+class RateLimitBackend(Protocol):
+    # True se `consume_all` faz I/O bloqueante (deve correr fora do event loop)
+    blocking: bool
+
+    def consume_all(self, buckets: list[Bucket]) -> bool:
+        """
+        Retira um token de cada balde, de forma atómica: se algum estiver
+        vazio, nenhum é consumido e devolve False.
+        """
+        ...
+
+class InMemoryRateLimitBackend:
+    """
+    Baldes de tokens guardados no processo: por chave apenas (tokens, instante).
+    Limitado a `max_keys` (LRU): uma chave descartada volta com o balde cheio,
+    o que só pode favorecer quem está dentro do limite.
+    """
+    blocking = False
+
+    def __init__(self, *, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, *, capacity: float, refill_per_second: float) -> bool:
+        """Retira um token do balde `key`; False se o balde estiver vazio."""
+        return self.consume_all([(key, capacity, refill_per_second)])
+
+    def consume_all(self, buckets: list[Bucket]) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            refilled = {}
+            for key, capacity, refill_per_second in buckets:
+                tokens, updated_at = self._buckets.get(key, (capacity, now))
+                refilled[key] = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            allowed = all(tokens >= 1 for tokens in refilled.values())
+            for key, tokens in refilled.items():
+                self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+class RedisRateLimitBackend:
+    """
+    Baldes partilhados entre workers/instâncias, num Redis. O cálculo é feito
+    num script Lua, de forma atómica. Requer o pacote `redis` (opcional).
+    """
+    blocking = True
+
+    # ARGV: now, depois (capacity, rate) por chave em KEYS
+    _SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local tokens = {}
+    local allowed = 1
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[2 * i])
+        local rate = tonumber(ARGV[2 * i + 1])
+        local data = redis.call('HMGET', key, 'tokens', 'ts')
+        local current = tonumber(data[1]) or capacity
+        local ts = tonumber(data[2]) or now
+        tokens[i] = math.min(capacity, current + math.max(0, now - ts) * rate)
+        if tokens[i] < 1 then
+            allowed = 0
+        end
+    end
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[2 * i])
+        local rate = tonumber(ARGV[2 * i + 1])
+        redis.call('HSET', key, 'tokens', tokens[i] - allowed, 'ts', now)
+        redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+    end
+    return allowed
+    """
+
+    def __init__(self, url: str, *, prefix: str = "login-throttle:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("LOGIN_THROTTLE_REDIS_URL is set but the 'redis' package is not installed.") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(self._SCRIPT)
+
+    def consume_all(self, buckets: list[Bucket]) -> bool:
+        args: list[float] = [time.time()]
+        for _, capacity, refill_per_second in buckets:
+            args += [capacity, refill_per_second]
+        try:
+            return bool(self._consume(keys=[self.prefix + key for key, _, _ in buckets], args=args))
+        except Exception:
+            # Falha do Redis: não bloqueamos logins legítimos por causa do limitador
+            logger.exception("Rate limit backend unavailable; allowing request.")
+            return True
+
+class LoginThrottle:
+    """
+    Limita tentativas de login por email e por IP (token bucket), ANTES do
+    bcrypt: tentativas em excesso são recusadas sem gastar CPU com o hash.
+    """
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self, *, email: str, ip: Optional[str]) -> bool:
+        """
+        Consome um token do balde do email e do IP, só se ambos tiverem
+        tokens: uma tentativa recusada não gasta o balde do outro.
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return True
+        buckets: list[Bucket] = [(
+            f"email:{email.strip().lower()}",
+            settings.LOGIN_THROTTLE_EMAIL_BURST,
+            settings.LOGIN_THROTTLE_EMAIL_PER_MINUTE / 60,
+        )]
+        if ip:
+            buckets.append((f"ip:{ip}", settings.LOGIN_THROTTLE_IP_BURST, settings.LOGIN_THROTTLE_IP_PER_MINUTE / 60))
+        allowed = self.backend.consume_all(buckets)
+        if not allowed:
+            with self._lock:
+                self.rejected += 1
+        return allowed
+
+    async def allow_async(self, *, email: str, ip: Optional[str]) -> bool:
+        """`allow` para endpoints `async def`: backends com I/O (Redis) correm na threadpool."""
+        if self.backend.blocking:
+            return await run_in_threadpool(self.allow, email=email, ip=ip)
+        return self.allow(email=email, ip=ip)
+
+    def stats(self) -> dict:
+        return {"enabled": settings.LOGIN_THROTTLE_ENABLED, "rejected": self.rejected}
+
+def _build_backend() -> RateLimitBackend:
+    if settings.LOGIN_THROTTLE_REDIS_URL:
+        return RedisRateLimitBackend(settings.LOGIN_THROTTLE_REDIS_URL)
+    return InMemoryRateLimitBackend(max_keys=settings.LOGIN_THROTTLE_MAX_KEYS)
+
+# Instância única usada pelo endpoint /token
+login_throttle = LoginThrottle(_build_backend())
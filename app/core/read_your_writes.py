@@ -0,0 +1,35 @@
+# NOVO ARQUIVO: app/core/read_your_writes.py
+
+import hashlib
+
+from starlette.requests import Request
+
+from .cache import TTLCache
+from .config import settings
+
+# Clientes que escreveram há menos de READ_YOUR_WRITES_SECONDS: as suas
+# leituras vão para o primário, para não verem dados anteriores à escrita
+# enquanto a réplica não a recebeu. Local ao processo (como as outras caches).
+recent_writers = TTLCache(
+    ttl_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    max_size=settings.READ_YOUR_WRITES_MAX_CLIENTS,
+)
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def client_key(request: Request) -> str:
+    """Identifica o cliente pelo token (hash, nunca o token em claro) ou, sem token, pelo IP."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "auth:" + hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+def should_read_from_primary(request: Request) -> bool:
+    return recent_writers.get(client_key(request)) is not None
+
+async def track_writes_middleware(request: Request, call_next):
+    """Middleware HTTP: regista os clientes cujos pedidos de escrita tiveram sucesso."""
+    response = await call_next(request)
+    if request.method not in _SAFE_METHODS and response.status_code < 400:
+        recent_writers.set(client_key(request), True)
+    return response
@@ -0,0 +1,63 @@
+# NOVO ARQUIVO: app/core/revocation.py
+
+import threading
+import time
+from typing import Optional
+
+from .config import settings
+
+class TokenDenylist:
+    """
+    Lista de revogação de tokens JWT, em memória e compacta:
+
+    - por token (`jti`), até à expiração do próprio token (ex: logout);
+    - por utilizador, "revogados antes de T": invalida de uma vez todos os
+      tokens emitidos até T (ex: alteração de role, conta comprometida).
+
+    As entradas expiram sozinhas: depois de `max_token_age_seconds` nenhum
+    token abrangido pode continuar válido. A lista é local ao processo; com
+    vários workers, a revogação só vale para o worker que a recebeu.
+    """
+    def __init__(self, *, max_token_age_seconds: float):
+        self.max_token_age_seconds = max_token_age_seconds
+        self._revoked_jtis: dict[str, float] = {} # jti -> exp
+        self._revoked_before: dict[int, float] = {} # user id -> instante da revogação
+        self._lock = threading.Lock()
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._prune(time.time())
+            self._revoked_jtis[jti] = expires_at
+
+    def revoke_user(self, user_id: int, at: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._revoked_before[user_id] = now if at is None else at
+
+    def is_revoked(self, claims: dict) -> bool:
+        """Verifica um token já validado (assinatura e `exp`) pelos seus claims."""
+        with self._lock:
+            jti = claims.get("jti")
+            if jti is not None and jti in self._revoked_jtis:
+                return True
+            revoked_at = self._revoked_before.get(claims.get("uid"))
+            # `iat` é em segundos inteiros: tokens emitidos no mesmo segundo da revogação também caem
+            return revoked_at is not None and claims.get("iat", 0) <= revoked_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked_jtis.clear()
+            self._revoked_before.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"revoked_tokens": len(self._revoked_jtis), "revoked_users": len(self._revoked_before)}
+
+    def _prune(self, now: float) -> None:
+        self._revoked_jtis = {jti: exp for jti, exp in self._revoked_jtis.items() if exp > now}
+        oldest_valid = now - self.max_token_age_seconds
+        self._revoked_before = {uid: at for uid, at in self._revoked_before.items() if at > oldest_valid}
+
+# Instância única, partilhada pela autenticação e pelas operações de utilizador
+token_denylist = TokenDenylist(max_token_age_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
@@ -0,0 +1,101 @@
+# NOVO ARQUIVO: app/core/scheduler.py
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class PeriodicJob:
+    """
+    Um job executado periodicamente numa thread própria.
+    Guarda o estado da última execução para que possa ser consultado
+    por endpoints de administração.
+    """
+    def __init__(self, name: str, func: Callable[[], Any], interval_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.run_count = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_finished_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def run_once(self) -> Any:
+        """Executa o job imediatamente. Execuções concorrentes do mesmo job são ignoradas."""
+        if not self._lock.acquire(blocking=False):
+            logger.info("Job '%s' já está em execução; a ignorar.", self.name)
+            return None
+        try:
+            self.last_started_at = datetime.now(timezone.utc)
+            start = time.perf_counter()
+            try:
+                self.last_result = self.func()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Job '%s' falhou.", self.name)
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+            self.last_finished_at = datetime.now(timezone.utc)
+            self.run_count += 1
+            return self.last_result
+        finally:
+            self._lock.release()
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "run_count": self.run_count,
+            "last_started_at": self.last_started_at,
+            "last_finished_at": self.last_finished_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+class Scheduler:
+    """Agendador mínimo, em processo: uma thread daemon por job registado."""
+    def __init__(self):
+        self._jobs: dict[str, PeriodicJob] = {}
+        self._threads: list[threading.Thread] = []
+        self._stop_event = threading.Event()
+
+    def register(self, name: str, func: Callable[[], Any], interval_seconds: float) -> PeriodicJob:
+        job = PeriodicJob(name, func, interval_seconds)
+        self._jobs[name] = job
+        return job
+
+    def get(self, name: str) -> Optional[PeriodicJob]:
+        return self._jobs.get(name)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for job in self._jobs.values():
+            thread = threading.Thread(target=self._loop, args=(job,), name=f"job-{job.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def status(self) -> list[dict]:
+        return [job.status() for job in self._jobs.values()]
+
+    def _loop(self, job: PeriodicJob) -> None:
+        while not self._stop_event.is_set():
+            job.run_once()
+            self._stop_event.wait(job.interval_seconds)
+
+# Instância única usada pela aplicação
+scheduler = Scheduler()
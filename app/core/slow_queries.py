@@ -0,0 +1,123 @@
+# NOVO ARQUIVO: app/core/slow_queries.py
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from .config import settings
+from .query_stats import current_route
+
+logger = logging.getLogger(__name__)
+
+# Statements para os quais o EXPLAIN (sem ANALYZE) não executa nada
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Listas IN com nº variável de placeholders: (?, ?, ?) / (%(id_1)s, %(id_2)s) -> (...)
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))+\s*\)")
+
+def normalize_sql(statement: str) -> str:
+    """SQL numa só linha e com listas IN colapsadas, para agrupar statements do mesmo formato."""
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+def fingerprint_parameters(parameters) -> str:
+    """Impressão digital curta dos parâmetros: distingue execuções sem guardar os valores (dados pessoais)."""
+    return hashlib.sha256(repr(parameters).encode()).hexdigest()[:12]
+
+_NUMERIC_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+def _to_format_paramstyle(statement: str, parameters) -> tuple[str, tuple]:
+    """
+    Converte um statement do asyncpg ($1, $2...) para o paramstyle do psycopg2
+    (%s), para poder ser explicado pelo engine síncrono do mesmo banco.
+    """
+    values = []
+    def replace(match):
+        values.append(parameters[int(match.group(1)) - 1])
+        return "%s"
+    return _NUMERIC_PLACEHOLDER.sub(replace, statement.replace("%", "%%")), tuple(values)
+
+class SlowQueryLog:
+    """
+    Regista statements mais lentos do que SLOW_QUERY_THRESHOLD_MS num buffer
+    circular (os mais antigos saem primeiro), com a rota que os executou e o
+    plano de execução. O EXPLAIN corre numa thread própria, fora do pedido,
+    numa conexão separada do engine indicado (síncrono).
+    """
+    def __init__(self, *, max_entries: int):
+        self._entries: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def install(self, db_engine, *, explain_engine=None) -> None:
+        """Liga o registo a um engine (síncrono ou assíncrono); `explain_engine` é síncrono e aponta para o mesmo banco."""
+        sync_engine = getattr(db_engine, "sync_engine", db_engine)
+        explain_engine = explain_engine if explain_engine is not None else sync_engine
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_started_at = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started_at = getattr(context, "_slow_query_started_at", None)
+            if started_at is None or not context.execution_options.get("slow_query_log", True):
+                return
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.record(statement, parameters, elapsed_ms, explain_engine=None if executemany else explain_engine)
+
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(self, statement: str, parameters, duration_ms: float, *, explain_engine=None) -> dict:
+        entry = {
+            "recorded_at": datetime.now(timezone.utc),
+            "duration_ms": duration_ms,
+            "statement": normalize_sql(statement),
+            "parameters_fingerprint": fingerprint_parameters(parameters),
+            "route": current_route(),
+            "plan": None,
+            "explain_error": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning(
+            "Query lenta (%.0f ms) em %s: %.300s", duration_ms, entry["route"] or "-", entry["statement"]
+        )
+        if settings.SLOW_QUERY_EXPLAIN and explain_engine is not None and _EXPLAINABLE.match(statement):
+            self._explain_executor.submit(self._explain, entry, explain_engine, statement, parameters)
+        return entry
+
+    @staticmethod
+    def _explain(entry: dict, explain_engine, statement: str, parameters) -> None:
+        prefix = "EXPLAIN QUERY PLAN" if explain_engine.dialect.name == "sqlite" else "EXPLAIN"
+        try:
+            if explain_engine.dialect.paramstyle in ("format", "pyformat") and _NUMERIC_PLACEHOLDER.search(statement):
+                statement, parameters = _to_format_paramstyle(statement, parameters)
+            # slow_query_log=False: o próprio EXPLAIN nunca é registado
+            with explain_engine.connect().execution_options(slow_query_log=False) as conn:
+                rows = conn.exec_driver_sql(f"{prefix} {statement}", parameters).all()
+                conn.rollback()
+            entry["plan"] = [" | ".join(str(value) for value in row) for row in rows]
+        except Exception as e:
+            entry["explain_error"] = str(e)
+
+    def entries(self) -> list[dict]:
+        """Entradas do buffer, da mais recente para a mais antiga."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self) -> None:
+        self._explain_executor.shutdown(wait=False, cancel_futures=True)
+
+# Instância única; só é ligada aos engines com SLOW_QUERY_LOG_ENABLED (ver database.py)
+slow_query_log = SlowQueryLog(max_entries=settings.SLOW_QUERY_BUFFER_SIZE)
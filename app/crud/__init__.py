@@ -2,4 +2,5 @@ from .crud_product import *
 from .crud_user import *
 from .crud_order import *
 from .crud_sales_case import *
-from .crud_discount import *
\ No newline at end of file
+from .crud_discount import *
+from .crud_report import *
@@ -1,8 +1,9 @@
 # NOVO ARQUIVO: app/crud/crud_discount.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, or_
 from datetime import datetime
+from decimal import Decimal
 
 from .base import CRUDBase
 from .. import models, schemas
@@ -27,4 +28,50 @@ class CRUDDiscount(CRUDBase[models.Discount, schemas.DiscountCreate, schemas.Dis
             .first()
         )
 
+    def get_active_prices_for_products(self, db: Session, *, product_ids: list[int]) -> dict[int, Decimal]:
+        """
+        Versão em lote de `get_active_for_product`: uma única query agregada
+        devolve o menor preço promocional ativo de cada produto da lista.
+        Produtos sem desconto ativo não aparecem no dicionário.
+        """
+        if not product_ids:
+            return {}
+        now = datetime.utcnow()
+        rows = (
+            db.query(self.model.product_id, func.min(self.model.discount_price))
+            .filter(
+                and_(
+                    self.model.product_id.in_(product_ids),
+                    self.model.start_time <= now,
+                    self.model.end_time >= now,
+                )
+            )
+            .group_by(self.model.product_id)
+            .all()
+        )
+        return {product_id: price for product_id, price in rows}
+
+    def get_product_ids_with_price_changes(
+        self, db: Session, *, product_ids: list[int], since: datetime, until: datetime
+    ) -> set[int]:
+        """
+        Produtos cujo preço atual mudou entre `since` e `until` porque um
+        desconto começou ou terminou nesse intervalo (sem alterar a linha do produto).
+        """
+        if not product_ids:
+            return set()
+        rows = (
+            db.query(self.model.product_id)
+            .filter(
+                self.model.product_id.in_(product_ids),
+                or_(
+                    and_(self.model.start_time > since, self.model.start_time <= until),
+                    and_(self.model.end_time > since, self.model.end_time <= until),
+                ),
+            )
+            .distinct()
+            .all()
+        )
+        return {product_id for (product_id,) in rows}
+
 discount = CRUDDiscount(models.Discount)
\ No newline at end of file
@@ -1,5 +1,7 @@
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session, joinedload
 from .. import models, schemas
+from datetime import datetime
 from decimal import Decimal
 
 def create_order(db: Session, *, user_id: int, status: str) -> models.Order:
@@ -24,6 +26,18 @@ def create_order_item(db: Session, *, order_id: int, product_id: int, quantity:
     db.add(db_item)
     return db_item
 
+def create_order_items_bulk(db: Session, *, order_id: int, items: list[dict]) -> None:
+    """
+    Insere vários OrderItems com um único INSERT multi-linha. Não faz commit.
+    Cada item é um dict com product_id, quantity e price_at_purchase.
+    """
+    if not items:
+        return
+    db.execute(
+        insert(models.OrderItem),
+        [{"order_id": order_id, **item} for item in items],
+    )
+
 def get_orders_by_customer(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> list[models.Order]:
     """
     Busca o histórico de pedidos de um cliente de forma otimizada.
@@ -56,3 +70,89 @@ def get_orders_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 25
         .limit(limit)
         .all()
     )
+
+
+def get_sales_totals_for_user(db: Session, *, user_id: int, status: str, since: datetime):
+    """Número de encomendas, unidades e valor vendido por um utilizador desde `since` (uma query agregada)."""
+    return (
+        db.query(
+            func.count(func.distinct(models.Order.id)).label("order_count"),
+            func.coalesce(func.sum(models.OrderItem.quantity), 0).label("units"),
+            func.coalesce(func.sum(models.OrderItem.quantity * models.OrderItem.price_at_purchase), 0).label("value"),
+        )
+        .join(models.OrderItem, models.OrderItem.order_id == models.Order.id)
+        .filter(
+            models.Order.user_id == user_id,
+            models.Order.status == status,
+            models.Order.created_at >= since,
+        )
+        .one()
+    )
+
+# --- Exportação em streaming ---
+
+def _export_filters(*, created_from: datetime | None, created_before: datetime | None, status: str | None) -> list:
+    filters = []
+    if created_from is not None:
+        filters.append(models.Order.created_at >= created_from)
+    if created_before is not None:
+        filters.append(models.Order.created_at < created_before)
+    if status is not None:
+        filters.append(models.Order.status == status)
+    return filters
+
+def get_export_window_upper_bound(
+    db: Session,
+    *,
+    after_id: int,
+    limit: int,
+    created_from: datetime | None = None,
+    created_before: datetime | None = None,
+    status: str | None = None,
+) -> int | None:
+    """Maior id da próxima janela de até `limit` encomendas (após `after_id`) que passam nos filtros."""
+    window = (
+        select(models.Order.id)
+        .where(models.Order.id > after_id, *_export_filters(created_from=created_from, created_before=created_before, status=status))
+        .order_by(models.Order.id)
+        .limit(limit)
+        .subquery()
+    )
+    return db.execute(select(func.max(window.c.id))).scalar()
+
+def stream_orders_with_items(
+    db: Session,
+    *,
+    after_id: int,
+    up_to_id: int,
+    yield_per: int,
+    created_from: datetime | None = None,
+    created_before: datetime | None = None,
+    status: str | None = None,
+):
+    """
+    Lê encomendas e itens da janela (after_id, up_to_id] com um único JOIN ordenado,
+    em streaming (cursor do servidor + `yield_per`). Encomendas sem itens
+    aparecem uma vez, com as colunas do item a None.
+    """
+    stmt = (
+        select(
+            models.Order.id.label("order_id"),
+            models.Order.user_id,
+            models.Order.status,
+            models.Order.created_at,
+            models.OrderItem.id.label("item_id"),
+            models.OrderItem.product_id,
+            models.OrderItem.quantity,
+            models.OrderItem.price_at_purchase,
+        )
+        .outerjoin(models.OrderItem, models.OrderItem.order_id == models.Order.id)
+        .where(
+            models.Order.id > after_id,
+            models.Order.id <= up_to_id,
+            *_export_filters(created_from=created_from, created_before=created_before, status=status),
+        )
+        .order_by(models.Order.id, models.OrderItem.id)
+        .execution_options(stream_results=True, yield_per=yield_per)
+    )
+    return db.execute(stmt)
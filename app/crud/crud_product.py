@@ -1,5 +1,7 @@
 # app/crud/crud_product.py
 
+from datetime import datetime
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 from .. import models, schemas
 
@@ -47,4 +49,120 @@ def decrease_stock(db: Session, *, product: models.Product, quantity: int) -> mo
     """Diminui o estoque físico de um produto. Não faz commit."""
     product.stock_quantity -= quantity
     db.add(product)
-    return product
\ No newline at end of file
+    return product
+
+def get_stock_rows_for_update(db: Session, *, product_ids: list[int]):
+    """
+    Busca e "trava" vários produtos numa única query (`IN (...) ORDER BY id FOR UPDATE`).
+    A ordenação por id garante que transações concorrentes adquirem os locks
+    sempre pela mesma ordem, evitando deadlocks.
+    Retorna apenas as colunas necessárias (linhas, não entidades ORM), para que
+    os produtos não fiquem retidos no identity map da sessão.
+    """
+    if not product_ids:
+        return []
+    return (
+        db.query(
+            models.Product.id,
+            models.Product.name,
+            models.Product.selling_price,
+            models.Product.stock_quantity,
+            models.Product.on_loan_quantity,
+        )
+        .filter(models.Product.id.in_(product_ids))
+        .order_by(models.Product.id)
+        .with_for_update()
+        .all()
+    )
+
+def get_product_ids_after(db: Session, *, after_id: int = 0, limit: int = 1000) -> list[int]:
+    """Próximo bloco de ids de produto (paginação por chave, ordenado por id)."""
+    rows = (
+        db.query(models.Product.id)
+        .filter(models.Product.id > after_id)
+        .order_by(models.Product.id)
+        .limit(limit)
+        .all()
+    )
+    return [product_id for (product_id,) in rows]
+
+def get_sync_rows(db: Session, *, product_ids: list[int], changed_since: datetime | None = None):
+    """
+    Colunas de produto necessárias à sincronização das vendedoras.
+    Com `changed_since`, apenas os produtos alterados desde então.
+    """
+    if not product_ids:
+        return []
+    query = db.query(
+        models.Product.id,
+        models.Product.name,
+        models.Product.selling_price,
+        models.Product.image_url,
+        models.Product.version,
+        models.Product.updated_at,
+    ).filter(models.Product.id.in_(product_ids))
+    if changed_since is not None:
+        query = query.filter(models.Product.updated_at >= changed_since)
+    return query.order_by(models.Product.id).all()
+
+def apply_stock_deltas(
+    db: Session,
+    *,
+    stock_deltas: dict[int, int] | None = None,
+    loan_deltas: dict[int, int] | None = None,
+) -> int:
+    """
+    Aplica variações de stock físico e/ou stock em estojos a vários produtos
+    com um único UPDATE set-based (CASE por id). Não faz commit.
+
+    :param stock_deltas: {product_id: variação de stock_quantity}
+    :param loan_deltas: {product_id: variação de on_loan_quantity}
+    :return: número de linhas atualizadas.
+    """
+    stock_deltas = {pid: delta for pid, delta in (stock_deltas or {}).items() if delta}
+    loan_deltas = {pid: delta for pid, delta in (loan_deltas or {}).items() if delta}
+    product_ids = sorted(set(stock_deltas) | set(loan_deltas))
+    if not product_ids:
+        return 0
+
+    values = {}
+    if stock_deltas:
+        values["stock_quantity"] = models.Product.stock_quantity + case(
+            stock_deltas, value=models.Product.id, else_=0
+        )
+    if loan_deltas:
+        values["on_loan_quantity"] = models.Product.on_loan_quantity + case(
+            loan_deltas, value=models.Product.id, else_=0
+        )
+
+    # `updated_at` é atualizado pelo onupdate da coluna; a versão é explícita
+    values["version"] = models.Product.version + 1
+
+    result = db.execute(
+        update(models.Product)
+        .where(models.Product.id.in_(product_ids))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def set_on_loan_quantities(db: Session, *, quantities: dict[int, int]) -> int:
+    """
+    Define valores absolutos de `on_loan_quantity` (ex: correção pela
+    reconciliação) com um único UPDATE por CASE. Não faz commit.
+
+    :param quantities: {product_id: novo on_loan_quantity}
+    :return: número de linhas atualizadas.
+    """
+    if not quantities:
+        return 0
+    result = db.execute(
+        update(models.Product)
+        .where(models.Product.id.in_(sorted(quantities)))
+        .values(
+            on_loan_quantity=case(quantities, value=models.Product.id),
+            version=models.Product.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,169 @@
+# NOVO ARQUIVO: app/crud/crud_report.py
+
+from datetime import date
+from typing import Literal, Optional
+from sqlalchemy import Date, distinct, func, type_coerce
+from sqlalchemy.orm import Session
+
+from .. import models
+
+SALES_ROLLUP_WATERMARK = "sales_daily"
+SALES_REP_ORDER_STATUS = "completed_by_sales_rep"
+
+def _dialect_insert(db: Session, table):
+    """
+    Devolve um INSERT com suporte a `ON CONFLICT` para o dialeto da sessão,
+    ou None se o dialeto não o suportar (ver `upsert_additive`).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+class CRUDReport:
+    # --- Watermark do job incremental ---
+
+    def get_watermark_for_update(self, db: Session, *, name: str = SALES_ROLLUP_WATERMARK) -> models.ReportWatermark:
+        """
+        Busca (ou cria) a marca d'água do rollup, com lock na linha para que
+        dois workers não agreguem o mesmo intervalo de encomendas. Não faz commit.
+        """
+        watermark = (
+            db.query(models.ReportWatermark)
+            .filter(models.ReportWatermark.name == name)
+            .with_for_update()
+            .first()
+        )
+        if watermark is None:
+            watermark = models.ReportWatermark(name=name, last_order_id=0)
+            db.add(watermark)
+            db.flush()
+        return watermark
+
+    def get_watermark(self, db: Session, *, name: str = SALES_ROLLUP_WATERMARK) -> Optional[models.ReportWatermark]:
+        return db.query(models.ReportWatermark).filter(models.ReportWatermark.name == name).first()
+
+    def get_pending_orders(self, db: Session, *, after_id: int, limit: int):
+        """Próximas encomendas (id, created_at) após a marca d'água, por ordem de id."""
+        return (
+            db.query(models.Order.id, models.Order.created_at)
+            .filter(models.Order.id > after_id)
+            .order_by(models.Order.id)
+            .limit(limit)
+            .all()
+        )
+
+    # --- Agregação incremental ---
+
+    def aggregate_product_sales(self, db: Session, *, after_id: int, up_to_id: int):
+        """Unidades e receita por (dia, produto) das encomendas no intervalo (after_id, up_to_id]."""
+        day = type_coerce(func.date(models.Order.created_at), Date).label("day")
+        return (
+            db.query(
+                day,
+                models.OrderItem.product_id,
+                func.sum(models.OrderItem.quantity).label("units_sold"),
+                func.sum(models.OrderItem.quantity * models.OrderItem.price_at_purchase).label("revenue"),
+            )
+            .join(models.OrderItem, models.OrderItem.order_id == models.Order.id)
+            .filter(models.Order.id > after_id, models.Order.id <= up_to_id)
+            .group_by(day, models.OrderItem.product_id)
+            .all()
+        )
+
+    def aggregate_sales_rep_sales(self, db: Session, *, after_id: int, up_to_id: int):
+        """Encomendas, unidades e receita por (dia, vendedora) geradas por devoluções de estojos."""
+        day = type_coerce(func.date(models.Order.created_at), Date).label("day")
+        return (
+            db.query(
+                day,
+                models.Order.user_id.label("sales_rep_id"),
+                func.count(distinct(models.Order.id)).label("order_count"),
+                func.sum(models.OrderItem.quantity).label("units_sold"),
+                func.sum(models.OrderItem.quantity * models.OrderItem.price_at_purchase).label("revenue"),
+            )
+            .join(models.OrderItem, models.OrderItem.order_id == models.Order.id)
+            .filter(
+                models.Order.id > after_id,
+                models.Order.id <= up_to_id,
+                models.Order.status == SALES_REP_ORDER_STATUS,
+            )
+            .group_by(day, models.Order.user_id)
+            .all()
+        )
+
+    def upsert_additive(self, db: Session, *, model, key_columns: list[str], rows: list[dict]) -> None:
+        """
+        Soma as métricas de `rows` às linhas existentes do rollup
+        (`INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col`). Não faz commit.
+        """
+        if not rows:
+            return
+        table = model.__table__
+        metric_columns = [name for name in rows[0] if name not in key_columns]
+        stmt = _dialect_insert(db, table)
+        if stmt is None:
+            self._upsert_additive_by_select(db, model=model, key_columns=key_columns, metric_columns=metric_columns, rows=rows)
+            return
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={name: table.c[name] + stmt.excluded[name] for name in metric_columns},
+        )
+        db.execute(stmt, rows)
+
+    def _upsert_additive_by_select(
+        self, db: Session, *, model, key_columns: list[str], metric_columns: list[str], rows: list[dict]
+    ) -> None:
+        """
+        Alternativa a `ON CONFLICT` para outros dialetos: lê as linhas
+        existentes e soma no ORM. Seguro porque o job corre com a marca
+        d'água travada (um único escritor). Não faz commit.
+        """
+        for row in rows:
+            existing = db.get(model, {name: row[name] for name in key_columns})
+            if existing is None:
+                db.add(model(**row))
+                continue
+            for name in metric_columns:
+                setattr(existing, name, getattr(existing, name) + row[name])
+        db.flush()
+
+    # --- Leitura dos relatórios ---
+
+    def get_sales_report(
+        self,
+        db: Session,
+        *,
+        date_from: date,
+        date_to: date,
+        group_by: Literal["day", "product", "sales_rep"],
+    ) -> list[dict]:
+        """Lê apenas linhas pré-agregadas dos rollups diários, no intervalo [date_from, date_to]."""
+        if group_by == "sales_rep":
+            model = models.DailySalesRepSales
+            key = model.sales_rep_id
+            extra = [func.sum(model.order_count).label("order_count")]
+        else:
+            model = models.DailyProductSales
+            key = model.day if group_by == "day" else model.product_id
+            extra = []
+
+        query = (
+            db.query(
+                key,
+                func.sum(model.units_sold).label("units_sold"),
+                func.sum(model.revenue).label("revenue"),
+                *extra,
+            )
+            .filter(model.day >= date_from, model.day <= date_to)
+            .group_by(key)
+        )
+        query = query.order_by(key) if group_by == "day" else query.order_by(func.sum(model.revenue).desc())
+        return [row._asdict() for row in query.all()]
+
+# Instância única para ser importada
+report = CRUDReport()
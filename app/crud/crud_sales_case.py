@@ -1,24 +1,27 @@
 # NOVO ARQUIVO: app/crud/crud_sales_case.py
 
+from datetime import datetime
 from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import distinct, func, insert, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from .. import models
-from ..models import SalesCaseStatus, User
+from .. import models, schemas
+from ..models import SalesCaseStatus
+
+# Estojos que ainda estão com a vendedora (as peças continuam emprestadas)
+OPEN_CASE_STATUSES = (SalesCaseStatus.ON_LOAN, SalesCaseStatus.OVERDUE)
 
 class CRUDSalesCase:
     def get(self, db: Session, *, case_id: int) -> Optional[models.SalesCase]:
         """
-        Busca um único estojo pelo seu ID, carregando de forma otimizada
-        os itens e os detalhes dos produtos associados.
+        Busca um único estojo pelo seu ID, carregando os itens na mesma query.
+        Os produtos não são carregados: a devolução lê-os travados
+        (get_stock_rows_for_update) e o detalhe só expõe product_id.
         """
         return (
             db.query(models.SalesCase)
             .filter(models.SalesCase.id == case_id)
-            .options(
-                joinedload(models.SalesCase.items)
-                .joinedload(models.SalesCaseItem.product)
-            )
+            .options(joinedload(models.SalesCase.items))
             .first()
         )
 
@@ -26,15 +29,92 @@ class CRUDSalesCase:
         self,
         db: Session,
         *,
-        current_user: User,
+        current_user: schemas.User,
         status: Optional[SalesCaseStatus] = None,
-        sales_rep_id: Optional[int] = None
+        sales_rep_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = 50
     ) -> List[models.SalesCase]:
         """
-        Constrói a query base para buscar estojos com filtros.
+        Busca uma página de estojos com filtros, do mais recente para o mais antigo.
         A lógica de autorização (qual usuário pode ver o quê) é aplicada aqui.
+
+        A paginação é por keyset: `before_id` é o id do último estojo da página
+        anterior. Os itens são carregados com `selectinload` (uma query extra
+        para a página inteira, em vez de uma por estojo).
         """
-        query = db.query(models.SalesCase).order_by(models.SalesCase.id.desc())
+        query = self._filtered_query(db, current_user=current_user, status=status, sales_rep_id=sales_rep_id)
+        if before_id is not None:
+            query = query.filter(models.SalesCase.id < before_id)
+
+        return (
+            query.options(selectinload(models.SalesCase.items))
+            .order_by(models.SalesCase.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_multi_summary_for_user(
+        self,
+        db: Session,
+        *,
+        current_user: schemas.User,
+        status: Optional[SalesCaseStatus] = None,
+        sales_rep_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = 50
+    ):
+        """
+        Projeção leve para ecrãs de listagem: mesmas regras e paginação de
+        `get_multi_for_user`, mas sem carregar entidades SalesCaseItem.
+        `item_count` e `total_pieces` vêm de uma subquery agrupada restrita
+        aos estojos da página, tudo numa única query.
+        """
+        page_query = self._filtered_query(
+            db, current_user=current_user, status=status, sales_rep_id=sales_rep_id
+        ).with_entities(
+            models.SalesCase.id,
+            models.SalesCase.sales_rep_id,
+            models.SalesCase.loan_date,
+            models.SalesCase.return_by_date,
+            models.SalesCase.status,
+        )
+        if before_id is not None:
+            page_query = page_query.filter(models.SalesCase.id < before_id)
+        page = page_query.order_by(models.SalesCase.id.desc()).limit(limit).subquery()
+
+        item_totals = (
+            db.query(
+                models.SalesCaseItem.case_id,
+                func.count(models.SalesCaseItem.id).label("item_count"),
+                func.sum(models.SalesCaseItem.quantity).label("total_pieces"),
+            )
+            .filter(models.SalesCaseItem.case_id.in_(select(page.c.id)))
+            .group_by(models.SalesCaseItem.case_id)
+            .subquery()
+        )
+
+        return (
+            db.query(
+                page,
+                func.coalesce(item_totals.c.item_count, 0).label("item_count"),
+                func.coalesce(item_totals.c.total_pieces, 0).label("total_pieces"),
+            )
+            .outerjoin(item_totals, item_totals.c.case_id == page.c.id)
+            .order_by(page.c.id.desc())
+            .all()
+        )
+
+    def _filtered_query(
+        self,
+        db: Session,
+        *,
+        current_user: schemas.User,
+        status: Optional[SalesCaseStatus] = None,
+        sales_rep_id: Optional[int] = None
+    ):
+        """Query base de estojos com os filtros de segurança e de status aplicados."""
+        query = db.query(models.SalesCase)
 
         # --- Lógica de Segurança e Filtragem ---
         if current_user.role == models.UserRole.SALES_REP:
@@ -46,8 +126,77 @@ class CRUDSalesCase:
 
         if status:
             query = query.filter(models.SalesCase.status == status)
-        
-        return query.all()
+
+        return query
+
+    def get_open_cases_summary(self, db: Session, *, sales_rep_id: int):
+        """
+        Agrega, numa única query GROUP BY, os estojos abertos de uma vendedora:
+        por status, número de estojos, peças emprestadas e o seu valor de venda.
+        """
+        return (
+            db.query(
+                models.SalesCase.status,
+                func.count(distinct(models.SalesCase.id)).label("case_count"),
+                func.coalesce(func.sum(models.SalesCaseItem.quantity), 0).label("pieces"),
+                func.coalesce(
+                    func.sum(models.SalesCaseItem.quantity * models.Product.selling_price), 0
+                ).label("value"),
+            )
+            .outerjoin(models.SalesCaseItem, models.SalesCaseItem.case_id == models.SalesCase.id)
+            .outerjoin(models.Product, models.Product.id == models.SalesCaseItem.product_id)
+            .filter(
+                models.SalesCase.sales_rep_id == sales_rep_id,
+                models.SalesCase.status.in_(OPEN_CASE_STATUSES),
+            )
+            .group_by(models.SalesCase.status)
+            .all()
+        )
+
+    def get_changed_for_rep(self, db: Session, *, sales_rep_id: int, since: Optional[datetime]) -> List[models.SalesCase]:
+        """
+        Estojos da vendedora alterados desde `since` (qualquer status, para que
+        devoluções e atrasos também sincronizem), com os itens via `selectinload`.
+        Sem `since` (primeira sincronização), devolve os estojos abertos.
+        """
+        query = db.query(models.SalesCase).filter(models.SalesCase.sales_rep_id == sales_rep_id)
+        if since is None:
+            query = query.filter(models.SalesCase.status.in_(OPEN_CASE_STATUSES))
+        else:
+            query = query.filter(models.SalesCase.updated_at >= since)
+        return query.options(selectinload(models.SalesCase.items)).order_by(models.SalesCase.id).all()
+
+    def get_open_product_ids_for_rep(self, db: Session, *, sales_rep_id: int) -> set[int]:
+        """Ids distintos dos produtos presentes nos estojos abertos da vendedora."""
+        rows = (
+            db.query(distinct(models.SalesCaseItem.product_id))
+            .join(models.SalesCase, models.SalesCase.id == models.SalesCaseItem.case_id)
+            .filter(
+                models.SalesCase.sales_rep_id == sales_rep_id,
+                models.SalesCase.status.in_(OPEN_CASE_STATUSES),
+            )
+            .all()
+        )
+        return {product_id for (product_id,) in rows}
+
+    def get_on_loan_totals(self, db: Session, *, product_ids: List[int]) -> dict[int, int]:
+        """
+        Quantidade real em estojos abertos por produto (soma dos itens),
+        numa única query agrupada. Produtos sem itens abertos não aparecem.
+        """
+        if not product_ids:
+            return {}
+        rows = (
+            db.query(models.SalesCaseItem.product_id, func.sum(models.SalesCaseItem.quantity))
+            .join(models.SalesCase, models.SalesCase.id == models.SalesCaseItem.case_id)
+            .filter(
+                models.SalesCaseItem.product_id.in_(product_ids),
+                models.SalesCase.status.in_(OPEN_CASE_STATUSES),
+            )
+            .group_by(models.SalesCaseItem.product_id)
+            .all()
+        )
+        return {product_id: int(total) for product_id, total in rows}
 
     def create_case(self, db: Session, *, sales_rep_id: int, return_by_date) -> models.SalesCase:
         """Cria APENAS o registro principal do SalesCase. Não faz commit."""
@@ -70,11 +219,87 @@ class CRUDSalesCase:
         db.add(db_item)
         return db_item
 
+    def create_cases_bulk(self, db: Session, *, cases: list[dict]) -> list[int]:
+        """
+        Cria vários estojos (dicts com sales_rep_id e return_by_date) com
+        INSERTs multi-linha, devolvendo os ids pela ordem recebida (para
+        inserir os itens). No SQLite, que não garante a ordem do RETURNING,
+        o SQLAlchemy envia um INSERT por linha. Não faz commit.
+        """
+        if not cases:
+            return []
+        result = db.execute(
+            insert(models.SalesCase).returning(models.SalesCase.id, sort_by_parameter_order=True),
+            [{"status": SalesCaseStatus.ON_LOAN, **case} for case in cases],
+        )
+        return list(result.scalars())
+
+    def create_items_bulk(self, db: Session, *, case_id: int, quantities: dict[int, int]) -> None:
+        """Cria todos os itens de um estojo com um único INSERT multi-linha. Não faz commit."""
+        self.create_items_bulk_for_cases(db, quantities_by_case={case_id: quantities})
+
+    def create_items_bulk_for_cases(self, db: Session, *, quantities_by_case: dict[int, dict[int, int]]) -> None:
+        """Cria os itens de vários estojos ({case_id: {product_id: quantidade}}) com um único INSERT. Não faz commit."""
+        rows = [
+            {"case_id": case_id, "product_id": product_id, "quantity": quantity}
+            for case_id, quantities in quantities_by_case.items()
+            for product_id, quantity in quantities.items()
+        ]
+        if rows:
+            db.execute(insert(models.SalesCaseItem), rows)
+
+    def get_many(self, db: Session, *, case_ids: list[int]) -> List[models.SalesCase]:
+        """Busca vários estojos por id, com os itens carregados via `selectinload`."""
+        if not case_ids:
+            return []
+        return (
+            db.query(models.SalesCase)
+            .filter(models.SalesCase.id.in_(case_ids))
+            .options(selectinload(models.SalesCase.items))
+            .order_by(models.SalesCase.id)
+            .all()
+        )
+
     def update_status(self, db: Session, *, db_case: models.SalesCase, status: SalesCaseStatus) -> models.SalesCase:
         """Atualiza o status de um estojo. Não faz commit."""
         db_case.status = status
         db.add(db_case)
         return db_case
 
+    def mark_returned(self, db: Session, *, case_id: int) -> bool:
+        """
+        Marca o estojo como devolvido apenas se ainda estiver emprestado ou em
+        atraso (UPDATE condicional). Devolve False se outra transação já o devolveu.
+        Não faz commit.
+        """
+        result = db.execute(
+            update(models.SalesCase)
+            .where(
+                models.SalesCase.id == case_id,
+                models.SalesCase.status.in_(OPEN_CASE_STATUSES),
+            )
+            .values(status=SalesCaseStatus.RETURNED, version=models.SalesCase.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def mark_overdue(self, db: Session, *, now: datetime) -> int:
+        """
+        Passa a OVERDUE todos os estojos ON_LOAN cujo prazo já terminou, com um
+        único UPDATE (servido pelo índice (status, return_by_date)). Não faz commit.
+
+        :return: número de estojos afetados.
+        """
+        result = db.execute(
+            update(models.SalesCase)
+            .where(
+                models.SalesCase.status == SalesCaseStatus.ON_LOAN,
+                models.SalesCase.return_by_date < now,
+            )
+            .values(status=SalesCaseStatus.OVERDUE, version=models.SalesCase.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
 # Instância única para ser importada
 sales_case = CRUDSalesCase()
\ No newline at end of file
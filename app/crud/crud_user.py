@@ -1,18 +1,73 @@
 # ARQUIVO ATUALIZADO: app/crud/crud_user.py
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Any, Dict, Optional, Union
 
 from .base import CRUDBase
-from ..models import User
+from .. import schemas
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.revocation import token_denylist
+from ..models import User, UserRole
 from ..schemas import UserCreate, ProductUpdate # Usando um schema genérico para update por enquanto
 from ..security import get_password_hash
 
+# Snapshots (id, email, role) usados na autenticação de cada pedido, por email
+user_snapshot_cache = TTLCache(
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_USER_CACHE_MAX_SIZE,
+)
+
 class CRUDUser(CRUDBase[User, UserCreate, ProductUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """Busca um usuário pelo seu email, que é um campo único."""
         return db.query(User).filter(User.email == email).first()
 
+    def get_snapshot_by_email(self, db: Session, *, email: str) -> Optional[schemas.User]:
+        """
+        Versão "leve" de `get_by_email` para a autenticação: devolve apenas
+        id, email e role, servidos da cache quando possível. Emails sem
+        utilizador não são guardados (um registo novo fica logo visível).
+        """
+        snapshot = user_snapshot_cache.get(email)
+        if snapshot is not None:
+            return snapshot
+        row = db.query(User.id, User.email, User.role).filter(User.email == email).first()
+        if row is None:
+            return None
+        snapshot = schemas.User.model_validate(row)
+        user_snapshot_cache.set(email, snapshot)
+        return snapshot
+
+    def get_existing_emails(self, db: Session, *, emails: list[str]) -> set[str]:
+        """Dos emails indicados, devolve os que já estão registados (uma única query IN)."""
+        if not emails:
+            return set()
+        rows = db.query(User.email).filter(User.email.in_(emails)).all()
+        return {row.email for row in rows}
+
+    def create_bulk(self, db: Session, *, rows: list[dict]):
+        """
+        Insere vários utilizadores (dicts com email, hashed_password e role)
+        com INSERTs multi-linha, devolvendo id, email e role de cada um pela
+        ordem recebida. Não faz commit.
+        """
+        if not rows:
+            return []
+        result = db.execute(
+            insert(User).returning(User.id, User.email, User.role, sort_by_parameter_order=True),
+            rows,
+        )
+        return result.all()
+
+    def get_ids_with_role(self, db: Session, *, ids: list[int], role: UserRole) -> set[int]:
+        """Dos ids indicados, devolve os que existem e têm o 'role' pedido (uma única query IN)."""
+        if not ids:
+            return set()
+        rows = db.query(User.id).filter(User.id.in_(ids), User.role == role).all()
+        return {row.id for row in rows}
+
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         """
         Sobrescreve o método 'create' para lidar com o hashing da senha
@@ -33,6 +88,34 @@ class CRUDUser(CRUDBase[User, UserCreate, ProductUpdate]):
         db.refresh(db_obj)
         return db_obj
 
+    def set_password_hash(self, db: Session, *, user_id: int, hashed_password: str) -> None:
+        """Substitui o hash da senha (ex: rehash com novo custo no login). Faz commit."""
+        db.query(User).filter(User.id == user_id).update(
+            {User.hashed_password: hashed_password}, synchronize_session=False
+        )
+        db.commit()
+
+    def update(self, db: Session, *, db_obj: User, obj_in: Union[ProductUpdate, Dict[str, Any]]) -> User:
+        """
+        Atualiza o utilizador e invalida o snapshot em cache (email antigo e novo).
+        Se o email ou o role mudarem, os tokens já emitidos (cujos claims
+        ficaram desatualizados) são revogados.
+        """
+        old_email, old_role = db_obj.email, db_obj.role
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        user_snapshot_cache.invalidate(old_email)
+        user_snapshot_cache.invalidate(db_obj.email)
+        if (db_obj.email, db_obj.role) != (old_email, old_role):
+            token_denylist.revoke_user(db_obj.id)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> User:
+        """Remove o utilizador, o seu snapshot em cache e os seus tokens."""
+        obj = super().remove(db, id=id)
+        user_snapshot_cache.invalidate(obj.email)
+        token_denylist.revoke_user(id)
+        return obj
+
 # Cria uma instância única que será usada em toda a aplicação.
 # Isso nos permite importar 'user' diretamente, em vez da classe 'CRUDUser'.
 user = CRUDUser(User)
\ No newline at end of file
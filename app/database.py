@@ -1,21 +1,211 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from contextlib import ContextDecorator
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool, StaticPool
 #from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker,declarative_base 
+from sqlalchemy.orm import Session, sessionmaker,declarative_base 
+from starlette.requests import Request
 from dotenv import load_dotenv
 from app.core.config import settings
+from app.core.query_stats import instrument_engine
+from app.core.read_your_writes import should_read_from_primary
+from app.core.slow_queries import slow_query_log
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 # Pega a URL do banco de dados do ambiente
 #DATABASE_URL = os.getenv("DATABASE_URL")
 
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mede quanto tempo cada checkout espera por uma conexão
+    livre e quantos checkouts terminam em timeout (pool esgotada).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+def sqlite_pragmas(*, in_memory: bool = False) -> list[str]:
+    """PRAGMAs do perfil SQLite (SQLITE_* em `Settings`), executados em cada nova conexão."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        # Valor negativo = tamanho em KiB (e não em páginas)
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KIB}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if not in_memory:
+        # WAL: leitores não bloqueiam o escritor nem são bloqueados por ele
+        pragmas.append(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE_BYTES}")
+    return pragmas
+
+def apply_sqlite_profile(sqlite_engine):
+    """Regista os PRAGMAs do perfil SQLite no evento `connect` do engine (síncrono ou assíncrono)."""
+    sync_engine = getattr(sqlite_engine, "sync_engine", sqlite_engine)
+    pragmas = sqlite_pragmas(in_memory=sync_engine.url.database in (None, "", ":memory:"))
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return sqlite_engine
+
+class SerializedWrites(ContextDecorator):
+    """
+    Serializa, dentro do processo, os caminhos transacionais de escrita
+    (checkout, estojos, jobs) quando o banco é SQLite.
+
+    O SQLite ignora `FOR UPDATE` e só admite um escritor de cada vez: duas
+    transações que leem e depois escrevem acabam em "database is locked".
+    Com o lock, esperam a sua vez; entre processos, vale o `busy_timeout`.
+    Noutros bancos (ou com SQLITE_SERIALIZE_WRITES=False) não faz nada.
+    Reentrante, para que serviços possam chamar outros serviços.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._acquired = threading.local() # Pilha, por thread, de "este __enter__ adquiriu o lock?"
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SQLITE_SERIALIZE_WRITES and engine.dialect.name == "sqlite"
+
+    def __enter__(self):
+        stack = self._acquired.__dict__.setdefault("stack", [])
+        acquired = self.enabled
+        if acquired:
+            self._lock.acquire()
+        stack.append(acquired)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._acquired.stack.pop():
+            self._lock.release()
+        return False
+
+def build_engine(database_url: str) -> Engine:
+    """
+    Cria o engine com a pool configurada em `Settings` (DB_POOL_*).
+
+    SQLite não tem servidor nem limite de conexões: em memória usa uma única
+    conexão partilhada (StaticPool), senão os dados desapareceriam entre
+    checkouts; em ficheiro, a pool normal, sem pre-ping nem recycle (inúteis
+    localmente). Em ambos os casos a conexão pode mudar de thread (FastAPI
+    executa endpoints síncronos na threadpool).
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        connect_args = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return apply_sqlite_profile(create_engine(url, connect_args=connect_args, poolclass=StaticPool))
+        return apply_sqlite_profile(create_engine(
+            url,
+            connect_args=connect_args,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        ))
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+def get_pool_stats(engine: Engine) -> dict:
+    """Estado atual da pool do engine (conexões em uso, overflow, espera por conexão)."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool_class": type(pool).__name__}
+    stats = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update(
+                checkouts=pool.checkouts,
+                timeouts=pool.timeouts,
+                avg_wait_ms=pool.total_wait_seconds * 1000 / pool.checkouts if pool.checkouts else 0.0,
+                max_wait_ms=pool.max_wait_seconds * 1000,
+            )
+    return stats
+
+class RoutingSession(Session):
+    """
+    Sessão que envia as queries para a réplica de leitura quando
+    `info["replica_bind"]` está definido (ver get_read_db). Flushes vão
+    sempre para o primário; sem `replica_bind`, comporta-se como uma
+    sessão normal ligada ao primário.
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica_bind = self.info.get("replica_bind")
+        if replica_bind is not None and not self._flushing:
+            return replica_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+def _read_session_info(request: Request, replica_bind) -> dict:
+    """Réplica, exceto se não houver réplica ou se o cliente escreveu há pouco (read-your-writes)."""
+    if replica_bind is None or should_read_from_primary(request):
+        return {}
+    return {"replica_bind": replica_bind}
+
 # Cria o "motor" (engine) do SQLAlchemy
 #engine = create_engine(DATABASE_URL)
-engine = create_engine(settings.DATABASE_URL)
+engine = build_engine(settings.DATABASE_URL)
+# Lock de escrita para SQLite (ver SerializedWrites); use como decorador/`with`
+serialized_writes = SerializedWrites()
+# Réplica de leitura opcional (ver get_read_db)
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+# Contagem de queries por pedido (Server-Timing, orçamentos, N+1)
+if settings.QUERY_STATS_ENABLED:
+    for _app_engine in (engine, replica_engine):
+        if _app_engine is not None:
+            instrument_engine(_app_engine)
+# Registo de queries lentas (opt-in); o EXPLAIN usa o próprio engine
+if settings.SLOW_QUERY_LOG_ENABLED:
+    for _app_engine in (engine, replica_engine):
+        if _app_engine is not None:
+            slow_query_log.install(_app_engine)
 # Cria uma "fábrica" de sessões (SessionLocal)
 # Esta sessão será usada em cada pedido (request) à API
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
     db = SessionLocal()
@@ -23,5 +213,113 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    """
+    Sessão para endpoints só de leitura (GET): usa a réplica, quando
+    configurada. Nunca use para escritas nem para leituras com lock.
+    """
+    db = SessionLocal(info=_read_session_info(request, replica_engine))
+    try:
+        yield db
+    finally:
+        db.close()
+# --- Engine assíncrono (endpoints `async def`) ---
+# Driver assíncrono por backend: aiosqlite localmente, asyncpg em produção.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+def to_async_url(database_url: str) -> URL:
+    """Converte a DATABASE_URL (síncrona) na URL equivalente com driver assíncrono."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'.")
+    return url.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+
+def build_async_engine(database_url: str) -> AsyncEngine:
+    """Como `build_engine`, mas para o engine assíncrono (mesmos parâmetros DB_POOL_*)."""
+    url = to_async_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return apply_sqlite_profile(create_async_engine(url, poolclass=StaticPool))
+        return apply_sqlite_profile(create_async_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        ))
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+# Criado no primeiro uso: processos que só usam o caminho síncrono (jobs,
+# scripts, alembic) não precisam do driver assíncrono instalado.
+_async_engine: AsyncEngine | None = None
+_async_replica_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+_async_engine_lock = threading.Lock()
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_replica_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                if settings.DATABASE_REPLICA_URL:
+                    _async_replica_engine = build_async_engine(settings.DATABASE_REPLICA_URL)
+                _async_engine = build_async_engine(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+                if settings.QUERY_STATS_ENABLED:
+                    for _app_engine in (_async_engine, _async_replica_engine):
+                        if _app_engine is not None:
+                            instrument_engine(_app_engine)
+                # O EXPLAIN das queries assíncronas corre no engine síncrono do mesmo banco
+                if settings.SLOW_QUERY_LOG_ENABLED:
+                    slow_query_log.install(_async_engine, explain_engine=engine)
+                    if _async_replica_engine is not None:
+                        slow_query_log.install(_async_replica_engine, explain_engine=replica_engine)
+                # expire_on_commit=False: os objetos continuam legíveis depois do commit sem novo I/O
+                _async_session_factory = async_sessionmaker(
+                    _async_engine, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+                )
+    return _async_engine
+
+def open_async_session() -> AsyncSession:
+    """Nova sessão assíncrona no primário (use com `async with`)."""
+    get_async_engine()
+    return _async_session_factory()
+
+def get_async_session_factory():
+    """
+    Dependência para quem só às vezes precisa do banco: devolve a fábrica de
+    sessões sem abrir nenhuma (nem criar o engine assíncrono) até ser chamada.
+    """
+    return open_async_session
+
+async def get_async_db():
+    """
+    Sessão assíncrona por pedido. O código de acesso a dados continua a ser o
+    das funções CRUD síncronas, executadas com `await db.run_sync(...)`: correm
+    num greenlet sobre o driver assíncrono, sem ocupar a threadpool.
+    """
+    async with open_async_session() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    """Versão assíncrona de `get_read_db` (réplica, quando configurada)."""
+    get_async_engine()
+    replica_bind = _async_replica_engine.sync_engine if _async_replica_engine is not None else None
+    async with _async_session_factory(info=_read_session_info(request, replica_bind)) as db:
+        yield db
+
+async def dispose_async_engine() -> None:
+    """Fecha as conexões dos engines assíncronos (no encerramento da aplicação)."""
+    for async_engine in (_async_engine, _async_replica_engine):
+        if async_engine is not None:
+            await async_engine.dispose()
+
 # Cria uma classe Base para nossos modelos (ORM)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
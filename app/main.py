@@ -1,27 +1,63 @@
 # app/main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from . import models
-from .database import engine
-from .routers import products, users, orders, sales_cases,discounts# 1. Importar os nossos novos routers
+from . import models, security
+from .core.config import settings
+from .core.query_stats import query_stats_middleware
+from .core.read_your_writes import track_writes_middleware
+from .core.scheduler import scheduler
+from .core.slow_queries import slow_query_log
+from .database import engine, dispose_async_engine
+from .routers import products, users, orders, sales_cases,discounts,reports,admin# 1. Importar os nossos novos routers
+from .services.reporting_service import run_sales_rollup_job
+from .services.sales_case_service import run_overdue_sweep_job
+from .services.inventory_service import run_on_loan_reconcile_job
 
 # Cria as tabelas no banco de dados (se não existirem)
 #models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Custo do bcrypt neste hardware (em background, ver security.benchmark_hashing)
+    if settings.PASSWORD_HASH_BENCHMARK_ON_STARTUP:
+        security.start_hash_benchmark()
+    # Jobs periódicos em background (rollups, manutenção)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.register("sales_rollup", run_sales_rollup_job, settings.REPORTS_ROLLUP_INTERVAL_SECONDS)
+        scheduler.register("overdue_sweep", run_overdue_sweep_job, settings.OVERDUE_SWEEP_INTERVAL_SECONDS)
+        scheduler.register("on_loan_reconcile", run_on_loan_reconcile_job, settings.ON_LOAN_RECONCILE_INTERVAL_SECONDS)
+        scheduler.start()
+    yield
+    scheduler.stop()
+    security.shutdown_hash_pool()
+    slow_query_log.shutdown()
+    await dispose_async_engine()
+
 app = FastAPI(
     title="Cida Joias API",
-    description="Back-end."
+    description="Back-end.",
+    lifespan=lifespan
 )
 
+# Com réplica de leitura, regista quem escreveu há pouco (read-your-writes)
+if settings.DATABASE_REPLICA_URL:
+    app.middleware("http")(track_writes_middleware)
+# Queries e tempo de banco por pedido (header Server-Timing)
+if settings.QUERY_STATS_ENABLED:
+    app.middleware("http")(query_stats_middleware)
+
 # 2. Incluir os routers na nossa aplicação principal
 app.include_router(users.router)
 app.include_router(products.router)
 app.include_router(orders.router)
 app.include_router(sales_cases.router)
 app.include_router(discounts.router)
+app.include_router(reports.router)
+app.include_router(admin.router)
 @app.get("/")
 def read_root():
     """
     Endpoint raiz. Apenas diz 'Olá' para confirmar que a API está no ar.
     """
-    return {"message": "Bem-vindo à API da Cida Joias!"}
\ No newline at end of file
+    return {"message": "Bem-vindo à API da Cida Joias!"}
@@ -2,8 +2,8 @@
 
 import enum
 from sqlalchemy import (
-    Column, Integer, String, Boolean, Float, DECIMAL, DateTime, 
-    ForeignKey, Enum
+    Column, Integer, String, Boolean, Float, DECIMAL, Date, DateTime, 
+    ForeignKey, Enum, Index, text
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -58,6 +58,11 @@ class Product(Base):
     
     barcode = Column(String(100), unique=True, index=True)
     image_url = Column(String(1024))
+
+    # Controlo de alterações (sincronização incremental das vendedoras).
+    # Qualquer UPDATE (ORM ou em lote) incrementa `version`; não é um lock otimista.
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     
     # Relações
     order_items = relationship("OrderItem", back_populates="product")
@@ -68,22 +73,37 @@ class Discount(Base):
     __tablename__ = "discounts"
 
     id = Column(Integer, primary_key=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     discount_price = Column(DECIMAL(10, 2), nullable=False)
     start_time = Column(DateTime(timezone=True), server_default=func.now())
     end_time = Column(DateTime(timezone=True), nullable=False)
 
     product = relationship("Product", back_populates="discounts")
 
+    __table_args__ = (
+        # Preço promocional ativo: igualdade no produto, intervalo de datas e
+        # `discount_price` no fim para o MIN/ORDER BY ser resolvido pelo índice.
+        # Lidera com `product_id`, por isso também serve as pesquisas só por produto
+        Index("ix_discounts_product_active_price", "product_id", "start_time", "end_time", "discount_price"),
+    )
+
 class Order(Base):
     __tablename__ = "orders"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(String(50), nullable=False, default="pending")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     
     owner = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
 
+    __table_args__ = (
+        # Histórico do cliente, paginado por id decrescente
+        Index("ix_orders_user_id_id", "user_id", "id"),
+        # Totais de vendas por utilizador/status desde uma data
+        Index("ix_orders_user_status_created_at", "user_id", "status", "created_at"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(Integer, primary_key=True, index=True)
@@ -95,6 +115,13 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
 
+    __table_args__ = (
+        # Itens de uma encomenda (joinedload, totais e exportação ordenada por item)
+        Index("ix_order_items_order_id_id", "order_id", "id"),
+        # Vendas por produto (rollups)
+        Index("ix_order_items_product_id", "product_id"),
+    )
+
 # --- NOVOS MODELOS PARA ESTOJOS (SALES CASES) ---
 
 class SalesCase(Base):
@@ -106,9 +133,22 @@ class SalesCase(Base):
     return_by_date = Column(DateTime(timezone=True), nullable=False)
     status = Column(Enum(SalesCaseStatus), nullable=False, default=SalesCaseStatus.ON_LOAN)
 
+    # Controlo de alterações (sincronização incremental das vendedoras)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
+
     sales_rep = relationship("User", back_populates="sales_cases")
     items = relationship("SalesCaseItem", back_populates="case", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Listagem por vendedora (+ status), paginada por id
+        Index("ix_sales_cases_rep_status_id", "sales_rep_id", "status", "id"),
+        # Varrimento de estojos em atraso
+        Index("ix_sales_cases_status_return_by", "status", "return_by_date"),
+        # Sincronização incremental por vendedora
+        Index("ix_sales_cases_rep_updated_at", "sales_rep_id", "updated_at"),
+    )
+
 class SalesCaseItem(Base):
     __tablename__ = "sales_case_items"
 
@@ -118,4 +158,39 @@ class SalesCaseItem(Base):
     quantity = Column(Integer, nullable=False)
 
     case = relationship("SalesCase", back_populates="items")
-    product = relationship("Product") # Relação simples
\ No newline at end of file
+    product = relationship("Product") # Relação simples
+
+    __table_args__ = (
+        # Itens de um estojo (selectinload e resumos da listagem)
+        Index("ix_sales_case_items_case_id", "case_id"),
+        # Totais em estojos abertos por produto (reconciliação de on_loan)
+        Index("ix_sales_case_items_product_id_case_id", "product_id", "case_id"),
+    )
+
+# --- TABELAS DE RELATÓRIOS (ROLLUPS DIÁRIOS) ---
+# Preenchidas incrementalmente pelo job de rollup a partir das encomendas novas.
+# Os relatórios leem apenas estas linhas pré-agregadas, nunca `order_items`.
+
+class DailyProductSales(Base):
+    __tablename__ = "daily_product_sales"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    units_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class DailySalesRepSales(Base):
+    __tablename__ = "daily_sales_rep_sales"
+
+    day = Column(Date, primary_key=True)
+    sales_rep_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class ReportWatermark(Base):
+    __tablename__ = "report_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,86 @@
+# NOVO ARQUIVO: app/routers/admin.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from .. import schemas, auth, crud, security
+from ..core.config import settings
+from ..core.rate_limit import login_throttle
+from ..core.revocation import token_denylist
+from ..core.scheduler import scheduler
+from ..core.slow_queries import slow_query_log
+from ..crud.crud_user import user_snapshot_cache
+from ..services.sales_case_service import sales_summary_cache
+from ..database import engine, get_db, get_pool_stats
+from ..services.inventory_service import InventoryService
+
+# Endpoints operacionais, exclusivos de administradores.
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(auth.require_admin_user)]
+)
+
+@router.get("/jobs", response_model=List[schemas.JobStatus])
+def read_jobs_status():
+    """
+    Estado dos jobs em background: última execução, duração,
+    resultado (ex: estojos marcados como em atraso) e último erro.
+    """
+    return scheduler.status()
+
+@router.get("/metrics", response_model=schemas.AdminMetrics)
+def read_metrics():
+    """
+    Métricas em memória deste processo: tamanho e taxa de acerto das caches
+    tentativas de login recusadas pelo limitador, custo atual do bcrypt e
+    estado da pool de conexões ao banco.
+    """
+    return {
+        "caches": {
+            "auth_user": user_snapshot_cache.stats(),
+            "sales_summary": sales_summary_cache.stats(),
+        },
+        "login_throttle": login_throttle.stats(),
+        "password_hashing": {
+            "bcrypt_rounds": settings.PASSWORD_BCRYPT_ROUNDS,
+            "benchmark_ms_per_hash": security.hash_benchmark_ms,
+        },
+        "db_pool": get_pool_stats(engine),
+    }
+
+@router.get("/slow-queries", response_model=List[schemas.SlowQuery])
+def read_slow_queries():
+    """
+    Queries mais lentas do que SLOW_QUERY_THRESHOLD_MS neste processo (mais
+    recentes primeiro), com a rota e o plano de execução. Vazio se
+    SLOW_QUERY_LOG_ENABLED estiver desligado.
+    """
+    return slow_query_log.entries()
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries():
+    """Limpa o registo de queries lentas (ex: depois de aplicar uma correção)."""
+    slow_query_log.clear()
+
+@router.post("/reconcile-on-loan", response_model=schemas.OnLoanReconciliation)
+def reconcile_on_loan(repair: bool = False, db: Session = Depends(get_db)):
+    """
+    Verifica se o stock em estojos (`on_loan_quantity`) de cada produto bate
+    certo com os itens dos estojos abertos. Com `repair=true`, corrige os
+    contadores divergentes.
+    """
+    return InventoryService(db).reconcile_on_loan(repair=repair)
+
+@router.post("/users/{user_id}/revoke-tokens", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_user_tokens(user_id: int, db: Session = Depends(get_db)):
+    """
+    Revoga todos os tokens já emitidos para o utilizador (ex: conta
+    comprometida). O utilizador terá de voltar a fazer login.
+    """
+    db_user = crud.user.get(db, id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    token_denylist.revoke_user(user_id)
+    user_snapshot_cache.invalidate(db_user.email)
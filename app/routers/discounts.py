@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from .. import models, schemas, auth, crud
-from ..database import get_db
+from ..database import get_db, get_read_db
 
 # 1. Definição do Router
 # A dependência `auth.require_admin_user` aplicada no nível do router
@@ -54,7 +54,7 @@ def create_discount(
 def read_discounts(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna uma lista de todos os descontos cadastrados no sistema, com paginação.
@@ -68,7 +68,7 @@ def read_discounts(
 @router.get("/{discount_id}", response_model=schemas.Discount)
 def read_discount(
     discount_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de um desconto específico pelo seu ID.
@@ -1,13 +1,17 @@
 # app/routers/orders.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date
+from typing import List, Literal, Optional
 
 from .. import models, schemas, auth
 # Importamos o MÓDULO crud_order (para listagem) e o SERVIÇO
 from ..crud import crud_order
 from ..services.order_service import OrderService,OrderCreationError
-from ..database import get_db
+from ..services.order_export_service import OrderExportService
+from ..database import get_async_read_db, get_db
 
 router = APIRouter(
     prefix="/orders",
@@ -16,12 +20,16 @@ router = APIRouter(
 def get_order_service(db: Session = Depends(get_db)) -> OrderService:
     return OrderService(db)
 
+def get_order_export_service() -> OrderExportService:
+    # A exportação gere as suas próprias sessões curtas (ver OrderExportService)
+    return OrderExportService()
+
 @router.post("/", response_model=schemas.OrderResponse, status_code=status.HTTP_201_CREATED)
 def create_new_order(
     order_create: schemas.OrderCreate,
     db: Session = Depends(get_db),
     # Usamos get_current_user, NÃO o de admin! Qualquer user logado pode comprar.
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: schemas.User = Depends(auth.get_current_user)
 ):
     """
     Cria uma nova encomenda para o utilizador atualmente autenticado.
@@ -37,29 +45,33 @@ def create_new_order(
         )
     
 @router.get("/meus-pedidos", response_model=List[schemas.OrderResponse])
-def read_user_orders(
+async def read_user_orders(
     skip: int = 0,
     limit: int = 25,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     # A dependência de segurança que nos dá o utilizador do token
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: schemas.User = Depends(auth.get_current_user)
 ):
     """
     Obtém o histórico de encomendas do utilizador atualmente autenticado.
     """
-    # A lógica de negócio é simplesmente chamar a nossa função CRUD segura e otimizada
-    orders = crud_order.get_orders_by_user(
-        db=db, 
-        user_id=current_user.id, # O ID vem do token, não da URL!
-        skip=skip, 
-        limit=limit
-    )
-    return orders
+    # A lógica de negócio é simplesmente chamar a nossa função CRUD segura e otimizada,
+    # via sessão assíncrona; a conversão para o schema acontece dentro da sessão.
+    def load_orders(session: Session) -> List[schemas.OrderResponse]:
+        orders = crud_order.get_orders_by_user(
+            db=session, 
+            user_id=current_user.id, # O ID vem do token, não da URL!
+            skip=skip, 
+            limit=limit
+        )
+        return [schemas.OrderResponse.model_validate(order) for order in orders]
+
+    return await db.run_sync(load_orders)
 
 @router.post("/pedidos", response_model=schemas.OrderResponse, status_code=status.HTTP_201_CREATED, tags=["Public Checkout"])
 def public_checkout(
     checkout_request: schemas.CheckoutRequest,
-    current_user: models.User = Depends(auth.require_customer_user),
+    current_user: schemas.User = Depends(auth.require_customer_user),
     # Injetamos o SERVIÇO, não mais o 'db' diretamente
     order_service: OrderService = Depends(get_order_service)
 ):
@@ -83,7 +95,7 @@ def read_my_orders(
     limit: int = 25, # Um limite padrão mais conservador para listas
     db: Session = Depends(get_db),
     # Acesso restrito a clientes, obtendo o utilizador autenticado do token
-    current_user: models.User = Depends(auth.require_customer_user)
+    current_user: schemas.User = Depends(auth.require_customer_user)
 ):
     """
     Obtém o histórico de pedidos para o cliente atualmente autenticado.
@@ -96,4 +108,36 @@ def read_my_orders(
         skip=skip, 
         limit=limit
     )
-    return orders
\ No newline at end of file
+    return orders
+
+@router.get("/export", tags=["Orders (Admin)"])
+def export_orders(
+    format: Literal["csv", "ndjson"] = "csv",
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    current_admin: schemas.User = Depends(auth.require_admin_user),
+    export_service: OrderExportService = Depends(get_order_export_service)
+):
+    """
+    Exporta encomendas e respetivos itens para a contabilidade, em streaming.
+
+    - **Protegido**: Apenas para administradores.
+    - **Filtros**: intervalo de datas `from`/`to` (inclusivo) e `status`.
+    - **Formatos**: `csv` (uma linha por item) ou `ndjson` (uma linha por encomenda).
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be on or before 'to'."
+        )
+    filters = {"date_from": date_from, "date_to": date_to, "status": order_status}
+    if format == "ndjson":
+        content, media_type = export_service.iter_ndjson(**filters), "application/x-ndjson"
+    else:
+        content, media_type = export_service.iter_csv(**filters), "text/csv"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'}
+    )
@@ -1,13 +1,14 @@
 # app/routers/products.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from ..services.pricing_engine import PricingEngine
 
 # Usamos '..' para importar de diretórios pais
 from .. import models, schemas, auth
-from ..database import get_db
+from ..database import get_async_read_db, get_db
 from ..crud import *
 # 1. Criamos um "router"
 # Isto funciona como uma "mini" app FastAPI
@@ -19,37 +20,37 @@ router = APIRouter(
 def get_pricing_engine(db: Session = Depends(get_db)):
     return PricingEngine(db=db)
 
-@router.get("/", response_model=List[schemas.Product])
-def read_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    products = crud_product.get_products(db, skip=skip, limit=limit)
-    return products
-
-@router.get("/", response_model=List[schemas.Product])
-def read_products(
-    skip: int = 0, limit: int = 100, 
-    db: Session = Depends(get_db),
-    pricing_engine: PricingEngine = Depends(get_pricing_engine)
-):
+def _list_products_with_prices(db: Session, skip: int, limit: int) -> List[schemas.Product]:
     products_from_db = crud_product.get_products(db, skip=skip, limit=limit)
-    
-    # Enriquecer cada produto com o preço atual
-    products_with_prices = []
+
     # Otimização: buscar todos os preços de uma vez
-    current_prices = pricing_engine.get_current_prices_for_products(products=products_from_db)
+    current_prices = PricingEngine(db=db).get_current_prices_for_products(products=products_from_db)
 
+    # Enriquecer cada produto com o preço atual. A validação é feita aqui,
+    # ainda dentro da sessão, pois o ORM não pode fazer I/O fora do `run_sync`.
+    products_with_prices = []
     for product in products_from_db:
-        # Pydantic não consegue fazer isso sozinho, então criamos um dict
-        product_data = schemas.Product.model_validate(product).model_dump()
+        product_data = {field: getattr(product, field) for field in schemas.Product.model_fields if field != "current_price"}
         product_data["current_price"] = current_prices.get(product.id, product.selling_price)
-        products_with_prices.append(product_data)
-
+        products_with_prices.append(schemas.Product(**product_data))
     return products_with_prices
 
+@router.get("/", response_model=List[schemas.Product])
+async def read_products(
+    skip: int = 0, limit: int = 100, 
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Catálogo com o preço atual (descontos aplicados). Assíncrono: as queries
+    correm sobre o engine assíncrono, sem ocupar threads da threadpool.
+    """
+    return await db.run_sync(_list_products_with_prices, skip, limit)
+
 @router.post("/", response_model=schemas.Product, status_code=status.HTTP_201_CREATED)
 def create_product_endpoint(
     product: schemas.ProductCreate,
     db: Session = Depends(get_db),
-    current_admin: models.User = Depends(auth.get_current_admin_user)
+    current_admin: schemas.User = Depends(auth.get_current_admin_user)
 ):
     if crud_product.get_product_by_barcode(db, barcode=product.barcode):
         raise HTTPException(status_code=400, detail="Barcode already registered")
@@ -59,7 +60,7 @@ def create_product_endpoint(
 def read_product(
     product_id: int, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: schemas.User = Depends(auth.get_current_admin_user)
 ):
     db_product = crud_product.get_product(db=db, product_id=product_id)
     if db_product is None:
@@ -71,7 +72,7 @@ def update_product_endpoint(
     product_id: int,
     product_update: schemas.ProductUpdate,
     db: Session = Depends(get_db),
-    current_admin: models.User = Depends(auth.get_current_admin_user)
+    current_admin: schemas.User = Depends(auth.get_current_admin_user)
 ):
     db_product = crud_product.get_product(db=db, product_id=product_id)
     if db_product is None:
@@ -82,7 +83,7 @@ def update_product_endpoint(
 def delete_product_endpoint(
     product_id: int,
     db: Session = Depends(get_db),
-    current_admin: models.User = Depends(auth.get_current_admin_user)
+    current_admin: schemas.User = Depends(auth.get_current_admin_user)
 ):
     db_product = crud_product.get_product(db=db, product_id=product_id)
     if db_product is None:
@@ -94,7 +95,7 @@ def delete_product_endpoint(
 def read_product_by_barcode(
     barcode: str,
     db: Session = Depends(get_db),
-    current_admin: models.User = Depends(auth.get_current_admin_user)
+    current_admin: schemas.User = Depends(auth.get_current_admin_user)
 ):
     """
     Obtém os detalhes de um produto específico pelo seu código de barras.
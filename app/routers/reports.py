@@ -0,0 +1,39 @@
+# NOVO ARQUIVO: app/routers/reports.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Literal
+
+from .. import schemas, auth
+from ..database import get_db
+from ..services.reporting_service import ReportingService, ReportingError
+
+# Todos os relatórios são exclusivos de administradores.
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports (Admin)"],
+    dependencies=[Depends(auth.require_admin_user)]
+)
+
+def get_reporting_service(db: Session = Depends(get_db)) -> ReportingService:
+    return ReportingService(db)
+
+@router.get("/sales", response_model=schemas.SalesReport)
+def read_sales_report(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    group_by: Literal["day", "product", "sales_rep"] = "day",
+    service: ReportingService = Depends(get_reporting_service)
+):
+    """
+    Volume de vendas (unidades e receita) no intervalo [from, to].
+
+    - **Protegido**: Apenas para administradores.
+    - **Desempenho**: Lê apenas os rollups diários pré-agregados; os dados
+      estão atualizados até `data_as_of_order_id` (ver job `sales_rollup`).
+    """
+    try:
+        return service.get_sales_report(date_from=date_from, date_to=date_to, group_by=group_by)
+    except ReportingError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
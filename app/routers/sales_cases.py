@@ -1,13 +1,16 @@
 # ARQUIVO ATUALIZADO: app/routers/sales_cases.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
 from .. import models, schemas, auth, crud
-from ..database import get_db
+from ..database import get_async_read_db, get_db, get_read_db
 from ..models import SalesCaseStatus
-from ..services.sales_case_service import SalesCaseService, SalesCaseLogicError, SalesCaseAuthorizationError # <-- IMPORTAÇÕES CHAVE
+from ..services.sync_service import SyncService, SyncTokenError
+from ..services.sales_case_service import SalesCaseService, SalesCaseLogicError, SalesCaseAuthorizationError, SalesCaseBulkError # <-- IMPORTAÇÕES CHAVE
 
 router = APIRouter(
     prefix="/sales-cases",
@@ -18,11 +21,15 @@ router = APIRouter(
 def get_sales_case_service(db: Session = Depends(get_db)) -> SalesCaseService:
     return SalesCaseService(db=db)
 
+def get_sales_case_read_service(db: Session = Depends(get_read_db)) -> SalesCaseService:
+    """Serviço para leituras (GET): sessão na réplica, quando configurada."""
+    return SalesCaseService(db=db)
+
 @router.post("/", response_model=schemas.SalesCaseResponse, status_code=status.HTTP_201_CREATED)
 def create_new_sales_case(
     case_create: schemas.SalesCaseCreate,
     service: SalesCaseService = Depends(get_sales_case_service),
-    current_admin: models.User = Depends(auth.require_admin_user)
+    current_admin: schemas.User = Depends(auth.require_admin_user)
 ):
     try:
         new_case = service.create_new_case(case_create=case_create)
@@ -30,12 +37,36 @@ def create_new_sales_case(
     except SalesCaseLogicError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+@router.post("/bulk", response_model=schemas.SalesCaseBulkCreateResult, status_code=status.HTTP_201_CREATED)
+def create_sales_cases_bulk(
+    bulk_create: schemas.SalesCaseBulkCreate,
+    service: SalesCaseService = Depends(get_sales_case_service),
+    current_admin: schemas.User = Depends(auth.require_admin_user)
+):
+    """
+    Cria estojos para muitas vendedoras de uma só vez, validando a procura
+    agregada contra o stock disponível numa única transação.
+
+    - `mode=all_or_nothing` (padrão): qualquer falha devolve 400 com o detalhe
+      de cada estojo recusado e nada é criado.
+    - `mode=partial`: cria os estojos válidos e lista os recusados em `failed`.
+    """
+    try:
+        return service.create_cases_bulk(bulk_create=bulk_create)
+    except SalesCaseBulkError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[failure.model_dump() for failure in e.failures]
+        )
+    except SalesCaseLogicError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.post("/{case_id}/return", response_model=schemas.SalesCaseReturnReport)
 def return_sales_case(
     case_id: int,
     return_request: schemas.SalesCaseReturnRequest,
     service: SalesCaseService = Depends(get_sales_case_service),
-    current_user: models.User = Depends(auth.require_admin_or_sales_rep)
+    current_user: schemas.User = Depends(auth.require_admin_or_sales_rep)
 ):
     try:
         report = service.process_case_return(case_id=case_id, return_request=return_request, current_user=current_user)
@@ -45,23 +76,93 @@ def return_sales_case(
     except SalesCaseAuthorizationError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
-@router.get("/", response_model=List[schemas.SalesCaseResponse])
-def read_sales_cases(
+@router.get("/", response_model=Union[List[schemas.SalesCaseResponse], List[schemas.SalesCaseListItem]])
+async def read_sales_cases(
+    response: Response,
     status: Optional[SalesCaseStatus] = None,
     sales_rep_id: Optional[int] = None,
-    db: Session = Depends(get_db), # Leituras podem usar o db direto
-    current_user: models.User = Depends(auth.require_admin_or_sales_rep)
+    before_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    view: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_async_read_db), # Leituras: sessão assíncrona, réplica se configurada
+    current_user: schemas.User = Depends(auth.require_admin_or_sales_rep)
 ):
-    cases = crud.sales_case.get_multi_for_user(db, current_user=current_user, status=status, sales_rep_id=sales_rep_id)
-    return cases
+    """
+    Lista estojos do mais recente para o mais antigo, paginados por keyset.
+    Quando há mais páginas, o header `X-Next-Before-Id` traz o valor a
+    enviar como `before_id` no pedido seguinte.
+
+    - `view=full` (padrão): cada estojo com a lista completa de itens.
+    - `view=summary`: apenas dados do estojo e contagens (`item_count`,
+      `total_pieces`), sem carregar os itens. Ideal para ecrãs de listagem.
+    """
+    # Pedimos um estojo a mais só para saber se existe página seguinte
+    filters = dict(current_user=current_user, status=status, sales_rep_id=sales_rep_id, before_id=before_id, limit=limit + 1)
+    if view == "summary":
+        rows = await db.run_sync(lambda session: crud.sales_case.get_multi_summary_for_user(session, **filters))
+        summary_response = JSONResponse(content=[
+            schemas.SalesCaseListItem.model_validate(row).model_dump(mode="json") for row in rows[:limit]
+        ])
+        if len(rows) > limit:
+            summary_response.headers["X-Next-Before-Id"] = str(rows[limit - 1].id)
+        return summary_response
+
+    def load_cases(session: Session) -> List[schemas.SalesCaseResponse]:
+        cases = crud.sales_case.get_multi_for_user(session, **filters)
+        return [schemas.SalesCaseResponse.model_validate(case) for case in cases]
+
+    cases = await db.run_sync(load_cases)
+    if len(cases) > limit:
+        response.headers["X-Next-Before-Id"] = str(cases[limit - 1].id)
+    return cases[:limit]
+
+@router.get("/summary", response_model=schemas.SalesRepSummary)
+def read_sales_rep_summary(
+    sales_rep_id: Optional[int] = None,
+    service: SalesCaseService = Depends(get_sales_case_read_service),
+    current_user: schemas.User = Depends(auth.require_admin_or_sales_rep)
+):
+    """
+    Resumo para o painel da vendedora: peças e valor em estojos, estojos
+    em atraso e vendas do mês. Vendedoras veem sempre o seu próprio resumo;
+    admins indicam a vendedora com `sales_rep_id`.
+    """
+    if current_user.role == models.UserRole.SALES_REP:
+        sales_rep_id = current_user.id
+    elif sales_rep_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="sales_rep_id is required for admins.")
+    return service.get_sales_rep_summary(sales_rep_id=sales_rep_id)
+
+@router.get("/sync", response_model=schemas.SalesCaseSyncBundle)
+def sync_sales_cases(
+    since: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(auth.require_sales_rep_user)
+):
+    """
+    Sincronização incremental para a app offline da vendedora.
+
+    - Sem `since`: pacote completo com os estojos abertos e os seus produtos.
+    - Com `since` (o `sync_token` da sincronização anterior): apenas estojos
+      alterados e produtos cujo preço/dados mudaram desde então.
+    O cliente deve substituir registos pelo `id`, mantendo a maior `version`.
+    """
+    try:
+        return SyncService(db).build_bundle(sales_rep_id=current_user.id, since_token=since)
+    except SyncTokenError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/{case_id}", response_model=schemas.SalesCaseResponse)
-def read_sales_case(
+async def read_sales_case(
     case_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_admin_or_sales_rep)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.User = Depends(auth.require_admin_or_sales_rep)
 ):
-    db_case = crud.sales_case.get(db, case_id=case_id)
+    def load_case(session: Session) -> Optional[schemas.SalesCaseResponse]:
+        db_case = crud.sales_case.get(session, case_id=case_id)
+        return schemas.SalesCaseResponse.model_validate(db_case) if db_case is not None else None
+
+    db_case = await db.run_sync(load_case)
     if db_case is None:
         raise HTTPException(status_code=404, detail="Sales case not found")
     if current_user.role == models.UserRole.SALES_REP and db_case.sales_rep_id != current_user.id:
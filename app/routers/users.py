@@ -1,13 +1,16 @@
 # app/routers/users.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import timedelta
 
 from .. import models, schemas, auth, crud,security
+from ..core.rate_limit import login_throttle
+from ..core.revocation import token_denylist
+from ..services.user_service import UserBulkError, create_users_bulk_async
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 
 router = APIRouter(
     tags=["Authentication"] # Agrupa na documentação
@@ -20,22 +23,63 @@ def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=400, detail="Email already registered")
     return crud.crud_user.user.create(db=db, obj_in=user)
 
+@router.post("/users/bulk", response_model=schemas.UserBulkCreateResult, status_code=status.HTTP_201_CREATED)
+async def create_users_bulk_endpoint(
+    bulk_create: schemas.UserBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: schemas.User = Depends(auth.require_admin_user)
+):
+    """
+    Registo em lote (apenas admin). Emails já existentes ou repetidos no
+    pedido são ignorados e listados em `skipped`. Os hashes correm na pool
+    de processos de longa duração, sem ocupar a threadpool.
+    """
+    try:
+        return await create_users_bulk_async(db, bulk_create=bulk_create)
+    except UserBulkError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = crud.crud_user.user.get_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    # Tentativas em excesso (por email ou IP) são recusadas antes de qualquer query ou hash
+    client_ip = request.client.host if request.client else None
+    if not await login_throttle.allow_async(email=form_data.username, ip=client_ip):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Try again later.",
+            headers={"Retry-After": "60"},
+        )
+
+    # Nem a query nem o bcrypt podem bloquear o event loop: a query usa a
+    # sessão assíncrona e o hash corre na pool de hashing.
+    user = await db.run_sync(lambda session: crud.crud_user.user.get_by_email(session, email=form_data.username))
+    verified, new_hash = (
+        await security.verify_and_update_async(form_data.password, user.hashed_password) if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # O hash guardado usa um custo antigo: aproveitamos a senha em claro para o atualizar
+        await db.run_sync(
+            lambda session: crud.crud_user.user.set_password_hash(session, user_id=user.id, hashed_password=new_hash)
+        )
     
-    access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = auth.create_user_access_token(user)
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(claims: dict = Depends(auth.get_token_claims)):
+    """Revoga o token usado neste pedido (os restantes tokens do utilizador continuam válidos)."""
+    if claims.get("jti") is None:
+        # Tokens antigos, sem jti: apenas a revogação por utilizador os abrange
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token cannot be revoked individually")
+    token_denylist.revoke_token(claims["jti"], expires_at=claims["exp"])
\ No newline at end of file
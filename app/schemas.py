@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field,ConfigDict
 from .models import UserRole
-from typing import List,Optional
-from datetime import datetime
+from typing import Dict,List,Optional,Literal
+from datetime import date, datetime
 from decimal import Decimal
 # Este será o "schema" que a API retornará ao listar produtos.
 # Note que ele NÃO é o modelo do SQLAlchemy, é um modelo Pydantic.
@@ -57,6 +57,18 @@ class User(UserBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class UserBulkCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1)
+
+class UserBulkSkipped(BaseModel):
+    index: int # Posição do utilizador no pedido
+    email: str
+    detail: str
+
+class UserBulkCreateResult(BaseModel):
+    created: List[User]
+    skipped: List[UserBulkSkipped] = []
+
 # --- Schemas de Autenticação ---
 
 class Token(BaseModel):
@@ -114,6 +126,52 @@ class SalesCaseResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+# Projeção leve para listagens (GET /sales-cases/?view=summary)
+class SalesCaseListItem(BaseModel):
+    id: int
+    sales_rep_id: int
+    loan_date: datetime
+    return_by_date: datetime
+    status: str
+    item_count: int # Linhas distintas no estojo
+    total_pieces: int # Soma das quantidades
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Painel da vendedora: agregados, sem listas de estojos
+class SalesRepSummary(BaseModel):
+    sales_rep_id: int
+    open_cases: int # ON_LOAN + OVERDUE
+    overdue_cases: int
+    pieces_on_loan: int
+    value_on_loan: Decimal # A preço de venda
+    overdue_pieces: int
+    month_orders: int # Vendas do mês corrente (devoluções de estojos)
+    month_units_sold: int
+    month_value_sold: Decimal
+    generated_at: datetime
+
+# --- Sincronização incremental (vendedoras offline) ---
+
+class SyncSalesCase(SalesCaseResponse):
+    version: int
+    updated_at: datetime
+
+class SyncProduct(BaseModel):
+    id: int
+    name: str
+    selling_price: Decimal
+    current_price: Decimal
+    image_url: str | None = None
+    version: int
+    updated_at: datetime
+
+class SalesCaseSyncBundle(BaseModel):
+    sync_token: str # Enviar como `since` na próxima sincronização
+    full: bool # True quando não foi enviado token (primeira sincronização)
+    cases: List[SyncSalesCase]
+    products: List[SyncProduct]
+
 # --- Schemas para o Corpo do Pedido (o que o cliente envia) ---
 
 class SalesCaseItemCreate(BaseModel):
@@ -125,6 +183,20 @@ class SalesCaseCreate(BaseModel):
     loan_duration_days: int = Field(..., gt=0, le=90, description="Duration in days (1-90)")
     items: List[SalesCaseItemCreate]
 
+class SalesCaseBulkCreate(BaseModel):
+    cases: List[SalesCaseCreate] = Field(..., min_length=1, max_length=500)
+    # all_or_nothing: qualquer falha cancela tudo; partial: cria os estojos válidos, pela ordem recebida
+    mode: Literal["all_or_nothing", "partial"] = "all_or_nothing"
+
+class SalesCaseBulkFailure(BaseModel):
+    index: int # Posição do estojo no pedido
+    sales_rep_id: int
+    detail: str
+
+class SalesCaseBulkCreateResult(BaseModel):
+    created: List[SalesCaseResponse]
+    failed: List[SalesCaseBulkFailure] = []
+
 class ItemSold(BaseModel):
     product_id: int
     quantity_sold: int = Field(..., ge=0) # Pode ser 0, mas não negativo
@@ -173,4 +245,89 @@ class Discount(DiscountBase):
 
 class DiscountUpdate(BaseModel):
     discount_price: Optional[Decimal] = None
-    end_time: Optional[datetime] = None
\ No newline at end of file
+    end_time: Optional[datetime] = None
+
+# --- Schemas de Relatórios ---
+
+class SalesReportRow(BaseModel):
+    # Apenas a chave correspondente ao 'group_by' vem preenchida
+    day: Optional[date] = None
+    product_id: Optional[int] = None
+    sales_rep_id: Optional[int] = None
+    units_sold: int
+    revenue: Decimal
+    order_count: Optional[int] = None # Só disponível no agrupamento por vendedora
+
+class SalesReport(BaseModel):
+    date_from: date
+    date_to: date
+    group_by: Literal["day", "product", "sales_rep"]
+    data_as_of_order_id: int # Última encomenda incluída nos rollups
+    data_refreshed_at: Optional[datetime] = None
+    rows: List[SalesReportRow]
+
+# --- Schemas de Administração ---
+
+class OnLoanDrift(BaseModel):
+    product_id: int
+    recorded: int # Valor do contador Product.on_loan_quantity
+    actual: int # Soma dos itens em estojos abertos
+
+class OnLoanReconciliation(BaseModel):
+    checked: int # Produtos verificados
+    drifted: int # Produtos com divergência
+    repaired: int # Produtos corrigidos (0 quando repair=False)
+    drifts: List[OnLoanDrift] # Amostra limitada das divergências encontradas
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: Optional[float] = None
+
+class LoginThrottleStats(BaseModel):
+    enabled: bool
+    rejected: int # Tentativas recusadas neste processo desde o arranque
+
+class PasswordHashingStats(BaseModel):
+    bcrypt_rounds: int
+    benchmark_ms_per_hash: Optional[float] = None # None até o benchmark terminar (ou se desativado)
+
+class DBPoolStats(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checked_out: Optional[int] = None # Conexões em uso neste momento
+    checked_in: Optional[int] = None # Conexões livres na pool
+    overflow: Optional[int] = None # Conexões extra abertas acima de `size`
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None # Checkouts que falharam por pool esgotada
+    avg_wait_ms: Optional[float] = None
+    max_wait_ms: Optional[float] = None
+
+class AdminMetrics(BaseModel):
+    caches: Dict[str, CacheStats]
+    login_throttle: LoginThrottleStats
+    password_hashing: PasswordHashingStats
+    db_pool: DBPoolStats
+
+class SlowQuery(BaseModel):
+    recorded_at: datetime
+    duration_ms: float
+    statement: str # SQL normalizado (com placeholders, sem valores)
+    parameters_fingerprint: str
+    route: Optional[str] = None # None quando executada fora de um pedido (jobs)
+    plan: Optional[List[str]] = None # Preenchido em background pelo EXPLAIN
+    explain_error: Optional[str] = None
+
+class JobStatus(BaseModel):
+    name: str
+    interval_seconds: float
+    run_count: int
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_result: Optional[int] = None # Ex: número de linhas afetadas
+    last_error: Optional[str] = None
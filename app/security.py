@@ -1,9 +1,48 @@
 # app/security.py
 
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 
-# Cria o contexto de criptografia uma única vez
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cria o contexto de criptografia uma única vez.
+# O custo (rounds) é fixo pela configuração: como min = max, qualquer hash
+# com outro custo é marcado por `needs_update` e refeito no próximo login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+# Resultado do último benchmark (ms por hash neste hardware), ver benchmark_hashing
+hash_benchmark_ms: float | None = None
+
+# O bcrypt é CPU-bound (~100-300 ms) mas liberta o GIL: corre numa pool de
+# threads dedicada, cujo tamanho limita quantos hashes correm em simultâneo.
+# Pedidos acima do limite esperam na fila sem bloquear o event loop.
+# Criada no primeiro uso e de novo depois de `shutdown_hash_pool`, para que a
+# app possa arrancar mais de uma vez no mesmo processo (ex: vários TestClient).
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_executor_lock = threading.Lock()
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_POOL_SIZE,
+                thread_name_prefix="password-hash",
+            )
+        return _hash_executor
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha em texto plano corresponde ao hash salvo."""
@@ -13,3 +52,94 @@ def get_password_hash(password: str) -> str:
     """Gera o hash de uma senha em texto plano."""
     return pwd_context.hash(password)
 
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verifica a senha e, se o hash guardado não seguir a política atual
+    (ex: rounds diferentes de PASSWORD_BCRYPT_ROUNDS), devolve também o novo hash.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def benchmark_hashing(samples: int = 3) -> float:
+    """Mede o custo médio (ms) de um hash com a política atual e guarda-o em `hash_benchmark_ms`."""
+    global hash_benchmark_ms
+    started = time.perf_counter()
+    for _ in range(samples):
+        pwd_context.hash("benchmark-password")
+    hash_benchmark_ms = (time.perf_counter() - started) * 1000 / samples
+    logger.info("bcrypt com %d rounds: %.0f ms por hash.", settings.PASSWORD_BCRYPT_ROUNDS, hash_benchmark_ms)
+    return hash_benchmark_ms
+
+def start_hash_benchmark() -> None:
+    """Corre o benchmark na pool de hashing, sem atrasar o arranque."""
+    _get_hash_executor().submit(benchmark_hashing)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` executado na pool de hashing, sem bloquear o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_password, plain_password, hashed_password)
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """`verify_and_update` executado na pool de hashing, sem bloquear o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """`get_password_hash` executado na pool de hashing, sem bloquear o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), get_password_hash, password)
+
+# Pool de processos do registo em lote: criada no primeiro lote e mantida
+# (arrancar processos 'spawn' custa segundos), terminada em `shutdown_hash_pool`.
+_bulk_hash_pool: ProcessPoolExecutor | None = None
+
+def _get_bulk_hash_pool() -> ProcessPoolExecutor:
+    global _bulk_hash_pool
+    with _hash_executor_lock:
+        if _bulk_hash_pool is None:
+            # 'spawn' evita herdar por fork as threads do processo da API (scheduler, pools)
+            _bulk_hash_pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_BULK_HASH_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _bulk_hash_pool
+
+def _hash_chunk(passwords: list[str]) -> list[str]:
+    """Hashes de um bloco de senhas (uma tarefa por bloco reduz o IPC com a pool de processos)."""
+    return [get_password_hash(password) for password in passwords]
+
+def _chunk_passwords(passwords: list[str], workers: int) -> list[list[str]]:
+    """Divide as senhas em ~4 blocos por processo, para equilibrar a carga sem uma tarefa por senha."""
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return [passwords[start:start + chunksize] for start in range(0, len(passwords), chunksize)]
+
+async def get_password_hashes_parallel_async(passwords: list[str]) -> list[str]:
+    """
+    Gera os hashes de muitas senhas em paralelo, na pool de processos do
+    registo em lote, com uma tarefa por bloco de senhas. O pedido espera no
+    event loop, sem ocupar uma thread da threadpool. Mantém a ordem recebida.
+    """
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    workers = min(settings.PASSWORD_BULK_HASH_PROCESSES, len(passwords))
+    if workers <= 1:
+        return await loop.run_in_executor(_get_hash_executor(), _hash_chunk, passwords)
+    pool = _get_bulk_hash_pool()
+    chunks = await asyncio.gather(
+        *(loop.run_in_executor(pool, _hash_chunk, chunk) for chunk in _chunk_passwords(passwords, workers))
+    )
+    return [hashed for chunk in chunks for hashed in chunk]
+
+def shutdown_hash_pool() -> None:
+    """
+    Termina as pools de hashing (threads e processos do registo em lote) no
+    encerramento da aplicação. O próximo hash cria pools novas.
+    """
+    global _hash_executor, _bulk_hash_pool
+    with _hash_executor_lock:
+        executors = (_hash_executor, _bulk_hash_pool)
+        _hash_executor = _bulk_hash_pool = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,76 @@
+# NOVO ARQUIVO: app/services/inventory_service.py
+
+import logging
+from sqlalchemy.orm import Session
+
+from .. import schemas, crud
+from ..core.config import settings
+from ..database import SessionLocal, serialized_writes
+
+logger = logging.getLogger(__name__)
+
+# Máximo de divergências devolvidas em detalhe (o total vem em `drifted`)
+MAX_REPORTED_DRIFTS = 100
+
+class InventoryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reconcile_on_loan(self, *, repair: bool = False, chunk_size: int | None = None) -> schemas.OnLoanReconciliation:
+        """
+        Compara `Product.on_loan_quantity` com a soma real dos itens em estojos
+        abertos e, com `repair=True`, corrige os contadores divergentes.
+
+        O catálogo é percorrido em blocos de ids; cada bloco é uma transação
+        curta: trava os produtos do bloco (a mesma ordem de locks do checkout e
+        da criação de estojos, logo sem deadlocks), calcula os totais com uma
+        query agrupada, corrige com um único UPDATE e faz commit.
+        """
+        chunk_size = chunk_size or settings.ON_LOAN_RECONCILE_CHUNK_SIZE
+        report = schemas.OnLoanReconciliation(checked=0, drifted=0, repaired=0, drifts=[])
+        after_id = 0
+        while True:
+            product_ids = crud.crud_product.get_product_ids_after(self.db, after_id=after_id, limit=chunk_size)
+            if not product_ids:
+                self.db.rollback()
+                return report
+            self._reconcile_chunk(product_ids, repair=repair, report=report)
+            after_id = product_ids[-1]
+
+    @serialized_writes
+    def _reconcile_chunk(self, product_ids: list[int], *, repair: bool, report: schemas.OnLoanReconciliation) -> None:
+        try:
+            # Com os produtos travados, nenhum estojo pode ser criado ou devolvido
+            # para eles até ao commit: contador e itens são lidos de forma coerente.
+            rows = crud.crud_product.get_stock_rows_for_update(self.db, product_ids=product_ids)
+            actual_totals = crud.sales_case.get_on_loan_totals(self.db, product_ids=product_ids)
+
+            corrections = {}
+            for row in rows:
+                actual = actual_totals.get(row.id, 0)
+                if row.on_loan_quantity != actual:
+                    corrections[row.id] = actual
+                    if len(report.drifts) < MAX_REPORTED_DRIFTS:
+                        report.drifts.append(
+                            schemas.OnLoanDrift(product_id=row.id, recorded=row.on_loan_quantity, actual=actual)
+                        )
+
+            if repair and corrections:
+                report.repaired += crud.crud_product.set_on_loan_quantities(self.db, quantities=corrections)
+            report.checked += len(rows)
+            report.drifted += len(corrections)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+def run_on_loan_reconcile_job() -> int:
+    """Ponto de entrada do job agendado: abre a sua própria sessão."""
+    with SessionLocal() as db:
+        report = InventoryService(db).reconcile_on_loan(repair=settings.ON_LOAN_RECONCILE_AUTO_REPAIR)
+    if report.drifted:
+        logger.warning(
+            "Reconciliação de stock em estojos: %d produto(s) divergente(s), %d corrigido(s).",
+            report.drifted, report.repaired,
+        )
+    return report.drifted
@@ -0,0 +1,109 @@
+# NOVO ARQUIVO: app/services/order_export_service.py
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Iterator, Optional
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud import crud_order
+from ..database import SessionLocal
+
+EXPORT_CSV_COLUMNS = [
+    "order_id", "user_id", "status", "created_at",
+    "item_id", "product_id", "quantity", "price_at_purchase",
+]
+
+class OrderExportService:
+    """
+    Exportação de encomendas e itens para a contabilidade, em streaming.
+
+    As encomendas são lidas em janelas de ids (`ORDER_EXPORT_WINDOW_SIZE`),
+    cada uma numa sessão/transação própria e curta: uma exportação grande
+    nunca mantém uma transação longa aberta contra o checkout. Dentro de cada
+    janela, as linhas vêm de um cursor do servidor (`yield_per`), pelo que a
+    memória usada é constante.
+    """
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def iter_rows(
+        self,
+        *,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        status: Optional[str] = None,
+    ) -> Iterator:
+        filters = {
+            "created_from": datetime.combine(date_from, time.min) if date_from else None,
+            # 'to' é inclusivo: tudo antes da meia-noite do dia seguinte
+            "created_before": datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None,
+            "status": status,
+        }
+        last_order_id = 0
+        while True:
+            with self.session_factory() as db:
+                up_to_id = crud_order.get_export_window_upper_bound(
+                    db, after_id=last_order_id, limit=settings.ORDER_EXPORT_WINDOW_SIZE, **filters
+                )
+                if up_to_id is None:
+                    return
+                yield from crud_order.stream_orders_with_items(
+                    db, after_id=last_order_id, up_to_id=up_to_id,
+                    yield_per=settings.ORDER_EXPORT_YIELD_PER, **filters
+                )
+            last_order_id = up_to_id
+
+    def iter_csv(self, **filters) -> Iterator[str]:
+        """Uma linha CSV por item (as colunas da encomenda repetem-se em cada item)."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        for count, row in enumerate(self.iter_rows(**filters), start=1):
+            writer.writerow([
+                row.order_id, row.user_id, row.status, _isoformat(row.created_at),
+                row.item_id, row.product_id, row.quantity, row.price_at_purchase,
+            ])
+            if count % settings.ORDER_EXPORT_YIELD_PER == 0:
+                yield _drain(buffer)
+        yield _drain(buffer)
+
+    def iter_ndjson(self, **filters) -> Iterator[str]:
+        """Uma linha JSON por encomenda, com os seus itens embutidos."""
+        lines: list[str] = []
+        current: Optional[dict] = None
+        for row in self.iter_rows(**filters):
+            if current is None or current["id"] != row.order_id:
+                if current is not None:
+                    lines.append(json.dumps(current))
+                    if len(lines) >= settings.ORDER_EXPORT_YIELD_PER:
+                        yield "".join(line + "\n" for line in lines)
+                        lines = []
+                current = {
+                    "id": row.order_id,
+                    "user_id": row.user_id,
+                    "status": row.status,
+                    "created_at": _isoformat(row.created_at),
+                    "items": [],
+                }
+            if row.item_id is not None:
+                current["items"].append({
+                    "id": row.item_id,
+                    "product_id": row.product_id,
+                    "quantity": row.quantity,
+                    "price_at_purchase": str(row.price_at_purchase),
+                })
+        if current is not None:
+            lines.append(json.dumps(current))
+        yield "".join(line + "\n" for line in lines)
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+def _drain(buffer: io.StringIO) -> str:
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return chunk
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from .. import models, schemas
+from ..core.config import settings
+from ..database import serialized_writes
 from ..crud import crud_product, crud_order # Importamos nossas ferramentas
 from .pricing_engine import PricingEngine
 
@@ -14,49 +16,35 @@ class OrderService:
         self.db = db
         self.pricing_engine = PricingEngine(db)
 
-    def create_customer_order(self, user: models.User, checkout_request: schemas.CheckoutRequest) -> models.Order:
+    @serialized_writes
+    def create_customer_order(self, user: schemas.User, checkout_request: schemas.CheckoutRequest) -> models.Order:
         """
         Orquestra a criação de uma nova encomenda, contendo toda a lógica de negócio.
+
+        O carrinho é processado em lotes ordenados por id de produto
+        (`settings.CHECKOUT_CHUNK_SIZE`): cada lote é travado, validado, precificado
+        e persistido com poucas queries, sem manter entidades ORM de todos os
+        produtos em memória. Tudo acontece numa única transação.
         """
+        quantities = self._consolidate_items(checkout_request.items)
+        if len(quantities) > settings.MAX_ORDER_LINES:
+            raise OrderCreationError(
+                f"O pedido excede o limite de {settings.MAX_ORDER_LINES} linhas. Recebidas: {len(quantities)}"
+            )
+
         # A transação é controlada aqui, na camada de serviço!
         try:
-            # --- FASE 1: VALIDAÇÃO DA LÓGICA DE NEGÓCIO ---
-            products_to_process = []
-            for item in checkout_request.items:
-                # Usamos a ferramenta do crud_product para pegar e "travar" o produto
-                product = crud_product.get_product_for_update(self.db, product_id=item.product_id)
-
-                if not product:
-                    raise ValueError(f"Produto com id {item.product_id} não encontrado.")
-
-                available_stock = product.stock_quantity - product.on_loan_quantity
-                if item.quantity > available_stock:
-                    raise ValueError(f"Estoque insuficiente para '{product.name}'. Pedido: {item.quantity}, Disponível: {available_stock}")
-                
-                products_to_process.append({"product": product, "quantity_sold": item.quantity})
-
-            # --- FASE 2: PERSISTÊNCIA (USANDO AS FERRAMENTAS CRUD) ---
-            # Se todas as validações passaram, começamos a alterar o banco.
-            
             # Criar o pedido principal
             db_order = crud_order.create_order(self.db, user_id=user.id, status="processing")
 
-            # Criar os itens e atualizar o estoque
-            for data in products_to_process:
-                product = data["product"]
-                quantity_sold = data["quantity_sold"]
-                price_at_purchase = self.pricing_engine.get_current_price_for_product(product=product)
-                # Criar o item do pedido
-                crud_order.create_order_item(
-                    self.db,
+            product_ids = sorted(quantities)
+            chunk_size = settings.CHECKOUT_CHUNK_SIZE
+            for start in range(0, len(product_ids), chunk_size):
+                self._process_chunk(
                     order_id=db_order.id,
-                    product_id=product.id,
-                    quantity=quantity_sold,
-                    price_at_purchase=price_at_purchase 
+                    product_ids=product_ids[start:start + chunk_size],
+                    quantities=quantities,
                 )
-                
-                # Deduzir do inventário
-                crud_product.decrease_stock(self.db, product=product, quantity=quantity_sold)
 
             # Se chegamos até aqui sem erros, confirmamos tudo.
             self.db.commit()
@@ -67,4 +55,48 @@ class OrderService:
             # 2.4 Em caso de QUALQUER erro, reverter tudo
             self.db.rollback()
             # Logar o erro 'e' aqui seria uma boa prática em produção
-            raise OrderCreationError(f"An unexpected error occurred while creating the order: {e}")
\ No newline at end of file
+            raise OrderCreationError(f"An unexpected error occurred while creating the order: {e}")
+
+    @staticmethod
+    def _consolidate_items(items: list[schemas.CheckoutItem]) -> dict[int, int]:
+        """Soma as quantidades de linhas repetidas do mesmo produto: {product_id: quantidade}."""
+        quantities: dict[int, int] = {}
+        for item in items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        return quantities
+
+    def _process_chunk(self, *, order_id: int, product_ids: list[int], quantities: dict[int, int]) -> None:
+        """
+        Processa um lote do carrinho. Não faz commit.
+        1. Trava todos os produtos do lote com uma única query.
+        2. Valida existência e stock disponível (stock_quantity - on_loan_quantity).
+        3. Calcula os preços atuais do lote de uma vez.
+        4. Insere os itens e deduz o inventário com uma instrução cada.
+        """
+        # --- FASE 1: VALIDAÇÃO DA LÓGICA DE NEGÓCIO ---
+        rows = crud_product.get_stock_rows_for_update(self.db, product_ids=product_ids)
+        found_ids = {row.id for row in rows}
+        for product_id in product_ids:
+            if product_id not in found_ids:
+                raise ValueError(f"Produto com id {product_id} não encontrado.")
+
+        for row in rows:
+            available_stock = row.stock_quantity - row.on_loan_quantity
+            if quantities[row.id] > available_stock:
+                raise ValueError(f"Estoque insuficiente para '{row.name}'. Pedido: {quantities[row.id]}, Disponível: {available_stock}")
+
+        # --- FASE 2: PERSISTÊNCIA (USANDO AS FERRAMENTAS CRUD) ---
+        prices = self.pricing_engine.get_current_prices(
+            base_prices={row.id: row.selling_price for row in rows}
+        )
+        crud_order.create_order_items_bulk(
+            self.db,
+            order_id=order_id,
+            items=[
+                {"product_id": row.id, "quantity": quantities[row.id], "price_at_purchase": prices[row.id]}
+                for row in rows
+            ],
+        )
+        crud_product.apply_stock_deltas(
+            self.db, stock_deltas={row.id: -quantities[row.id] for row in rows}
+        )
@@ -25,10 +25,20 @@ class PricingEngine:
 
     def get_current_prices_for_products(self, *, products: list[models.Product]) -> dict[int, Decimal]:
         """Versão otimizada para buscar preços de múltiplos produtos."""
-        # NOTA: Para uma super otimização, poderíamos fazer uma única query complexa
-        # para buscar todos os descontos ativos para uma lista de IDs de produtos.
-        # Por enquanto, a simplicidade é mais clara.
-        prices = {}
-        for product in products:
-            prices[product.id] = self.get_current_price_for_product(product=product)
-        return prices
\ No newline at end of file
+        return self.get_current_prices(base_prices={product.id: product.selling_price for product in products})
+
+    def get_current_prices(self, *, base_prices: dict[int, Decimal]) -> dict[int, Decimal]:
+        """
+        Aplica a mesma regra de `get_current_price_for_product` a vários produtos
+        de uma vez, com uma única query para todos os descontos ativos.
+
+        :param base_prices: {product_id: selling_price}
+        :return: {product_id: preço atual}
+        """
+        discount_prices = crud.discount.get_active_prices_for_products(
+            db=self.db, product_ids=list(base_prices)
+        )
+        return {
+            product_id: discount_prices.get(product_id, selling_price)
+            for product_id, selling_price in base_prices.items()
+        }
\ No newline at end of file
@@ -0,0 +1,91 @@
+# NOVO ARQUIVO: app/services/reporting_service.py
+
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+
+from .. import models, schemas, crud
+from ..core.config import settings
+from ..database import SessionLocal, serialized_writes
+
+class ReportingError(ValueError): pass
+
+class ReportingService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh_sales_rollups(self, *, batch_size: int | None = None) -> int:
+        """
+        Agrega as encomendas novas (após a marca d'água) nos rollups diários,
+        um lote por transação, até alcançar as encomendas mais recentes.
+        Encomendas mais novas do que `REPORTS_ROLLUP_SAFETY_LAG_SECONDS` ficam
+        para a próxima execução.
+
+        :return: número de encomendas agregadas.
+        """
+        batch_size = batch_size or settings.REPORTS_ROLLUP_BATCH_SIZE
+        processed = 0
+        while True:
+            batch = self._refresh_batch(batch_size=batch_size)
+            processed += batch
+            if batch < batch_size:
+                return processed
+
+    @serialized_writes
+    def _refresh_batch(self, *, batch_size: int) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.REPORTS_ROLLUP_SAFETY_LAG_SECONDS)
+        try:
+            watermark = crud.report.get_watermark_for_update(self.db)
+            after_id = watermark.last_order_id
+
+            # Só avançamos sobre o prefixo contíguo de encomendas "maduras".
+            up_to_id = None
+            processed = 0
+            for order_id, created_at in crud.report.get_pending_orders(self.db, after_id=after_id, limit=batch_size):
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                if created_at > cutoff:
+                    break
+                up_to_id = order_id
+                processed += 1
+
+            if up_to_id is None:
+                self.db.rollback()
+                return 0
+
+            product_rows = crud.report.aggregate_product_sales(self.db, after_id=after_id, up_to_id=up_to_id)
+            crud.report.upsert_additive(
+                self.db, model=models.DailyProductSales, key_columns=["day", "product_id"],
+                rows=[row._asdict() for row in product_rows],
+            )
+            rep_rows = crud.report.aggregate_sales_rep_sales(self.db, after_id=after_id, up_to_id=up_to_id)
+            crud.report.upsert_additive(
+                self.db, model=models.DailySalesRepSales, key_columns=["day", "sales_rep_id"],
+                rows=[row._asdict() for row in rep_rows],
+            )
+
+            watermark.last_order_id = up_to_id
+            self.db.commit()
+            # Um lote incompleto (fim da fila ou cutoff) encerra a execução atual.
+            return processed
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def get_sales_report(self, *, date_from: date, date_to: date, group_by: str) -> schemas.SalesReport:
+        if date_from > date_to:
+            raise ReportingError("'from' must be on or before 'to'.")
+        rows = crud.report.get_sales_report(self.db, date_from=date_from, date_to=date_to, group_by=group_by)
+        watermark = crud.report.get_watermark(self.db)
+        return schemas.SalesReport(
+            date_from=date_from,
+            date_to=date_to,
+            group_by=group_by,
+            data_as_of_order_id=watermark.last_order_id if watermark else 0,
+            data_refreshed_at=watermark.updated_at if watermark else None,
+            rows=[schemas.SalesReportRow(**row) for row in rows],
+        )
+
+def run_sales_rollup_job() -> int:
+    """Ponto de entrada do job agendado: abre a sua própria sessão."""
+    with SessionLocal() as db:
+        return ReportingService(db).refresh_sales_rollups()
@@ -5,104 +5,313 @@ from datetime import datetime, timedelta
 from typing import List
 
 from .. import models, schemas, crud
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..crud.crud_report import SALES_REP_ORDER_STATUS
+from ..crud.crud_sales_case import OPEN_CASE_STATUSES
+from ..database import SessionLocal, serialized_writes
 from ..models import UserRole, SalesCaseStatus
 
 # Exceções customizadas para um tratamento de erro mais claro no router
 class SalesCaseLogicError(ValueError): pass
 class SalesCaseAuthorizationError(PermissionError): pass
 
+class SalesCaseBulkError(SalesCaseLogicError):
+    """Falha de uma criação em lote 'all_or_nothing', com o detalhe de cada estojo recusado."""
+    def __init__(self, failures: List[schemas.SalesCaseBulkFailure]):
+        super().__init__(f"{len(failures)} sales case(s) could not be created.")
+        self.failures = failures
+
+# Resumos do painel por vendedora, com TTL curto (ver get_sales_rep_summary)
+sales_summary_cache = TTLCache(
+    ttl_seconds=settings.SALES_SUMMARY_CACHE_TTL_SECONDS,
+    max_size=settings.SALES_SUMMARY_CACHE_MAX_SIZE,
+)
+
 class SalesCaseService:
     def __init__(self, db: Session):
         self.db = db
 
+    @serialized_writes
     def create_new_case(self, *, case_create: schemas.SalesCaseCreate) -> models.SalesCase:
+        """
+        Cria um estojo e reserva o stock emprestado.
+        Todos os produtos do estojo são travados com uma única query
+        (`IN (...) ORDER BY id FOR UPDATE`) antes da validação de stock, para que
+        criações concorrentes não emprestem a mesma peça duas vezes.
+        """
         # --- FASE 1: VALIDAÇÕES DE NEGÓCIO ---
-        sales_rep = crud.crud_user.user.get(self.db, user_id=case_create.sales_rep_id)
+        sales_rep = crud.user.get(self.db, id=case_create.sales_rep_id)
         if not sales_rep or sales_rep.role != UserRole.SALES_REP:
             raise SalesCaseLogicError(f"Sales representative with id {case_create.sales_rep_id} not found or is not a sales_rep.")
 
-        products_to_loan = []
-        for item in case_create.items:
-            product = crud.crud_product.get_product(self.db, product_id=item.product_id)
-            if not product:
-                raise SalesCaseLogicError(f"Product with id {item.product_id} not found.")
-            
-            available_stock = product.stock_quantity - product.on_loan_quantity
-            if available_stock < item.quantity:
-                raise SalesCaseLogicError(f"Insufficient available stock for product '{product.name}'. Available: {available_stock}, Requested: {item.quantity}")
-            products_to_loan.append({"product": product, "quantity": item.quantity})
+        quantities = self._consolidate_items(case_create.items)
 
         # --- FASE 2: EXECUÇÃO TRANSACIONAL ---
         try:
+            stock_rows = crud.crud_product.get_stock_rows_for_update(self.db, product_ids=sorted(quantities))
+            self._validate_available_stock(stock_rows, quantities)
+
             return_by_date = datetime.utcnow() + timedelta(days=case_create.loan_duration_days)
             db_case = crud.sales_case.create_case(self.db, sales_rep_id=case_create.sales_rep_id, return_by_date=return_by_date)
+            crud.sales_case.create_items_bulk(self.db, case_id=db_case.id, quantities=quantities)
+            crud.crud_product.apply_stock_deltas(self.db, loan_deltas=quantities)
 
-            for item_data in products_to_loan:
-                product = item_data["product"]
-                quantity = item_data["quantity"]
-                crud.sales_case.create_item(self.db, case_id=db_case.id, product_id=product.id, quantity=quantity)
-                crud.crud_product.update_product(self.db, db_product=product, change_in_stock=0, change_in_loan=+quantity)
-            
             self.db.commit()
+            sales_summary_cache.invalidate(case_create.sales_rep_id)
             self.db.refresh(db_case)
             return db_case
+        except SalesCaseLogicError:
+            # Liberta os locks adquiridos antes de devolver o erro de negócio
+            self.db.rollback()
+            raise
         except Exception as e:
             self.db.rollback()
             raise SalesCaseLogicError(f"An unexpected error occurred during case creation: {e}")
 
-    def process_case_return(self, *, case_id: int, return_request: schemas.SalesCaseReturnRequest, current_user: models.User) -> schemas.SalesCaseReturnReport:
+    def get_sales_rep_summary(self, *, sales_rep_id: int) -> schemas.SalesRepSummary:
+        """
+        Resumo do painel da vendedora, calculado com duas queries agregadas
+        (estojos abertos e vendas do mês), independente do tamanho do histórico.
+        O resultado fica em cache por `SALES_SUMMARY_CACHE_TTL_SECONDS`.
+        """
+        cached = sales_summary_cache.get(sales_rep_id)
+        if cached is not None:
+            return cached
+
+        open_cases = crud.sales_case.get_open_cases_summary(self.db, sales_rep_id=sales_rep_id)
+        overdue = next((row for row in open_cases if row.status == SalesCaseStatus.OVERDUE), None)
+
+        now = datetime.utcnow()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        month_sales = crud.crud_order.get_sales_totals_for_user(
+            self.db, user_id=sales_rep_id, status=SALES_REP_ORDER_STATUS, since=month_start
+        )
+
+        summary = schemas.SalesRepSummary(
+            sales_rep_id=sales_rep_id,
+            open_cases=sum(row.case_count for row in open_cases),
+            overdue_cases=overdue.case_count if overdue else 0,
+            pieces_on_loan=sum(row.pieces for row in open_cases),
+            value_on_loan=sum((row.value for row in open_cases), 0),
+            overdue_pieces=overdue.pieces if overdue else 0,
+            month_orders=month_sales.order_count,
+            month_units_sold=month_sales.units,
+            month_value_sold=month_sales.value,
+            generated_at=now,
+        )
+        sales_summary_cache.set(sales_rep_id, summary)
+        return summary
+
+    @serialized_writes
+    def mark_overdue_cases(self) -> int:
+        """Passa a OVERDUE os estojos emprestados com o prazo de devolução ultrapassado."""
+        try:
+            affected = crud.sales_case.mark_overdue(self.db, now=datetime.utcnow())
+            self.db.commit()
+            return affected
+        except Exception:
+            self.db.rollback()
+            raise
+
+    @staticmethod
+    def _consolidate_items(items: List[schemas.SalesCaseItemCreate]) -> dict[int, int]:
+        """Soma as quantidades de linhas repetidas do mesmo produto: {product_id: quantidade}."""
+        quantities: dict[int, int] = {}
+        for item in items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        return quantities
+
+    @staticmethod
+    def _validate_available_stock(stock_rows, quantities: dict[int, int]) -> None:
+        """Valida existência e stock disponível (stock_quantity - on_loan_quantity) de cada produto."""
+        rows_by_id = {row.id: row for row in stock_rows}
+        for product_id, quantity in quantities.items():
+            row = rows_by_id.get(product_id)
+            if row is None:
+                raise SalesCaseLogicError(f"Product with id {product_id} not found.")
+            available_stock = row.stock_quantity - row.on_loan_quantity
+            if available_stock < quantity:
+                raise SalesCaseLogicError(f"Insufficient available stock for product '{row.name}'. Available: {available_stock}, Requested: {quantity}")
+
+    @serialized_writes
+    def create_cases_bulk(self, *, bulk_create: schemas.SalesCaseBulkCreate) -> schemas.SalesCaseBulkCreateResult:
+        """
+        Cria muitos estojos numa única transação (início de ciclo).
+        1. Valida todas as vendedoras com uma única query.
+        2. Trava a união de todos os produtos pedidos uma única vez.
+        3. Valida a procura agregada contra o stock disponível, alocando os
+           estojos pela ordem recebida (cada estojo só conta com o stock que
+           os anteriores deixaram):
+           - all_or_nothing: qualquer estojo recusado cancela o lote inteiro;
+           - partial: apenas os estojos recusados ficam de fora.
+        4. Cria estojos, itens e reservas de stock com operações em lote.
+        """
+        cases = bulk_create.cases
+        quantities_per_case = [self._consolidate_items(case.items) for case in cases]
+        valid_rep_ids = crud.user.get_ids_with_role(
+            self.db, ids=sorted({case.sales_rep_id for case in cases}), role=UserRole.SALES_REP
+        )
+        all_product_ids = sorted(set().union(*quantities_per_case))
+
+        try:
+            stock_rows = crud.crud_product.get_stock_rows_for_update(self.db, product_ids=all_product_ids)
+            rows_by_id = {row.id: row for row in stock_rows}
+            remaining = {row.id: row.stock_quantity - row.on_loan_quantity for row in stock_rows}
+
+            failures: List[schemas.SalesCaseBulkFailure] = []
+            accepted: List[int] = []
+            for index, (case, quantities) in enumerate(zip(cases, quantities_per_case)):
+                if case.sales_rep_id not in valid_rep_ids:
+                    detail = f"Sales representative with id {case.sales_rep_id} not found or is not a sales_rep."
+                else:
+                    detail = self._check_allocation(quantities, rows_by_id, remaining)
+                if detail:
+                    failures.append(schemas.SalesCaseBulkFailure(index=index, sales_rep_id=case.sales_rep_id, detail=detail))
+                    continue
+                # A procura acumulada dos estojos aceites vai consumindo o stock disponível
+                accepted.append(index)
+                for product_id, quantity in quantities.items():
+                    remaining[product_id] -= quantity
+
+            if failures and bulk_create.mode == "all_or_nothing":
+                raise SalesCaseBulkError(failures)
+
+            created_ids: List[int] = []
+            if accepted:
+                now = datetime.utcnow()
+                created_ids = crud.sales_case.create_cases_bulk(self.db, cases=[
+                    {
+                        "sales_rep_id": cases[index].sales_rep_id,
+                        "return_by_date": now + timedelta(days=cases[index].loan_duration_days),
+                    }
+                    for index in accepted
+                ])
+                crud.sales_case.create_items_bulk_for_cases(self.db, quantities_by_case={
+                    case_id: quantities_per_case[index] for case_id, index in zip(created_ids, accepted)
+                })
+                loan_deltas: dict[int, int] = {}
+                for index in accepted:
+                    for product_id, quantity in quantities_per_case[index].items():
+                        loan_deltas[product_id] = loan_deltas.get(product_id, 0) + quantity
+                crud.crud_product.apply_stock_deltas(self.db, loan_deltas=loan_deltas)
+
+            self.db.commit()
+            for index in accepted:
+                sales_summary_cache.invalidate(cases[index].sales_rep_id)
+
+            created_cases = crud.sales_case.get_many(self.db, case_ids=created_ids)
+            return schemas.SalesCaseBulkCreateResult(
+                created=[schemas.SalesCaseResponse.model_validate(db_case) for db_case in created_cases],
+                failed=failures,
+            )
+        except SalesCaseLogicError:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise SalesCaseLogicError(f"An unexpected error occurred during bulk case creation: {e}")
+
+    @staticmethod
+    def _check_allocation(quantities: dict[int, int], rows_by_id: dict, remaining: dict[int, int]) -> str | None:
+        """Verifica se um estojo cabe no stock ainda por alocar no lote. Devolve a mensagem de erro, ou None."""
+        for product_id, quantity in quantities.items():
+            row = rows_by_id.get(product_id)
+            if row is None:
+                return f"Product with id {product_id} not found."
+            if remaining[product_id] < quantity:
+                return f"Insufficient available stock for product '{row.name}'. Available: {remaining[product_id]}, Requested: {quantity}"
+        return None
+
+    @serialized_writes
+    def process_case_return(self, *, case_id: int, return_request: schemas.SalesCaseReturnRequest, current_user: schemas.User) -> schemas.SalesCaseReturnReport:
+        """
+        Liquida a devolução de um estojo com um número fixo de queries,
+        independentemente do número de peças:
+        1. Uma query trava e lê todos os produtos do estojo.
+        2. Um UPDATE set-based aplica as variações de stock e de stock em estojos.
+        3. Um INSERT multi-linha cria os itens da encomenda gerada.
+        """
         # --- FASE 1: VALIDAÇÕES DE NEGÓCIO E AUTORIZAÇÃO ---
         db_case = crud.sales_case.get(self.db, case_id=case_id)
         if not db_case:
             raise SalesCaseLogicError("Sales case not found.")
-        if db_case.status != SalesCaseStatus.ON_LOAN:
-            raise SalesCaseLogicError(f"Sales case is not in '{SalesCaseStatus.ON_LOAN.value}' status.")
+        if db_case.status not in OPEN_CASE_STATUSES:
+            raise SalesCaseLogicError(f"Sales case is not in '{SalesCaseStatus.ON_LOAN.value}' or '{SalesCaseStatus.OVERDUE.value}' status.")
         if current_user.role == UserRole.SALES_REP and db_case.sales_rep_id != current_user.id:
             raise SalesCaseAuthorizationError("Not authorized to return this sales case.")
 
-        loaned_items_map = {item.product_id: item.quantity for item in db_case.items}
-        items_sold_map = {item.product_id: item.quantity_sold for item in return_request.items_sold}
-        
+        loaned_items_map: dict[int, int] = {}
+        for item in db_case.items:
+            loaned_items_map[item.product_id] = loaned_items_map.get(item.product_id, 0) + item.quantity
+        items_sold_map: dict[int, int] = {}
+        for item in return_request.items_sold:
+            items_sold_map[item.product_id] = items_sold_map.get(item.product_id, 0) + item.quantity_sold
+
         for product_id, quantity_sold in items_sold_map.items():
             if quantity_sold > loaned_items_map.get(product_id, 0):
                 raise SalesCaseLogicError(f"Cannot sell more items than were loaned for product ID {product_id}.")
 
+        sales_rep_id = db_case.sales_rep_id
+
         # --- FASE 2: EXECUÇÃO TRANSACIONAL ---
         try:
+            # Guarda contra devoluções concorrentes do mesmo estojo
+            if not crud.sales_case.mark_returned(self.db, case_id=case_id):
+                raise SalesCaseLogicError("Sales case was already returned.")
+
+            stock_rows = crud.crud_product.get_stock_rows_for_update(self.db, product_ids=sorted(loaned_items_map))
+            rows_by_id = {row.id: row for row in stock_rows}
+            for product_id in loaned_items_map:
+                if product_id not in rows_by_id:
+                    raise SalesCaseLogicError(f"Product with ID {product_id} from case seems to be missing.")
+
             items_summary_report = []
+            order_items = []
             total_items_sold = 0
             total_value_sold = 0.0
-            
+
             for product_id, quantity_loaned in loaned_items_map.items():
+                row = rows_by_id[product_id]
                 quantity_sold = items_sold_map.get(product_id, 0)
-                product = crud.crud_product.get_product(self.db, product_id=product_id)
-                crud.product.update_stock(self.db, db_product=product, change_in_stock=-quantity_sold, change_in_loan=-quantity_loaned)
-                
-                subtotal = quantity_sold * float(product.price)
+                subtotal = quantity_sold * float(row.selling_price)
                 items_summary_report.append(schemas.ItemReturnSummary(
-                    product_name=product.name, quantity_loaned=quantity_loaned, quantity_sold=quantity_sold,
-                    quantity_returned=quantity_loaned - quantity_sold, price_per_item=float(product.price), subtotal_sold=subtotal
+                    product_name=row.name, quantity_loaned=quantity_loaned, quantity_sold=quantity_sold,
+                    quantity_returned=quantity_loaned - quantity_sold, price_per_item=float(row.selling_price), subtotal_sold=subtotal
                 ))
+                if quantity_sold > 0:
+                    order_items.append({"product_id": product_id, "quantity": quantity_sold, "price_at_purchase": row.selling_price})
                 total_items_sold += quantity_sold
                 total_value_sold += subtotal
-            
+
+            crud.crud_product.apply_stock_deltas(
+                self.db,
+                stock_deltas={product_id: -quantity for product_id, quantity in items_sold_map.items()},
+                loan_deltas={product_id: -quantity for product_id, quantity in loaned_items_map.items()},
+            )
+
             new_order_id = None
-            if total_items_sold > 0:
-                new_order = crud.crud_order.create_order(self.db, user_id=db_case.sales_rep_id, status="completed_by_sales_rep")
-                for item_sold in return_request.items_sold:
-                    if item_sold.quantity_sold > 0:
-                        product = crud.product.get(self.db, product_id=item_sold.product_id)
-                        crud.order.create_order_item(self.db, order_id=new_order.id, product_id=item_sold.product_id, 
-                                                     quantity=item_sold.quantity_sold, price_at_purchase=product.price)
+            if order_items:
+                new_order = crud.crud_order.create_order(self.db, user_id=sales_rep_id, status="completed_by_sales_rep")
+                crud.crud_order.create_order_items_bulk(self.db, order_id=new_order.id, items=order_items)
                 new_order_id = new_order.id
 
-            crud.crud_sales_case.sales_case.update_status(self.db, db_case=db_case, status=SalesCaseStatus.RETURNED)
             self.db.commit()
+            sales_summary_cache.invalidate(sales_rep_id)
 
             return schemas.SalesCaseReturnReport(
-                case_id=case_id, new_order_id=new_order_id, sales_rep_id=db_case.sales_rep_id, date_returned=datetime.utcnow(),
+                case_id=case_id, new_order_id=new_order_id, sales_rep_id=sales_rep_id, date_returned=datetime.utcnow(),
                 total_items_sold=total_items_sold, total_value_sold=total_value_sold, items_summary=items_summary_report
             )
+        except SalesCaseLogicError:
+            self.db.rollback()
+            raise
         except Exception as e:
             self.db.rollback()
-            raise SalesCaseLogicError(f"An unexpected error occurred during case return processing: {e}")
\ No newline at end of file
+            raise SalesCaseLogicError(f"An unexpected error occurred during case return processing: {e}")
+
+
+def run_overdue_sweep_job() -> int:
+    """Ponto de entrada do job agendado: abre a sua própria sessão."""
+    with SessionLocal() as db:
+        return SalesCaseService(db).mark_overdue_cases()
@@ -0,0 +1,73 @@
+# NOVO ARQUIVO: app/services/sync_service.py
+
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .. import schemas, crud
+from ..core.config import settings
+from .pricing_engine import PricingEngine
+
+class SyncTokenError(ValueError): pass
+
+class SyncService:
+    """
+    Pacotes de sincronização incremental para as vendedoras (app offline).
+    O token é opaco para o cliente e guarda o instante (hora do banco) em que
+    a sincronização anterior começou a ler.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+        self.pricing_engine = PricingEngine(db)
+
+    def build_bundle(self, *, sales_rep_id: int, since_token: Optional[str] = None) -> schemas.SalesCaseSyncBundle:
+        since = self._decode_token(since_token) if since_token else None
+        # Hora do banco ANTES das leituras: o que mudar durante esta sincronização entra na próxima
+        started_at = self.db.query(func.now()).scalar()
+        changed_since = since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS) if since else None
+
+        cases = crud.sales_case.get_changed_for_rep(self.db, sales_rep_id=sales_rep_id, since=changed_since)
+
+        # Produtos a enviar: os dos estojos alterados (o cliente pode ainda não os ter)
+        # e, dos estojos abertos, os que mudaram ou cujo desconto começou/terminou.
+        case_product_ids = {item.product_id for case in cases for item in case.items}
+        product_rows = crud.crud_product.get_sync_rows(self.db, product_ids=sorted(case_product_ids))
+        if changed_since is not None:
+            open_product_ids = crud.sales_case.get_open_product_ids_for_rep(self.db, sales_rep_id=sales_rep_id) - case_product_ids
+            repriced_ids = crud.discount.get_product_ids_with_price_changes(
+                self.db, product_ids=sorted(open_product_ids), since=changed_since, until=started_at
+            )
+            product_rows += crud.crud_product.get_sync_rows(
+                self.db, product_ids=sorted(open_product_ids - repriced_ids), changed_since=changed_since
+            )
+            product_rows += crud.crud_product.get_sync_rows(self.db, product_ids=sorted(repriced_ids))
+
+        current_prices = self.pricing_engine.get_current_prices(
+            base_prices={row.id: row.selling_price for row in product_rows}
+        )
+        return schemas.SalesCaseSyncBundle(
+            sync_token=self._encode_token(started_at),
+            full=since is None,
+            cases=[schemas.SyncSalesCase.model_validate(case) for case in cases],
+            products=[
+                schemas.SyncProduct(**row._asdict(), current_price=current_prices[row.id])
+                for row in product_rows
+            ],
+        )
+
+    @staticmethod
+    def _encode_token(moment: datetime) -> str:
+        payload = json.dumps({"ts": moment.isoformat()}).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_token(token: str) -> datetime:
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return datetime.fromisoformat(payload["ts"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise SyncTokenError(f"Invalid sync token: {e}")
@@ -0,0 +1,78 @@
+# NOVO ARQUIVO: app/services/user_service.py
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import schemas, crud, security
+from ..core.config import settings
+
+class UserBulkError(ValueError): pass
+
+class UserService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def partition_bulk(
+        self, *, bulk_create: schemas.UserBulkCreate
+    ) -> tuple[list[schemas.UserCreate], list[schemas.UserBulkSkipped]]:
+        """Separa os utilizadores a criar dos ignorados (email já registado ou repetido no pedido)."""
+        users = bulk_create.users
+        if len(users) > settings.USER_BULK_MAX_SIZE:
+            raise UserBulkError(f"A bulk registration accepts at most {settings.USER_BULK_MAX_SIZE} users.")
+
+        existing = crud.user.get_existing_emails(self.db, emails=sorted({u.email for u in users}))
+        skipped, to_create, seen = [], [], set()
+        for index, user_in in enumerate(users):
+            if user_in.email in existing:
+                skipped.append(schemas.UserBulkSkipped(index=index, email=user_in.email, detail="Email already registered"))
+            elif user_in.email in seen:
+                skipped.append(schemas.UserBulkSkipped(index=index, email=user_in.email, detail="Duplicate email in request"))
+            else:
+                seen.add(user_in.email)
+                to_create.append(user_in)
+        return to_create, skipped
+
+    def insert_bulk(
+        self,
+        *,
+        to_create: list[schemas.UserCreate],
+        hashes: list[str],
+        skipped: list[schemas.UserBulkSkipped],
+    ) -> schemas.UserBulkCreateResult:
+        """Insere os utilizadores já com os hashes calculados, numa única transação."""
+        rows = [
+            {**user_in.model_dump(exclude={"password"}), "hashed_password": hashed}
+            for user_in, hashed in zip(to_create, hashes)
+        ]
+        try:
+            created = crud.user.create_bulk(self.db, rows=rows)
+            self.db.commit()
+        except IntegrityError:
+            # Um registo concorrente usou um dos emails entre a verificação e o INSERT
+            self.db.rollback()
+            raise UserBulkError("Some emails were registered concurrently; please retry.")
+
+        return schemas.UserBulkCreateResult(
+            created=[schemas.User.model_validate(row) for row in created],
+            skipped=skipped,
+        )
+
+async def create_users_bulk_async(db: AsyncSession, *, bulk_create: schemas.UserBulkCreate) -> schemas.UserBulkCreateResult:
+    """
+    Regista muitos utilizadores de uma vez (ex: vendedoras de uma nova região).
+
+    Emails já registados ou repetidos no pedido são ignorados e reportados
+    em `skipped`; os restantes são criados numa única transação:
+    1 query IN para os duplicados, hashes em paralelo (pool de processos)
+    e INSERTs multi-linha. As queries correm na sessão assíncrona e, durante
+    os hashes (que podem levar dezenas de segundos), o pedido só espera no
+    event loop, sem prender uma thread da threadpool nem uma conexão do banco.
+    """
+    to_create, skipped = await db.run_sync(lambda session: UserService(session).partition_bulk(bulk_create=bulk_create))
+    # Fecha a transação de leitura antes da espera longa pelos hashes
+    await db.rollback()
+    hashes = await security.get_password_hashes_parallel_async([u.password for u in to_create])
+    return await db.run_sync(
+        lambda session: UserService(session).insert_bulk(to_create=to_create, hashes=hashes, skipped=skipped)
+    )
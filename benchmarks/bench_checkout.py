@@ -0,0 +1,82 @@
+# benchmarks/bench_checkout.py
+"""
+Benchmark do checkout em lotes (OrderService.create_customer_order).
+
+Cria um catálogo numa base SQLite em memória e mede o tempo de checkout
+para carrinhos de tamanhos crescentes. O tempo por linha deve manter-se
+aproximadamente constante (escala linear), já que cada lote custa um número
+fixo de queries independentemente do tamanho do carrinho.
+
+Uso:
+    python -m benchmarks.bench_checkout [--sizes 250 500 1000 2000 4000] [--repeat 3]
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models, schemas
+from app.core.config import settings
+from app.database import Base
+from app.services.order_service import OrderService
+
+
+def _setup(max_products: int):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.execute(
+            insert(models.User),
+            [{"email": "bench@cidajoias.local", "hashed_password": "x", "role": models.UserRole.CUSTOMER}],
+        )
+        db.execute(
+            insert(models.Product),
+            [
+                {
+                    "name": f"Peça {i}",
+                    "selling_price": Decimal("100.00"),
+                    "cost_price": Decimal("40.00"),
+                    "stock_quantity": 1_000_000,
+                    "on_loan_quantity": 0,
+                }
+                for i in range(max_products)
+            ],
+        )
+        db.commit()
+    return Session
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000, 2000, 4000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    settings.MAX_ORDER_LINES = max(settings.MAX_ORDER_LINES, max(args.sizes))
+    Session = _setup(max(args.sizes))
+
+    print(f"chunk_size={settings.CHECKOUT_CHUNK_SIZE}")
+    print(f"{'linhas':>8} {'melhor (ms)':>12} {'ms/linha':>10}")
+    for size in args.sizes:
+        checkout = schemas.CheckoutRequest(
+            items=[schemas.CheckoutItem(product_id=pid, quantity=1) for pid in range(1, size + 1)]
+        )
+        timings = []
+        for _ in range(args.repeat):
+            with Session() as db:
+                user = db.get(models.User, 1)
+                start = time.perf_counter()
+                OrderService(db).create_customer_order(user=user, checkout_request=checkout)
+                timings.append(time.perf_counter() - start)
+        best_ms = min(timings) * 1000
+        print(f"{size:>8} {best_ms:>12.1f} {best_ms / size:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# benchmarks/bench_query_plans.py
+"""
+Planos de execução das queries quentes antes e depois dos índices de
+`e7a2c9d4b6f1` (histórico de encomendas, totais por utilizador, itens de
+estojos, totais em estojo por produto e preço promocional ativo).
+
+Popula uma base SQLite em memória, corre cada query com e sem os índices
+novos e mostra o `EXPLAIN QUERY PLAN` de cada statement emitido e o melhor
+tempo. O cenário "sem índices" repõe o antigo `ix_discounts_product_id`, que
+a migração remove. Sem os índices, os planos mostram `SCAN <tabela>`; com
+eles, passam a `SEARCH <tabela> USING [COVERING] INDEX ...`.
+
+Uso:
+    python -m benchmarks.bench_query_plans [--customers 200] [--orders-per-customer 50] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import crud, models
+from app.database import Base
+
+# Índices introduzidos por e7a2c9d4b6f1 (removidos para o cenário "sem índices")
+HOT_PATH_INDEXES = {
+    "ix_orders_user_id_id",
+    "ix_orders_user_status_created_at",
+    "ix_order_items_order_id_id",
+    "ix_order_items_product_id",
+    "ix_sales_case_items_case_id",
+    "ix_sales_case_items_product_id_case_id",
+    "ix_discounts_product_active_price",
+}
+
+# Índice de coluna única que e7a2c9d4b6f1 remove (coberto pelo composto de discounts)
+# (DDL à parte para não o registar em Base.metadata)
+LEGACY_INDEXES = {"ix_discounts_product_id": "discounts (product_id)"}
+
+PRODUCTS = 500
+SALES_REPS = 20
+CASES_PER_REP = 50
+ITEMS_PER_CASE = 10
+
+
+def _hot_path_indexes():
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.name in HOT_PATH_INDEXES
+    ]
+
+
+def _execute_ddl(engine, statements: list[str]) -> None:
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def _setup(customers: int, orders_per_customer: int):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with Session() as db:
+        db.execute(
+            insert(models.User),
+            [
+                {"email": f"cliente{i}@cidajoias.local", "hashed_password": "x", "role": models.UserRole.CUSTOMER}
+                for i in range(customers)
+            ]
+            + [
+                {"email": f"vendedora{i}@cidajoias.local", "hashed_password": "x", "role": models.UserRole.SALES_REP}
+                for i in range(SALES_REPS)
+            ],
+        )
+        db.execute(
+            insert(models.Product),
+            [
+                {
+                    "name": f"Peça {i}",
+                    "selling_price": Decimal("100.00"),
+                    "cost_price": Decimal("40.00"),
+                    "stock_quantity": 1_000,
+                    "on_loan_quantity": 0,
+                }
+                for i in range(PRODUCTS)
+            ],
+        )
+        db.execute(
+            insert(models.Discount),
+            [
+                {
+                    "product_id": product_id,
+                    "discount_price": Decimal(rng.randint(50, 95)),
+                    "start_time": now + timedelta(days=offset - 3),
+                    "end_time": now + timedelta(days=offset + 3),
+                }
+                for product_id in range(1, PRODUCTS + 1)
+                for offset in (-10, 0, 10)
+            ],
+        )
+
+        order_rows = [
+            {
+                "user_id": user_id,
+                "status": rng.choice(["pending", "completed"]),
+                "created_at": now - timedelta(days=rng.randint(0, 365)),
+            }
+            for user_id in range(1, customers + 1)
+            for _ in range(orders_per_customer)
+        ]
+        db.execute(insert(models.Order), order_rows)
+        db.execute(
+            insert(models.OrderItem),
+            [
+                {
+                    "order_id": order_id,
+                    "product_id": rng.randint(1, PRODUCTS),
+                    "quantity": rng.randint(1, 3),
+                    "price_at_purchase": Decimal("100.00"),
+                }
+                for order_id in range(1, len(order_rows) + 1)
+                for _ in range(3)
+            ],
+        )
+
+        rep_ids = range(customers + 1, customers + SALES_REPS + 1)
+        case_rows = [
+            {
+                "sales_rep_id": rep_id,
+                "return_by_date": now + timedelta(days=rng.randint(-30, 30)),
+                "status": rng.choice(list(models.SalesCaseStatus)),
+            }
+            for rep_id in rep_ids
+            for _ in range(CASES_PER_REP)
+        ]
+        db.execute(insert(models.SalesCase), case_rows)
+        db.execute(
+            insert(models.SalesCaseItem),
+            [
+                {"case_id": case_id, "product_id": rng.randint(1, PRODUCTS), "quantity": rng.randint(1, 5)}
+                for case_id in range(1, len(case_rows) + 1)
+                for _ in range(ITEMS_PER_CASE)
+            ],
+        )
+        db.commit()
+    return engine, Session
+
+
+def _queries(customers: int):
+    rep_id = customers + 1
+    since = datetime.utcnow() - timedelta(days=30)
+    product_ids = list(range(1, 101))
+    return [
+        ("crud.get_orders_by_user", lambda db: crud.get_orders_by_user(db, user_id=1)),
+        (
+            "crud.get_sales_totals_for_user",
+            lambda db: crud.get_sales_totals_for_user(db, user_id=1, status="completed", since=since),
+        ),
+        ("sales_case.get_changed_for_rep", lambda db: crud.sales_case.get_changed_for_rep(db, sales_rep_id=rep_id, since=None)),
+        ("sales_case.get_on_loan_totals", lambda db: crud.sales_case.get_on_loan_totals(db, product_ids=product_ids)),
+        ("discount.get_active_for_product", lambda db: crud.discount.get_active_for_product(db, product_id=7)),
+        (
+            "discount.get_active_prices_for_products",
+            lambda db: crud.discount.get_active_prices_for_products(db, product_ids=product_ids),
+        ),
+    ]
+
+
+class _PlanCapture:
+    """Regista o EXPLAIN QUERY PLAN de cada statement enquanto `active`."""
+
+    def __init__(self, engine):
+        self.active = False
+        self.plans: list[list[str]] = []
+        event.listen(engine, "before_cursor_execute", self._explain)
+
+    def _explain(self, conn, cursor, statement, parameters, context, executemany):
+        if not self.active or executemany:
+            return
+        rows = cursor.connection.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        self.plans.append([row[3] for row in rows])
+
+
+def _run(label: str, engine, Session, capture: _PlanCapture, customers: int, repeat: int) -> None:
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+    print(f"\n=== {label} ===")
+    for name, query in _queries(customers):
+        capture.active, capture.plans = True, []
+        with Session() as db:
+            query(db)
+        capture.active = False
+
+        timings = []
+        for _ in range(repeat):
+            with Session() as db:
+                start = time.perf_counter()
+                query(db)
+                timings.append(time.perf_counter() - start)
+        print(f"{name} — melhor {min(timings) * 1000:.2f} ms")
+        for plan in capture.plans:
+            for detail in plan:
+                print(f"    {detail}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--orders-per-customer", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, Session = _setup(args.customers, args.orders_per_customer)
+    capture = _PlanCapture(engine)
+    indexes = _hot_path_indexes()
+
+    for index in indexes:
+        index.drop(bind=engine)
+    _execute_ddl(engine, [f"CREATE INDEX {name} ON {target}" for name, target in LEGACY_INDEXES.items()])
+    _run("sem índices", engine, Session, capture, args.customers, args.repeat)
+
+    _execute_ddl(engine, [f"DROP INDEX {name}" for name in LEGACY_INDEXES])
+    for index in indexes:
+        index.create(bind=engine)
+    _run("com índices", engine, Session, capture, args.customers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import sessionmaker,Session
 from typing import Generator
 
@@ -16,10 +18,26 @@ def override_settings():
     settings.DATABASE_URL = "sqlite:///./test.db"
     # Você pode sobrescrever outras configs aqui se necessário para os testes
     settings.SECRET_KEY = "test-secret"
+    # Os jobs em background não devem correr durante os testes
+    settings.SCHEDULER_ENABLED = False
+    settings.PASSWORD_HASH_BENCHMARK_ON_STARTUP = False
+    # Rotas acima do seu orçamento de queries falham o teste (em vez de só avisar).
+    # Os orçamentos não dependem do número de itens: um N+1 (preços por item,
+    # lazy loads dos itens do estojo, acerto da devolução) rebenta-os.
+    settings.QUERY_BUDGET_STRICT = True
+    settings.QUERY_BUDGETS = {
+        "POST /orders/pedidos": 8,
+        "GET /sales-cases/": 3,
+        "POST /sales-cases/{case_id}/return": 6,
+    }
 
 # Agora que as settings foram sobrescritas, podemos importar o resto com segurança
 from app.main import app
-from app.database import Base, get_db
+from app.core.query_stats import instrument_engine
+from app.database import (
+    Base, RoutingSession, get_async_db, get_async_read_db, get_async_session_factory, get_db, get_read_db,
+    to_async_url,
+)
 
 # --- 2. Configuração do Banco de Dados de Teste ---
 # O engine agora lê a URL já sobrescrita
@@ -28,6 +46,16 @@ engine = create_engine(
     settings.DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Engine assíncrono sobre o MESMO banco de teste, para os endpoints `async def`
+# (get_async_db/get_async_read_db). NullPool: cada TestClient corre no seu
+# próprio event loop, por isso não reaproveitamos conexões entre loops.
+async_engine = create_async_engine(to_async_url(str(engine.url)), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
+# Os engines de teste também contam queries por pedido, para os orçamentos abaixo
+instrument_engine(engine)
+instrument_engine(async_engine)
 
 # --- 3. Fixtures do Pytest (quase inalteradas) ---
 
@@ -51,7 +79,15 @@ def client(db_session: Session) -> Generator:
     def override_get_db():
         yield db_session
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
 
     yield TestClient(app)
 
@@ -0,0 +1,62 @@
+# NOVO ARQUIVO: tests/integration/test_async_read_endpoints.py
+
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+
+
+def _login(client: TestClient, db: Session, *, email: str, password: str = "segredo-123") -> dict[str, str]:
+    crud.user.create(db=db, obj_in=schemas.UserCreate(email=email, password=password))
+    response = client.post("/token", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_product_list_reads_test_database_through_async_session(client: TestClient, db_session: Session):
+    """GET /products/ corre sobre a sessão assíncrona e vê os dados do banco de teste."""
+    # --- Arrange ---
+    product = crud.crud_product.create_product(
+        db_session,
+        schemas.ProductCreate(name="Anel", selling_price=Decimal("120.00"), cost_price=Decimal("40.00"), stock_quantity=5),
+    )
+    crud.discount.create(
+        db_session,
+        obj_in=schemas.DiscountCreate(product_id=product.id, discount_price=Decimal("99.90"), end_time="2999-01-01T00:00:00"),
+    )
+
+    # --- Act ---
+    response = client.get("/products/")
+
+    # --- Assert ---
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data] == [product.id]
+    assert Decimal(data[0]["current_price"]) == Decimal("99.90")
+
+
+def test_login_and_order_history_go_through_async_path(client: TestClient, db_session: Session):
+    """/token e /orders/meus-pedidos usam a sessão assíncrona sobre o mesmo banco de teste."""
+    # --- Arrange ---
+    headers = _login(client, db_session, email="cliente@cidajoias.pt")
+    user = crud.user.get_by_email(db_session, email="cliente@cidajoias.pt")
+    product = crud.crud_product.create_product(
+        db_session,
+        schemas.ProductCreate(name="Colar", selling_price=Decimal("80.00"), cost_price=Decimal("30.00"), stock_quantity=5),
+    )
+    order = crud.crud_order.create_order(db_session, user_id=user.id, status="pending")
+    crud.crud_order.create_order_item(
+        db_session, order_id=order.id, product_id=product.id, quantity=2, price_at_purchase=Decimal("80.00")
+    )
+    db_session.commit()
+
+    # --- Act ---
+    response = client.get("/orders/meus-pedidos", headers=headers)
+
+    # --- Assert ---
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data] == [order.id]
+    assert data[0]["items"][0]["quantity"] == 2
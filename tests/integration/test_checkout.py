@@ -0,0 +1,67 @@
+# NOVO ARQUIVO: tests/integration/test_checkout.py
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.query_stats import QueryBudgetExceeded
+from app.models import UserRole
+from tests.utils.sales_case import create_product, create_user_with_role, login_headers
+
+
+def _seed_cart(db: Session, *, size: int) -> list[models.Product]:
+    """Produtos para um carrinho de `size` itens; o primeiro tem um desconto ativo."""
+    products = [create_product(db, name=f"Peça {i}", selling_price="100.00") for i in range(size)]
+    db.add(models.Discount(
+        product_id=products[0].id, discount_price=Decimal("75.00"),
+        start_time=datetime.utcnow() - timedelta(hours=1), end_time=datetime.utcnow() + timedelta(days=1),
+    ))
+    db.commit()
+    return products
+
+
+def test_checkout_with_many_items_prices_and_reserves_within_query_budget(client: TestClient, db_session: Session):
+    """
+    Um carrinho com vários produtos (um em promoção) fica dentro do orçamento
+    de queries de POST /orders/pedidos, regista o preço de cada item e baixa o stock.
+    """
+    # --- Arrange ---
+    create_user_with_role(db_session, email="cliente@cida.pt", role=UserRole.CUSTOMER)
+    products = _seed_cart(db_session, size=6)
+    headers = login_headers(client, email="cliente@cida.pt")
+
+    # --- Act ---
+    response = client.post(
+        "/orders/pedidos",
+        json={"items": [{"product_id": product.id, "quantity": 2} for product in products]},
+        headers=headers,
+    )
+
+    # --- Assert ---
+    assert response.status_code == 201
+    prices = {item["product_id"]: Decimal(str(item["price_at_purchase"])) for item in response.json()["items"]}
+    assert prices == {product.id: Decimal("75.00") if index == 0 else Decimal("100.00") for index, product in enumerate(products)}
+    db_session.expire_all()
+    assert {product.stock_quantity for product in db_session.query(models.Product)} == {48}
+
+
+def test_route_over_its_query_budget_fails_in_tests(client: TestClient, db_session: Session, mocker):
+    """Com QUERY_BUDGET_STRICT, uma rota acima do orçamento rebenta o pedido em vez de só avisar."""
+    # --- Arrange ---
+    create_user_with_role(db_session, email="cliente@cida.pt", role=UserRole.CUSTOMER)
+    products = _seed_cart(db_session, size=2)
+    headers = login_headers(client, email="cliente@cida.pt")
+    mocker.patch.dict(settings.QUERY_BUDGETS, {"POST /orders/pedidos": 1})
+
+    # --- Act & Assert ---
+    with pytest.raises(QueryBudgetExceeded):
+        client.post(
+            "/orders/pedidos",
+            json={"items": [{"product_id": product.id, "quantity": 1} for product in products]},
+            headers=headers,
+        )
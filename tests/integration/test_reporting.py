@@ -0,0 +1,143 @@
+# NOVO ARQUIVO: tests/integration/test_reporting.py
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.config import settings
+from app.crud.crud_report import SALES_REP_ORDER_STATUS
+from app.models import UserRole
+from app.services.reporting_service import ReportingService
+from tests.utils.sales_case import create_product, create_user_with_role, login_headers
+
+
+def _create_order(db: Session, *, user_id: int, product_id: int, quantity: int, created_at: datetime,
+                  price: str = "10.00", status: str = "pending") -> int:
+    """Encomenda com um item e `created_at` explícito (UTC)."""
+    order = models.Order(user_id=user_id, status=status, created_at=created_at)
+    db.add(order)
+    db.flush()
+    db.add(models.OrderItem(order_id=order.id, product_id=product_id, quantity=quantity, price_at_purchase=Decimal(price)))
+    db.commit()
+    return order.id
+
+
+def _product_rollup(db: Session) -> dict:
+    db.expire_all()
+    return {(row.day, row.product_id): (row.units_sold, row.revenue) for row in db.query(models.DailyProductSales)}
+
+
+def _seed(db: Session):
+    rep = create_user_with_role(db, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    product = create_product(db, name="Anel")
+    return rep.id, product.id
+
+
+def test_refresh_advances_watermark_up_to_the_safety_lag_cutoff(db_session: Session):
+    """Encomendas mais novas do que REPORTS_ROLLUP_SAFETY_LAG_SECONDS ficam para a próxima execução."""
+    # --- Arrange ---
+    rep_id, product_id = _seed(db_session)
+    old = datetime.utcnow() - timedelta(hours=2)
+    mature = [_create_order(db_session, user_id=rep_id, product_id=product_id, quantity=1, created_at=old) for _ in range(2)]
+    _create_order(
+        db_session, user_id=rep_id, product_id=product_id, quantity=1,
+        created_at=datetime.utcnow() - timedelta(seconds=settings.REPORTS_ROLLUP_SAFETY_LAG_SECONDS / 2),
+    )
+
+    # --- Act ---
+    processed = ReportingService(db_session).refresh_sales_rollups()
+
+    # --- Assert ---
+    assert processed == 2
+    assert crud.report.get_watermark(db_session).last_order_id == mature[-1]
+    assert _product_rollup(db_session) == {(old.date(), product_id): (2, Decimal("20.00"))}
+
+
+def test_refresh_batch_stops_at_batch_size_and_run_drains_all_batches(db_session: Session):
+    """Cada lote agrega no máximo `batch_size` encomendas; a execução repete lotes até esvaziar a fila."""
+    # --- Arrange ---
+    rep_id, product_id = _seed(db_session)
+    old = datetime.utcnow() - timedelta(hours=2)
+    order_ids = [_create_order(db_session, user_id=rep_id, product_id=product_id, quantity=1, created_at=old) for _ in range(5)]
+    service = ReportingService(db_session)
+
+    # --- Act ---
+    first_batch = service._refresh_batch(batch_size=2)
+    watermark_after_batch = crud.report.get_watermark(db_session).last_order_id
+    rest = service.refresh_sales_rollups(batch_size=2)
+
+    # --- Assert ---
+    assert (first_batch, watermark_after_batch) == (2, order_ids[1])
+    assert rest == 3
+    assert crud.report.get_watermark(db_session).last_order_id == order_ids[-1]
+    assert _product_rollup(db_session) == {(old.date(), product_id): (5, Decimal("50.00"))}
+
+
+def test_rollup_upsert_is_additive_across_runs(db_session: Session):
+    """Uma segunda execução soma às linhas do mesmo dia/produto/vendedora em vez de as substituir."""
+    # --- Arrange ---
+    rep_id, product_id = _seed(db_session)
+    day = datetime.utcnow() - timedelta(hours=2)
+    _create_order(db_session, user_id=rep_id, product_id=product_id, quantity=2, created_at=day, status=SALES_REP_ORDER_STATUS)
+    ReportingService(db_session).refresh_sales_rollups()
+    _create_order(db_session, user_id=rep_id, product_id=product_id, quantity=3, created_at=day, status=SALES_REP_ORDER_STATUS)
+
+    # --- Act ---
+    ReportingService(db_session).refresh_sales_rollups()
+
+    # --- Assert ---
+    assert _product_rollup(db_session) == {(day.date(), product_id): (5, Decimal("50.00"))}
+    rep_row = db_session.query(models.DailySalesRepSales).one()
+    assert (rep_row.order_count, rep_row.units_sold, rep_row.revenue) == (2, 5, Decimal("50.00"))
+
+
+def test_rollup_upsert_falls_back_to_select_for_dialects_without_on_conflict(db_session: Session, mocker):
+    """Sem `ON CONFLICT` no dialeto, o upsert lê e soma pelo ORM, com o mesmo resultado."""
+    # --- Arrange ---
+    mocker.patch("app.crud.crud_report._dialect_insert", return_value=None)
+    rep_id, product_id = _seed(db_session)
+    day = datetime.utcnow() - timedelta(hours=2)
+    _create_order(db_session, user_id=rep_id, product_id=product_id, quantity=2, created_at=day)
+    ReportingService(db_session).refresh_sales_rollups()
+    _create_order(db_session, user_id=rep_id, product_id=product_id, quantity=1, created_at=day)
+
+    # --- Act ---
+    ReportingService(db_session).refresh_sales_rollups()
+
+    # --- Assert ---
+    assert _product_rollup(db_session) == {(day.date(), product_id): (3, Decimal("30.00"))}
+
+
+def test_sales_report_endpoint_reads_rollups(client: TestClient, db_session: Session):
+    """GET /reports/sales devolve os totais dos rollups e até que encomenda estão atualizados."""
+    # --- Arrange ---
+    rep_id, product_id = _seed(db_session)
+    day = datetime.utcnow() - timedelta(hours=2)
+    last_id = _create_order(db_session, user_id=rep_id, product_id=product_id, quantity=4, created_at=day, price="25.00")
+    ReportingService(db_session).refresh_sales_rollups()
+    create_user_with_role(db_session, email="admin@cida.pt", role=UserRole.ADMIN)
+    headers = login_headers(client, email="admin@cida.pt")
+
+    # --- Act ---
+    response = client.get(
+        "/reports/sales",
+        params={"from": day.date().isoformat(), "to": day.date().isoformat(), "group_by": "product"},
+        headers=headers,
+    )
+    forbidden = client.get(
+        "/reports/sales",
+        params={"from": day.date().isoformat(), "to": day.date().isoformat()},
+        headers=login_headers(client, email="vendedora@cida.pt"),
+    )
+
+    # --- Assert ---
+    assert response.status_code == 200
+    data = response.json()
+    assert data["data_as_of_order_id"] == last_id
+    assert [(row["product_id"], row["units_sold"], Decimal(str(row["revenue"]))) for row in data["rows"]] == [
+        (product_id, 4, Decimal("100.00")),
+    ]
+    assert forbidden.status_code == 403
@@ -0,0 +1,163 @@
+# NOVO ARQUIVO: tests/integration/test_sales_case_queries.py
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.crud.crud_report import SALES_REP_ORDER_STATUS
+from app.models import SalesCaseStatus, UserRole
+from app.services.sales_case_service import SalesCaseService, sales_summary_cache
+from tests.utils.sales_case import create_case, create_product, create_user_with_role
+
+
+@pytest.fixture(autouse=True)
+def clear_summary_cache():
+    sales_summary_cache.clear()
+    yield
+    sales_summary_cache.clear()
+
+
+def _seed_rep_with_cases(db: Session):
+    """Vendedora com um estojo ON_LOAN, um OVERDUE e um RETURNED, mais uma venda este mês."""
+    rep = create_user_with_role(db, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    other_rep = create_user_with_role(db, email="outra@cida.pt", role=UserRole.SALES_REP)
+    ring = create_product(db, name="Anel", selling_price="100.00")
+    earring = create_product(db, name="Brinco", selling_price="30.00")
+    ring.on_loan_quantity, earring.on_loan_quantity = 12, 1
+    on_loan = create_case(db, sales_rep_id=rep.id, items={ring.id: 2, earring.id: 1})
+    create_case(db, sales_rep_id=rep.id, status=SalesCaseStatus.OVERDUE, items={ring.id: 1})
+    create_case(db, sales_rep_id=rep.id, status=SalesCaseStatus.RETURNED, items={earring.id: 5})
+    create_case(db, sales_rep_id=other_rep.id, items={ring.id: 9})
+    order = crud.crud_order.create_order(db, user_id=rep.id, status=SALES_REP_ORDER_STATUS)
+    crud.crud_order.create_order_item(db, order_id=order.id, product_id=earring.id, quantity=3, price_at_purchase=Decimal("30.00"))
+    db.commit()
+    return rep, on_loan, ring
+
+
+def test_overdue_sweep_only_moves_open_cases_past_their_return_date(db_session: Session):
+    """Só estojos ON_LOAN com o prazo ultrapassado passam a OVERDUE; a contagem devolvida bate certo."""
+    # --- Arrange ---
+    rep = create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    late = [create_case(db_session, sales_rep_id=rep.id, return_by_date=yesterday).id for _ in range(2)]
+    on_time = create_case(db_session, sales_rep_id=rep.id).id
+    returned = create_case(db_session, sales_rep_id=rep.id, status=SalesCaseStatus.RETURNED, return_by_date=yesterday).id
+    already_overdue = create_case(db_session, sales_rep_id=rep.id, status=SalesCaseStatus.OVERDUE, return_by_date=yesterday).id
+
+    # --- Act ---
+    affected = SalesCaseService(db_session).mark_overdue_cases()
+
+    # --- Assert ---
+    db_session.expire_all()
+    statuses = {case.id: case.status for case in db_session.query(models.SalesCase)}
+    assert affected == 2
+    assert [statuses[case_id] for case_id in late] == [SalesCaseStatus.OVERDUE, SalesCaseStatus.OVERDUE]
+    assert statuses[on_time] == SalesCaseStatus.ON_LOAN
+    assert statuses[returned] == SalesCaseStatus.RETURNED
+    assert statuses[already_overdue] == SalesCaseStatus.OVERDUE
+
+
+def test_sales_rep_summary_aggregates_open_cases_and_month_sales(db_session: Session):
+    """O resumo soma só os estojos abertos da vendedora (por status) e as vendas do mês."""
+    # --- Arrange ---
+    rep, _, _ = _seed_rep_with_cases(db_session)
+
+    # --- Act ---
+    summary = SalesCaseService(db_session).get_sales_rep_summary(sales_rep_id=rep.id)
+
+    # --- Assert ---
+    assert (summary.open_cases, summary.overdue_cases) == (2, 1)
+    assert (summary.pieces_on_loan, summary.overdue_pieces) == (4, 1)
+    assert summary.value_on_loan == Decimal("330.00")
+    assert (summary.month_orders, summary.month_units_sold) == (1, 3)
+    assert summary.month_value_sold == Decimal("90.00")
+    assert SalesCaseService(db_session).get_sales_rep_summary(sales_rep_id=rep.id) is summary
+
+
+def test_sales_rep_summary_cache_is_invalidated_by_case_return(db_session: Session):
+    """Depois de uma devolução, o resumo em cache é descartado e reflete o novo estado."""
+    # --- Arrange ---
+    rep, on_loan, ring = _seed_rep_with_cases(db_session)
+    service = SalesCaseService(db_session)
+    before = service.get_sales_rep_summary(sales_rep_id=rep.id)
+
+    # --- Act ---
+    service.process_case_return(
+        case_id=on_loan.id,
+        return_request=schemas.SalesCaseReturnRequest(items_sold=[schemas.ItemSold(product_id=ring.id, quantity_sold=1)]),
+        current_user=schemas.User(id=rep.id, email=rep.email, role=UserRole.SALES_REP),
+    )
+    after = service.get_sales_rep_summary(sales_rep_id=rep.id)
+
+    # --- Assert ---
+    assert before.open_cases == 2
+    assert (after.open_cases, after.pieces_on_loan) == (1, 1)
+    assert (after.month_orders, after.month_units_sold) == (2, 4)
+    assert after.month_value_sold == Decimal("190.00")
+
+
+def test_summary_view_counts_items_per_case_in_a_single_query(db_session: Session):
+    """A projeção `view=summary` traz item_count/total_pieces de cada estojo da página com uma só query."""
+    # --- Arrange ---
+    rep = create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    ring = create_product(db_session, name="Anel")
+    earring = create_product(db_session, name="Brinco")
+    full = create_case(db_session, sales_rep_id=rep.id, items={ring.id: 2, earring.id: 3})
+    empty = create_case(db_session, sales_rep_id=rep.id)
+    single = create_case(db_session, sales_rep_id=rep.id, items={ring.id: 1})
+    current_user = schemas.User(id=rep.id, email=rep.email, role=UserRole.SALES_REP)
+    full_id, empty_id, single_id = full.id, empty.id, single.id
+    statements = []
+    bind = db_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(bind, "before_cursor_execute", listener)
+
+    # --- Act ---
+    try:
+        rows = crud.sales_case.get_multi_summary_for_user(db_session, current_user=current_user, limit=10)
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    # --- Assert ---
+    assert len(statements) == 1
+    assert [(row.id, row.item_count, row.total_pieces) for row in rows] == [
+        (single_id, 1, 1), (empty_id, 0, 0), (full_id, 2, 5),
+    ]
+
+
+def test_bulk_case_creation_does_not_refresh_each_case(db_session: Session):
+    """20 estojos de um item: INSERTs em lote com RETURNING e nenhum refresh por estojo depois do commit."""
+    # --- Arrange ---
+    rep = create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    ring = create_product(db_session, name="Anel")
+    bulk = schemas.SalesCaseBulkCreate(cases=[
+        schemas.SalesCaseCreate(
+            sales_rep_id=rep.id, loan_duration_days=30, items=[schemas.SalesCaseItemCreate(product_id=ring.id, quantity=1)]
+        )
+        for _ in range(20)
+    ])
+    statements = []
+    bind = db_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(bind, "before_cursor_execute", listener)
+
+    # --- Act ---
+    try:
+        result = SalesCaseService(db_session).create_cases_bulk(bulk_create=bulk)
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    # --- Assert ---
+    case_inserts = [s for s in statements if s.startswith("INSERT INTO sales_cases ")]
+    case_selects = [s for s in statements if s.startswith("SELECT") and "FROM sales_cases" in s]
+    assert len(result.created) == 20
+    assert all(len(case.items) == 1 for case in result.created)
+    # O SQLite não garante a ordem do RETURNING num INSERT multi-linha, por isso
+    # o SQLAlchemy envia um INSERT por estojo; no PostgreSQL é um só statement
+    assert len(case_inserts) == (20 if bind.dialect.name == "sqlite" else 1)
+    assert len(case_selects) == 1
+    assert len(statements) - len(case_inserts) <= 6
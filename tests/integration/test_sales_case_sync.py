@@ -0,0 +1,77 @@
+# NOVO ARQUIVO: tests/integration/test_sales_case_sync.py
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.models import SalesCaseStatus, UserRole
+from app.services.sync_service import SyncService
+from tests.utils.sales_case import create_case, create_product, create_user_with_role
+
+
+def test_product_update_after_concurrent_stock_update_bumps_version_without_conflict(db_session: Session):
+    """
+    `version` só sinaliza alterações para a sincronização: um UPDATE em lote
+    noutra sessão não faz falhar a edição ORM de um produto já carregado.
+    """
+    # --- Arrange ---
+    product = create_product(db_session, name="Anel")
+    with Session(bind=db_session.get_bind()) as checkout:
+        crud.crud_product.apply_stock_deltas(checkout, stock_deltas={product.id: -1})
+        checkout.commit()
+
+    # --- Act ---
+    updated = crud.crud_product.update_product(
+        db_session, product, schemas.ProductUpdate(name="Anel dourado")
+    )
+
+    # --- Assert ---
+    assert (updated.stock_quantity, updated.name) == (49, "Anel dourado")
+    assert updated.version == 3
+
+
+def test_delta_sync_returns_only_rows_changed_since_previous_token(db_session: Session):
+    """
+    Depois de uma sincronização completa, a seguinte (com o token devolvido)
+    só traz o estojo alterado, os produtos desse estojo e o produto de um
+    estojo aberto cujo desconto começou entretanto.
+    """
+    # --- Arrange ---
+    rep = create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    other_rep = create_user_with_role(db_session, email="outra@cida.pt", role=UserRole.SALES_REP)
+    ring, earring, necklace = (create_product(db_session, name=name) for name in ("Anel", "Brinco", "Colar"))
+    untouched = create_case(db_session, sales_rep_id=rep.id, items={ring.id: 1, earring.id: 1})
+    changed = create_case(db_session, sales_rep_id=rep.id, items={necklace.id: 2})
+    create_case(db_session, sales_rep_id=other_rep.id, items={ring.id: 1})
+    create_case(db_session, sales_rep_id=rep.id, status=SalesCaseStatus.RETURNED, items={ring.id: 1})
+    # Dados anteriores à janela de sobreposição do token
+    hour_ago = datetime.utcnow() - timedelta(hours=1)
+    db_session.execute(update(models.Product).values(updated_at=hour_ago))
+    db_session.execute(update(models.SalesCase).values(updated_at=hour_ago))
+    db_session.commit()
+    service = SyncService(db_session)
+    full = service.build_bundle(sales_rep_id=rep.id)
+
+    changed.return_by_date = changed.return_by_date + timedelta(days=7)
+    db_session.add(models.Discount(
+        product_id=ring.id, discount_price=Decimal("80.00"),
+        start_time=datetime.utcnow() - timedelta(seconds=5), end_time=datetime.utcnow() + timedelta(days=1),
+    ))
+    db_session.commit()
+
+    # --- Act ---
+    delta = service.build_bundle(sales_rep_id=rep.id, since_token=full.sync_token)
+
+    # --- Assert ---
+    assert full.full is True
+    assert [case.id for case in full.cases] == [untouched.id, changed.id]
+    assert sorted(product.id for product in full.products) == [ring.id, earring.id, necklace.id]
+    assert delta.full is False
+    assert [(case.id, case.version) for case in delta.cases] == [(changed.id, full.cases[1].version + 1)]
+    assert {product.id: product.current_price for product in delta.products} == {
+        necklace.id: Decimal("100.00"),
+        ring.id: Decimal("80.00"),
+    }
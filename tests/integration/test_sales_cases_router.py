@@ -0,0 +1,79 @@
+# NOVO ARQUIVO: tests/integration/test_sales_cases_router.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import UserRole
+from tests.utils.sales_case import create_case, create_product, create_user_with_role, login_headers
+
+
+def test_listing_pages_by_before_id_without_header_on_exactly_full_last_page(client: TestClient, db_session: Session):
+    """
+    A listagem devolve os estojos do mais recente para o mais antigo;
+    `X-Next-Before-Id` aponta para a página seguinte e não aparece quando a
+    última página fica exatamente cheia.
+    """
+    # --- Arrange ---
+    rep = create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    other_rep = create_user_with_role(db_session, email="outra@cida.pt", role=UserRole.SALES_REP)
+    case_ids = [create_case(db_session, sales_rep_id=rep.id).id for _ in range(4)]
+    create_case(db_session, sales_rep_id=other_rep.id)
+    headers = login_headers(client, email="vendedora@cida.pt")
+
+    # --- Act ---
+    first = client.get("/sales-cases/", params={"limit": 2}, headers=headers)
+    second = client.get(
+        "/sales-cases/", params={"limit": 2, "before_id": first.headers["X-Next-Before-Id"]}, headers=headers
+    )
+
+    # --- Assert ---
+    assert first.status_code == 200
+    assert [case["id"] for case in first.json()] == case_ids[:1:-1]
+    assert first.headers["X-Next-Before-Id"] == str(case_ids[2])
+    assert [case["id"] for case in second.json()] == case_ids[1::-1]
+    assert "X-Next-Before-Id" not in second.headers
+
+
+def test_listing_rejects_limit_above_cap(client: TestClient, db_session: Session):
+    """O tamanho da página está limitado a 200."""
+    # --- Arrange ---
+    create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    headers = login_headers(client, email="vendedora@cida.pt")
+
+    # --- Act ---
+    at_cap = client.get("/sales-cases/", params={"limit": 200}, headers=headers)
+    above_cap = client.get("/sales-cases/", params={"limit": 201}, headers=headers)
+
+    # --- Assert ---
+    assert at_cap.status_code == 200
+    assert above_cap.status_code == 422
+
+
+def test_listing_and_return_of_cases_with_many_items_stay_within_query_budget(client: TestClient, db_session: Session):
+    """
+    Listar estojos com vários itens e devolver um deles ficam dentro dos
+    orçamentos de queries das rotas (sem lazy loads nem acertos por item).
+    """
+    # --- Arrange ---
+    rep = create_user_with_role(db_session, email="vendedora@cida.pt", role=UserRole.SALES_REP)
+    products = [create_product(db_session, name=f"Peça {i}", selling_price="50.00") for i in range(5)]
+    for product in products:
+        product.on_loan_quantity = 6
+    db_session.commit()
+    cases = [create_case(db_session, sales_rep_id=rep.id, items={product.id: 2 for product in products}) for _ in range(3)]
+    headers = login_headers(client, email="vendedora@cida.pt")
+
+    # --- Act ---
+    listing = client.get("/sales-cases/", headers=headers)
+    returned = client.post(
+        f"/sales-cases/{cases[0].id}/return",
+        json={"items_sold": [{"product_id": product.id, "quantity_sold": 1} for product in products]},
+        headers=headers,
+    )
+
+    # --- Assert ---
+    assert listing.status_code == 200
+    assert [len(case["items"]) for case in listing.json()] == [5, 5, 5]
+    assert returned.status_code == 200
+    report = returned.json()
+    assert (report["total_items_sold"], report["total_value_sold"]) == (5, 250.0)
@@ -2,7 +2,12 @@
 
 from fastapi.testclient import TestClient
 from faker import Faker
+from sqlalchemy.orm import Session
+
+from app import security
+from app.core.config import settings
 from app.models import UserRole
+from tests.utils.sales_case import create_user_with_role, login_headers
 fake = Faker()
 
 def test_create_user_success(client: TestClient):
@@ -53,4 +58,41 @@ def test_create_user_email_already_exists(client: TestClient):
 
     # --- Assert ---
     assert response2.status_code == 400
-    assert response2.json() == {"detail": "Email already registered"}
\ No newline at end of file
+    assert response2.json() == {"detail": "Email already registered"}
+
+def test_bulk_registration_creates_new_users_and_reports_skipped(client: TestClient, db_session: Session, mocker):
+    """
+    POST /users/bulk cria os emails novos (com hashes feitos na pool de
+    processos, que permitem login) e lista em `skipped` os já registados e
+    os repetidos no pedido.
+    """
+    # --- Arrange ---
+    mocker.patch.object(settings, "PASSWORD_BULK_HASH_PROCESSES", 2)
+    create_user_with_role(db_session, email="admin@cida.pt", role=UserRole.ADMIN)
+    create_user_with_role(db_session, email="old@cida.pt", role=UserRole.SALES_REP)
+    headers = login_headers(client, email="admin@cida.pt")
+    payload = {"users": [
+        {"email": "ana@cida.pt", "password": "senha-ana-1", "role": "sales_rep"},
+        {"email": "old@cida.pt", "password": "senha-old-1"},
+        {"email": "ana@cida.pt", "password": "senha-ana-2"},
+        {"email": "bia@cida.pt", "password": "senha-bia-1"},
+    ]}
+
+    # --- Act ---
+    try:
+        response = client.post("/users/bulk", json=payload, headers=headers)
+        login = client.post("/token", data={"username": "bia@cida.pt", "password": "senha-bia-1"})
+    finally:
+        security.shutdown_hash_pool()
+
+    # --- Assert ---
+    assert response.status_code == 201
+    data = response.json()
+    assert [(u["email"], u["role"]) for u in data["created"]] == [
+        ("ana@cida.pt", UserRole.SALES_REP.value), ("bia@cida.pt", UserRole.CUSTOMER.value),
+    ]
+    assert [(s["index"], s["email"], s["detail"]) for s in data["skipped"]] == [
+        (1, "old@cida.pt", "Email already registered"),
+        (2, "ana@cida.pt", "Duplicate email in request"),
+    ]
+    assert login.status_code == 200
@@ -0,0 +1,21 @@
+# NOVO ARQUIVO: tests/unit/test_async_database.py
+
+import pytest
+
+from app.database import to_async_url
+
+@pytest.mark.parametrize("sync_url, expected", [
+    ("sqlite:///./default.db", "sqlite+aiosqlite:///./default.db"),
+    ("postgresql://user:pw@db/cida", "postgresql+asyncpg://user:pw@db/cida"),
+    ("postgresql+psycopg2://user:pw@db/cida", "postgresql+asyncpg://user:pw@db/cida"),
+])
+def test_to_async_url_swaps_driver(sync_url, expected):
+    """A DATABASE_URL síncrona deve ser convertida no driver assíncrono do mesmo backend."""
+    # --- Act & Assert ---
+    assert to_async_url(sync_url).render_as_string(hide_password=False) == expected
+
+def test_to_async_url_rejects_unknown_backend():
+    """Backends sem driver assíncrono configurado devem falhar com uma mensagem clara."""
+    # --- Act & Assert ---
+    with pytest.raises(ValueError):
+        to_async_url("mysql://user:pw@db/cida")
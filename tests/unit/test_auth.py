@@ -0,0 +1,83 @@
+# NOVO ARQUIVO: tests/unit/test_auth.py
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from jose import jwt
+
+from app import auth
+from app.core.config import settings
+from app.core.revocation import token_denylist
+from app.models import UserRole
+from app.schemas import User
+
+@pytest.fixture(autouse=True)
+def clear_denylist():
+    token_denylist.clear()
+    yield
+    token_denylist.clear()
+
+def test_current_user_comes_from_token_claims_without_db_query(mocker):
+    """Com AUTH_TRUST_TOKEN_CLAIMS, um token com uid/role não gera nenhuma query."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    open_session = MagicMock()
+    token = auth.create_user_access_token(User(id=7, email="ana@cida.pt", role=UserRole.SALES_REP))
+
+    # --- Act ---
+    claims = auth.get_token_claims(token)
+    user = asyncio.run(auth.get_current_user(payload=claims, open_session=open_session))
+
+    # --- Assert ---
+    assert (user.id, user.email, user.role) == (7, "ana@cida.pt", UserRole.SALES_REP)
+    open_session.assert_not_called()
+
+def test_token_without_claims_falls_back_to_a_session_opened_on_demand(mocker):
+    """Tokens antigos (só `sub`) abrem uma sessão assíncrona para ler o snapshot."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    snapshot = User(id=7, email="ana@cida.pt", role=UserRole.CUSTOMER)
+    session = MagicMock()
+    session.run_sync = AsyncMock(return_value=snapshot)
+    open_session = MagicMock()
+    open_session.return_value.__aenter__.return_value = session
+    claims = auth.get_token_claims(auth.create_access_token(data={"sub": "ana@cida.pt"}))
+
+    # --- Act ---
+    user = asyncio.run(auth.get_current_user(payload=claims, open_session=open_session))
+
+    # --- Assert ---
+    assert user == snapshot
+    open_session.assert_called_once_with()
+    session.run_sync.assert_awaited_once()
+
+def test_token_claims_are_not_trusted_by_default(mocker):
+    """O modo de claims é opt-in: por omissão, mesmo tokens com uid/role são validados no banco."""
+    # --- Arrange ---
+    from app.core.config import Settings
+
+    mocker.patch.object(settings, "AUTH_TRUST_TOKEN_CLAIMS", Settings.model_fields["AUTH_TRUST_TOKEN_CLAIMS"].default)
+    snapshot = User(id=7, email="ana@cida.pt", role=UserRole.CUSTOMER)
+    session = MagicMock()
+    session.run_sync = AsyncMock(return_value=snapshot)
+    open_session = MagicMock()
+    open_session.return_value.__aenter__.return_value = session
+    token = auth.create_user_access_token(User(id=7, email="ana@cida.pt", role=UserRole.ADMIN))
+
+    # --- Act ---
+    user = asyncio.run(auth.get_current_user(payload=auth.get_token_claims(token), open_session=open_session))
+
+    # --- Assert ---
+    assert user.role == UserRole.CUSTOMER
+    open_session.assert_called_once_with()
+
+def test_revoked_user_token_is_rejected():
+    """Depois de revogar os tokens do utilizador, o token deixa de ser aceite."""
+    # --- Arrange ---
+    token = auth.create_user_access_token(User(id=7, email="ana@cida.pt", role=UserRole.CUSTOMER))
+    token_denylist.revoke_user(7, at=jwt.get_unverified_claims(token)["iat"])
+
+    # --- Act & Assert ---
+    with pytest.raises(auth.HTTPException) as excinfo:
+        auth.get_token_claims(token)
+    assert excinfo.value.status_code == 401
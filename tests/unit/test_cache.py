@@ -0,0 +1,53 @@
+# NOVO ARQUIVO: tests/unit/test_cache.py
+
+from app.core.cache import TTLCache
+
+def test_get_counts_hits_and_misses():
+    """A cache deve devolver o valor guardado e contabilizar hits e misses."""
+    # --- Arrange ---
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("rep-1", {"open_cases": 3})
+
+    # --- Act ---
+    hit = cache.get("rep-1")
+    miss = cache.get("rep-2")
+
+    # --- Assert ---
+    assert hit == {"open_cases": 3}
+    assert miss is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+def test_expired_entries_are_not_returned():
+    """Entradas com o TTL expirado contam como miss e são removidas."""
+    # --- Arrange ---
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("rep-1", "resumo", ttl_seconds=0)
+
+    # --- Act & Assert ---
+    assert cache.get("rep-1") is None
+    assert cache.stats()["size"] == 0
+
+def test_least_recently_used_entry_is_evicted_when_full():
+    """Ao exceder `max_size`, a entrada usada há mais tempo é descartada."""
+    # --- Arrange ---
+    cache = TTLCache(ttl_seconds=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a") # 'a' passa a ser a mais recente
+
+    # --- Act ---
+    cache.set("c", 3)
+
+    # --- Assert ---
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_invalidate_removes_entry():
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("rep-1", "resumo")
+
+    cache.invalidate("rep-1")
+
+    assert cache.get("rep-1") is None
@@ -0,0 +1,70 @@
+# NOVO ARQUIVO: tests/unit/test_database.py
+
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.database import InstrumentedQueuePool, SerializedWrites, build_engine, get_pool_stats
+
+def test_in_memory_sqlite_uses_single_shared_connection():
+    """SQLite em memória deve usar StaticPool (uma conexão, os dados persistem entre checkouts)."""
+    # --- Act ---
+    engine = build_engine("sqlite://")
+
+    # --- Assert ---
+    assert isinstance(engine.pool, StaticPool)
+    assert get_pool_stats(engine) == {"pool_class": "StaticPool"}
+
+def test_pool_stats_report_checkouts_and_connections_in_use(tmp_path):
+    """As estatísticas devem refletir as conexões em uso e os checkouts medidos."""
+    # --- Arrange ---
+    engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+    # --- Act ---
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        during = get_pool_stats(engine)
+    after = get_pool_stats(engine)
+
+    # --- Assert ---
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    assert during["checked_out"] == 1
+    assert after["checked_out"] == 0
+    assert after["checkouts"] == 1
+    assert after["timeouts"] == 0
+
+def test_sqlite_profile_is_applied_on_connect(tmp_path):
+    """Cada nova conexão SQLite deve receber os PRAGMAs do perfil (WAL, busy_timeout...)."""
+    # --- Arrange ---
+    engine = build_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+
+    # --- Act ---
+    with engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+        busy_timeout = conn.execute(text("PRAGMA busy_timeout")).scalar()
+
+    # --- Assert ---
+    assert journal_mode.lower() == settings.SQLITE_JOURNAL_MODE.lower()
+    assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT_MS
+
+def test_serialized_writes_is_reentrant_and_released(mocker):
+    """O lock de escrita pode ser re-adquirido pela mesma thread e é libertado no fim."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "SQLITE_SERIALIZE_WRITES", True)
+    mocker.patch.object(SerializedWrites, "enabled", new_callable=mocker.PropertyMock, return_value=True)
+    writes = SerializedWrites()
+
+    # --- Act ---
+    with writes:
+        with writes:
+            pass
+
+    # --- Assert ---
+    # Outra thread consegue adquiri-lo: o lock foi totalmente libertado
+    results = []
+    worker = threading.Thread(target=lambda: results.append(writes._lock.acquire(blocking=False)))
+    worker.start()
+    worker.join()
+    assert results == [True]
@@ -0,0 +1,53 @@
+# NOVO ARQUIVO: tests/unit/test_inventory_service.py
+
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+
+from app.services.inventory_service import InventoryService
+
+def _stock_row(product_id: int, on_loan: int):
+    return SimpleNamespace(id=product_id, on_loan_quantity=on_loan)
+
+def test_reconcile_on_loan_reports_drift_per_chunk_without_repairing(mocker):
+    """
+    Em modo relatório, cada bloco de produtos é travado, comparado com os
+    totais agregados e fechado com commit, sem alterar os contadores.
+    """
+    # --- Arrange ---
+    mock_db = MagicMock()
+    mocker.patch("app.crud.crud_product.get_product_ids_after", side_effect=[[1, 2], [3], []])
+    recorded = {1: 5, 2: 0, 3: 4}
+    mocker.patch(
+        "app.crud.crud_product.get_stock_rows_for_update",
+        side_effect=lambda db, product_ids: [_stock_row(pid, recorded[pid]) for pid in product_ids],
+    )
+    mocker.patch("app.crud.sales_case.get_on_loan_totals", side_effect=[{1: 5, 2: 1}, {}])
+    set_quantities = mocker.patch("app.crud.crud_product.set_on_loan_quantities")
+
+    # --- Act ---
+    report = InventoryService(mock_db).reconcile_on_loan(chunk_size=2)
+
+    # --- Assert ---
+    assert (report.checked, report.drifted, report.repaired) == (3, 2, 0)
+    assert [(d.product_id, d.recorded, d.actual) for d in report.drifts] == [(2, 0, 1), (3, 4, 0)]
+    set_quantities.assert_not_called()
+    assert mock_db.commit.call_count == 2
+
+def test_reconcile_on_loan_repairs_only_drifted_products(mocker):
+    """Com `repair=True`, apenas os produtos divergentes recebem o valor real."""
+    # --- Arrange ---
+    mock_db = MagicMock()
+    mocker.patch("app.crud.crud_product.get_product_ids_after", side_effect=[[1, 2], []])
+    mocker.patch(
+        "app.crud.crud_product.get_stock_rows_for_update",
+        return_value=[_stock_row(1, 3), _stock_row(2, 7)],
+    )
+    mocker.patch("app.crud.sales_case.get_on_loan_totals", return_value={1: 3, 2: 2})
+    set_quantities = mocker.patch("app.crud.crud_product.set_on_loan_quantities", return_value=1)
+
+    # --- Act ---
+    report = InventoryService(mock_db).reconcile_on_loan(repair=True, chunk_size=2)
+
+    # --- Assert ---
+    set_quantities.assert_called_once_with(mock_db, quantities={2: 2})
+    assert report.repaired == 1
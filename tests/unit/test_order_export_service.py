@@ -0,0 +1,53 @@
+# NOVO ARQUIVO: tests/unit/test_order_export_service.py
+
+import json
+from types import SimpleNamespace
+from datetime import datetime
+from decimal import Decimal
+
+from app.services.order_export_service import OrderExportService
+
+def _row(order_id, item_id=None, product_id=None, quantity=None, price=None):
+    return SimpleNamespace(
+        order_id=order_id, user_id=7, status="processing", created_at=datetime(2026, 1, 31, 10, 0),
+        item_id=item_id, product_id=product_id, quantity=quantity, price_at_purchase=price
+    )
+
+JOINED_ROWS = [
+    _row(1, item_id=10, product_id=100, quantity=2, price=Decimal("59.90")),
+    _row(1, item_id=11, product_id=101, quantity=1, price=Decimal("120.00")),
+    _row(2), # Encomenda sem itens (vinda do OUTER JOIN)
+]
+
+def test_iter_ndjson_groups_joined_rows_into_one_line_per_order(mocker):
+    """
+    As linhas do JOIN ordenado devem ser agrupadas numa única linha
+    JSON por encomenda, com os itens embutidos.
+    """
+    # --- Arrange ---
+    service = OrderExportService(session_factory=mocker.MagicMock())
+    mocker.patch.object(service, "iter_rows", return_value=iter(JOINED_ROWS))
+
+    # --- Act ---
+    lines = "".join(service.iter_ndjson()).splitlines()
+
+    # --- Assert ---
+    orders = [json.loads(line) for line in lines]
+    assert [order["id"] for order in orders] == [1, 2]
+    assert [item["product_id"] for item in orders[0]["items"]] == [100, 101]
+    assert orders[0]["items"][0]["price_at_purchase"] == "59.90"
+    assert orders[1]["items"] == []
+
+def test_iter_csv_writes_header_and_one_line_per_item(mocker):
+    """O CSV deve ter o cabeçalho e uma linha por item exportado."""
+    # --- Arrange ---
+    service = OrderExportService(session_factory=mocker.MagicMock())
+    mocker.patch.object(service, "iter_rows", return_value=iter(JOINED_ROWS))
+
+    # --- Act ---
+    lines = "".join(service.iter_csv()).splitlines()
+
+    # --- Assert ---
+    assert lines[0].startswith("order_id,user_id,status,created_at")
+    assert len(lines) == 1 + len(JOINED_ROWS)
+    assert lines[1].split(",")[-2:] == ["2", "59.90"]
@@ -0,0 +1,68 @@
+# NOVO ARQUIVO: tests/unit/test_order_service.py
+
+import pytest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from decimal import Decimal
+
+from app.core.config import settings
+from app.services.order_service import OrderService, OrderCreationError
+from app.schemas import CheckoutRequest, CheckoutItem
+
+def _stock_row(product_id: int, stock: int = 100, on_loan: int = 0):
+    return SimpleNamespace(
+        id=product_id, name=f"Peça {product_id}", selling_price=Decimal("10.00"),
+        stock_quantity=stock, on_loan_quantity=on_loan
+    )
+
+def test_create_customer_order_rejects_cart_above_max_lines(mocker):
+    """
+    Um carrinho com mais linhas do que `MAX_ORDER_LINES` deve ser recusado
+    antes de qualquer acesso ao banco.
+    """
+    # --- Arrange ---
+    mock_db = MagicMock()
+    mocker.patch.object(settings, "MAX_ORDER_LINES", 2)
+    checkout = CheckoutRequest(items=[CheckoutItem(product_id=i, quantity=1) for i in range(1, 4)])
+
+    # --- Act & Assert ---
+    with pytest.raises(OrderCreationError) as excinfo:
+        OrderService(mock_db).create_customer_order(user=MagicMock(id=1), checkout_request=checkout)
+
+    assert "limite" in str(excinfo.value)
+    mock_db.commit.assert_not_called()
+
+def test_create_customer_order_processes_cart_in_sorted_chunks(mocker):
+    """
+    O carrinho deve ser consolidado por produto, ordenado por id e processado
+    em lotes de `CHECKOUT_CHUNK_SIZE`, com um lock e um INSERT por lote.
+    """
+    # --- Arrange ---
+    mock_db = MagicMock()
+    mocker.patch.object(settings, "CHECKOUT_CHUNK_SIZE", 2)
+    mocker.patch("app.services.order_service.crud_order.create_order", return_value=MagicMock(id=99))
+    lock = mocker.patch(
+        "app.services.order_service.crud_product.get_stock_rows_for_update",
+        side_effect=lambda db, product_ids: [_stock_row(pid) for pid in product_ids],
+    )
+    insert_items = mocker.patch("app.services.order_service.crud_order.create_order_items_bulk")
+    apply_deltas = mocker.patch("app.services.order_service.crud_product.apply_stock_deltas")
+    mocker.patch("app.crud.discount.get_active_prices_for_products", return_value={})
+
+    checkout = CheckoutRequest(items=[
+        CheckoutItem(product_id=3, quantity=1),
+        CheckoutItem(product_id=1, quantity=2),
+        CheckoutItem(product_id=2, quantity=1),
+        CheckoutItem(product_id=1, quantity=3),
+    ])
+
+    # --- Act ---
+    OrderService(mock_db).create_customer_order(user=MagicMock(id=1), checkout_request=checkout)
+
+    # --- Assert ---
+    assert [c.kwargs["product_ids"] for c in lock.call_args_list] == [[1, 2], [3]]
+    assert insert_items.call_count == 2
+    first_chunk_items = insert_items.call_args_list[0].kwargs["items"]
+    assert first_chunk_items[0] == {"product_id": 1, "quantity": 5, "price_at_purchase": Decimal("10.00")}
+    assert apply_deltas.call_args_list[0].kwargs["stock_deltas"] == {1: -5, 2: -1}
+    mock_db.commit.assert_called_once()
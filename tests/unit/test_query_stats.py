@@ -0,0 +1,64 @@
+# NOVO ARQUIVO: tests/unit/test_query_stats.py
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine, text
+
+from app.core import query_stats
+from app.core.config import settings
+from app.core.query_stats import QueryBudgetExceeded, RequestQueryStats, instrument_engine
+
+def test_queries_are_counted_only_inside_a_request():
+    """Com estatísticas ativas, cada query é contada e os statements repetidos agrupados."""
+    # --- Arrange ---
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    stats = RequestQueryStats()
+
+    # --- Act ---
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1")) # Fora de um pedido: ignorada
+        token = query_stats._current_stats.set(stats)
+        try:
+            for value in range(3):
+                conn.execute(text("SELECT :v"), {"v": value})
+        finally:
+            query_stats._current_stats.reset(token)
+
+    # --- Assert ---
+    assert stats.count == 3
+    assert stats.repeated_statements(threshold=3) == [("SELECT ?", 3)]
+
+def _fake_request(path: str):
+    return SimpleNamespace(scope={"method": "GET", "path": path, "route": SimpleNamespace(path=path)})
+
+def _endpoint_running_queries(count: int):
+    async def call_next(request):
+        stats = query_stats._current_stats.get()
+        for _ in range(count):
+            stats.record("SELECT * FROM products WHERE id = ?", 0.001)
+        return SimpleNamespace(headers={})
+    return call_next
+
+def test_middleware_sets_server_timing_header(mocker):
+    """A resposta deve trazer o número de queries e o tempo de banco em `Server-Timing`."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "QUERY_BUDGETS", {})
+    mocker.patch.object(settings, "QUERY_BUDGET_DEFAULT", None)
+
+    # --- Act ---
+    response = asyncio.run(query_stats.query_stats_middleware(_fake_request("/products/"), _endpoint_running_queries(2)))
+
+    # --- Assert ---
+    assert response.headers["Server-Timing"] == 'db;dur=2.0;desc="2 queries"'
+
+def test_strict_budget_raises_when_route_exceeds_it(mocker):
+    """Em modo estrito (testes), exceder o orçamento da rota gera QueryBudgetExceeded."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "QUERY_BUDGETS", {"GET /products/": 2})
+    mocker.patch.object(settings, "QUERY_BUDGET_STRICT", True)
+
+    # --- Act & Assert ---
+    with pytest.raises(QueryBudgetExceeded):
+        asyncio.run(query_stats.query_stats_middleware(_fake_request("/products/"), _endpoint_running_queries(3)))
@@ -0,0 +1,70 @@
+# NOVO ARQUIVO: tests/unit/test_rate_limit.py
+
+import asyncio
+import threading
+
+from app.core.config import settings
+from app.core.rate_limit import InMemoryRateLimitBackend, LoginThrottle
+
+def test_bucket_allows_burst_then_rejects():
+    """O balde permite `capacity` tentativas seguidas e recusa as seguintes."""
+    # --- Arrange ---
+    backend = InMemoryRateLimitBackend(max_keys=10)
+
+    # --- Act ---
+    results = [backend.consume("email:ana", capacity=3, refill_per_second=0) for _ in range(4)]
+
+    # --- Assert ---
+    assert results == [True, True, True, False]
+
+def test_login_throttle_limits_per_email_and_counts_rejections(mocker):
+    """Tentativas em excesso para o mesmo email são recusadas e contabilizadas; outros emails não são afetados."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "LOGIN_THROTTLE_ENABLED", True)
+    mocker.patch.object(settings, "LOGIN_THROTTLE_EMAIL_BURST", 2)
+    mocker.patch.object(settings, "LOGIN_THROTTLE_EMAIL_PER_MINUTE", 0)
+    throttle = LoginThrottle(InMemoryRateLimitBackend(max_keys=10))
+
+    # --- Act ---
+    attempts = [throttle.allow(email="Ana@Cida.pt", ip="10.0.0.1") for _ in range(3)]
+    other = throttle.allow(email="bia@cida.pt", ip="10.0.0.1")
+
+    # --- Assert ---
+    assert attempts == [True, True, False]
+    assert other is True
+    assert throttle.stats()["rejected"] == 1
+
+def test_rejected_email_does_not_spend_the_ip_bucket(mocker):
+    """Se o balde do email está vazio, a tentativa não consome o token do IP."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "LOGIN_THROTTLE_ENABLED", True)
+    mocker.patch.object(settings, "LOGIN_THROTTLE_EMAIL_BURST", 1)
+    mocker.patch.object(settings, "LOGIN_THROTTLE_EMAIL_PER_MINUTE", 0)
+    mocker.patch.object(settings, "LOGIN_THROTTLE_IP_BURST", 2)
+    mocker.patch.object(settings, "LOGIN_THROTTLE_IP_PER_MINUTE", 0)
+    throttle = LoginThrottle(InMemoryRateLimitBackend(max_keys=10))
+
+    # --- Act ---
+    first = throttle.allow(email="ana@cida.pt", ip="10.0.0.1")
+    rejected = throttle.allow(email="ana@cida.pt", ip="10.0.0.1")
+    other = throttle.allow(email="bia@cida.pt", ip="10.0.0.1")
+    ip_exhausted = throttle.allow(email="carla@cida.pt", ip="10.0.0.1")
+
+    # --- Assert ---
+    assert (first, rejected, other, ip_exhausted) == (True, False, True, False)
+
+def test_allow_async_runs_blocking_backends_off_the_event_loop(mocker):
+    """Backends com I/O (Redis) são consultados numa thread, não no event loop."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "LOGIN_THROTTLE_ENABLED", True)
+    seen_threads = []
+    backend = mocker.MagicMock(blocking=True)
+    backend.consume_all.side_effect = lambda buckets: seen_threads.append(threading.current_thread()) or True
+    throttle = LoginThrottle(backend)
+
+    # --- Act ---
+    allowed = asyncio.run(throttle.allow_async(email="ana@cida.pt", ip="10.0.0.1"))
+
+    # --- Assert ---
+    assert allowed is True
+    assert seen_threads[0] is not threading.main_thread()
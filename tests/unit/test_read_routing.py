@@ -0,0 +1,40 @@
+# NOVO ARQUIVO: tests/unit/test_read_routing.py
+
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+
+from app.core.read_your_writes import client_key, recent_writers, should_read_from_primary
+from app.database import RoutingSession, _read_session_info
+
+def _request(authorization=None, host="10.0.0.1"):
+    request = MagicMock()
+    request.headers = {"authorization": authorization} if authorization else {}
+    request.client.host = host
+    return request
+
+def test_routing_session_reads_from_replica_bind():
+    """Com `replica_bind`, as queries vão para a réplica; sem ele, para o primário."""
+    # --- Arrange ---
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+
+    # --- Act ---
+    read_session = RoutingSession(bind=primary, info={"replica_bind": replica})
+    write_session = RoutingSession(bind=primary)
+
+    # --- Assert ---
+    assert read_session.get_bind() is replica
+    assert write_session.get_bind() is primary
+
+def test_recent_writer_reads_from_primary():
+    """Um cliente que escreveu há pouco não deve ler da réplica (read-your-writes)."""
+    # --- Arrange ---
+    recent_writers.clear()
+    replica = object()
+    writer, other = _request("Bearer token-a"), _request("Bearer token-b")
+    recent_writers.set(client_key(writer), True)
+
+    # --- Act & Assert ---
+    assert should_read_from_primary(writer)
+    assert _read_session_info(writer, replica) == {}
+    assert _read_session_info(other, replica) == {"replica_bind": replica}
+    recent_writers.clear()
@@ -0,0 +1,34 @@
+# NOVO ARQUIVO: tests/unit/test_revocation.py
+
+import time
+
+from app.core.revocation import TokenDenylist
+
+def test_revoked_jti_is_rejected_until_token_expires():
+    """Um token revogado (logout) é recusado; a entrada desaparece depois da expiração."""
+    # --- Arrange ---
+    denylist = TokenDenylist(max_token_age_seconds=3600)
+    now = time.time()
+
+    # --- Act ---
+    denylist.revoke_token("abc", expires_at=now + 60)
+    denylist.revoke_token("old", expires_at=now - 1) # Já expirado: é podado na próxima revogação
+    denylist.revoke_token("xyz", expires_at=now + 60)
+
+    # --- Assert ---
+    assert denylist.is_revoked({"jti": "abc", "uid": 1, "iat": int(now)})
+    assert not denylist.is_revoked({"jti": "other", "uid": 1, "iat": int(now)})
+    assert denylist.stats()["revoked_tokens"] == 2
+
+def test_revoke_user_rejects_only_tokens_issued_before_revocation():
+    """A revogação por utilizador abrange os tokens emitidos até esse instante."""
+    # --- Arrange ---
+    denylist = TokenDenylist(max_token_age_seconds=3600)
+
+    # --- Act ---
+    denylist.revoke_user(7, at=1000)
+
+    # --- Assert ---
+    assert denylist.is_revoked({"jti": "a", "uid": 7, "iat": 999})
+    assert not denylist.is_revoked({"jti": "b", "uid": 7, "iat": 1001})
+    assert not denylist.is_revoked({"jti": "c", "uid": 8, "iat": 999})
@@ -35,6 +35,7 @@ def test_create_new_case_insufficient_stock(mocker):
     mock_sales_rep.role = UserRole.SALES_REP
 
     mock_product = MagicMock()
+    mock_product.id = product_id_with_no_stock
     mock_product.name = "Anel de Prata"
     mock_product.stock_quantity = 10
     mock_product.on_loan_quantity = 8 # <-- Estoque disponível: 10 - 8 = 2
@@ -43,7 +44,7 @@ def test_create_new_case_insufficient_stock(mocker):
     # Configurar os Mocks do CRUD para retornar nossos objetos falsos
     # `mocker.patch` intercepta a chamada à função real e a substitui
     mocker.patch("app.services.sales_case_service.crud.user.get", return_value=mock_sales_rep)
-    mocker.patch("app.services.sales_case_service.crud.crud_product.get_product", return_value=mock_product)
+    mocker.patch("app.services.sales_case_service.crud.crud_product.get_stock_rows_for_update", return_value=[mock_product])
 
     # Instanciar o nosso serviço com o mock do DB
     service = SalesCaseService(db=mock_db)
@@ -59,4 +60,162 @@ def test_create_new_case_insufficient_stock(mocker):
     
     # Garantir que o commit nunca foi chamado, provando a atomicidade
     mock_db.commit.assert_not_called()
-    mock_db.rollback.assert_not_called() # Não deve ter rollback porque o erro acontece antes de escrever
\ No newline at end of file
+    # A validação corre com os produtos travados, por isso o rollback liberta os locks
+    mock_db.rollback.assert_called_once()
+
+def test_create_new_case_locks_products_once_and_reserves_in_bulk(mocker):
+    """
+    Testa se a criação do estojo trava todos os produtos com uma única
+    query ordenada e reserva o stock com operações em lote.
+    """
+    # --- Arrange ---
+    mock_db = MagicMock()
+    case_create_schema = SalesCaseCreate(
+        sales_rep_id=1,
+        loan_duration_days=30,
+        items=[
+            SalesCaseItemCreate(product_id=7, quantity=1),
+            SalesCaseItemCreate(product_id=3, quantity=2),
+            SalesCaseItemCreate(product_id=7, quantity=2),
+        ]
+    )
+    mock_sales_rep = MagicMock()
+    mock_sales_rep.role = UserRole.SALES_REP
+    stock_rows = [
+        MagicMock(id=3, stock_quantity=10, on_loan_quantity=0),
+        MagicMock(id=7, stock_quantity=10, on_loan_quantity=0),
+    ]
+
+    mocker.patch("app.services.sales_case_service.crud.user.get", return_value=mock_sales_rep)
+    lock = mocker.patch("app.services.sales_case_service.crud.crud_product.get_stock_rows_for_update", return_value=stock_rows)
+    mocker.patch("app.services.sales_case_service.crud.sales_case.create_case", return_value=MagicMock(id=55))
+    create_items = mocker.patch("app.services.sales_case_service.crud.sales_case.create_items_bulk")
+    apply_deltas = mocker.patch("app.services.sales_case_service.crud.crud_product.apply_stock_deltas")
+
+    # --- Act ---
+    SalesCaseService(db=mock_db).create_new_case(case_create=case_create_schema)
+
+    # --- Assert ---
+    lock.assert_called_once_with(mock_db, product_ids=[3, 7])
+    create_items.assert_called_once_with(mock_db, case_id=55, quantities={7: 3, 3: 2})
+    apply_deltas.assert_called_once_with(mock_db, loan_deltas={7: 3, 3: 2})
+    mock_db.commit.assert_called_once()
+
+
+def test_create_cases_bulk_partial_mode_rejects_cases_beyond_aggregate_stock(mocker):
+    """
+    No modo 'partial', os estojos são alocados pela ordem recebida: quando a
+    procura acumulada excede o stock disponível, apenas os estojos que já
+    não cabem são recusados, e os produtos são travados uma única vez.
+    """
+    # --- Arrange ---
+    from app.schemas import SalesCaseBulkCreate
+
+    mock_db = MagicMock()
+    bulk = SalesCaseBulkCreate(
+        mode="partial",
+        cases=[
+            SalesCaseCreate(sales_rep_id=1, loan_duration_days=30, items=[SalesCaseItemCreate(product_id=5, quantity=3)]),
+            SalesCaseCreate(sales_rep_id=2, loan_duration_days=30, items=[SalesCaseItemCreate(product_id=5, quantity=3)]),
+        ]
+    )
+    stock_row = MagicMock(id=5, stock_quantity=5, on_loan_quantity=0)
+    stock_row.name = "Colar de Ouro"
+
+    mocker.patch("app.services.sales_case_service.crud.user.get_ids_with_role", return_value={1, 2})
+    lock = mocker.patch("app.services.sales_case_service.crud.crud_product.get_stock_rows_for_update", return_value=[stock_row])
+    mocker.patch("app.services.sales_case_service.crud.sales_case.create_cases_bulk", return_value=[10])
+    create_items = mocker.patch("app.services.sales_case_service.crud.sales_case.create_items_bulk_for_cases")
+    apply_deltas = mocker.patch("app.services.sales_case_service.crud.crud_product.apply_stock_deltas")
+    get_many = mocker.patch("app.services.sales_case_service.crud.sales_case.get_many", return_value=[])
+
+    # --- Act ---
+    result = SalesCaseService(db=mock_db).create_cases_bulk(bulk_create=bulk)
+
+    # --- Assert ---
+    lock.assert_called_once_with(mock_db, product_ids=[5])
+    assert [failure.index for failure in result.failed] == [1]
+    assert "Available: 2, Requested: 3" in result.failed[0].detail
+    create_items.assert_called_once_with(mock_db, quantities_by_case={10: {5: 3}})
+    apply_deltas.assert_called_once_with(mock_db, loan_deltas={5: 3})
+    mock_db.commit.assert_called_once()
+    get_many.assert_called_once_with(mock_db, case_ids=[10])
+
+
+def _open_case(case_id: int = 9, sales_rep_id: int = 1, items=((3, 4), (7, 2))):
+    """Estojo falso ON_LOAN com itens (product_id, quantity)."""
+    from app.models import SalesCaseStatus
+
+    return MagicMock(
+        id=case_id,
+        sales_rep_id=sales_rep_id,
+        status=SalesCaseStatus.ON_LOAN,
+        items=[MagicMock(product_id=product_id, quantity=quantity) for product_id, quantity in items],
+    )
+
+
+def test_process_case_return_settles_stock_and_order_in_bulk(mocker):
+    """
+    A devolução trava os produtos numa única query, aplica as variações de
+    stock e de stock em estojos num único UPDATE e cria os itens da encomenda
+    com um INSERT em lote.
+    """
+    # --- Arrange ---
+    from decimal import Decimal
+    from app.schemas import ItemSold, SalesCaseReturnRequest, User
+
+    mock_db = MagicMock()
+    rows = [MagicMock(id=3, selling_price=Decimal("50.00")), MagicMock(id=7, selling_price=Decimal("20.00"))]
+    rows[0].name, rows[1].name = "Anel", "Brinco"
+    mocker.patch("app.services.sales_case_service.crud.sales_case.get", return_value=_open_case())
+    mark_returned = mocker.patch("app.services.sales_case_service.crud.sales_case.mark_returned", return_value=True)
+    lock = mocker.patch("app.services.sales_case_service.crud.crud_product.get_stock_rows_for_update", return_value=rows)
+    apply_deltas = mocker.patch("app.services.sales_case_service.crud.crud_product.apply_stock_deltas")
+    mocker.patch("app.services.sales_case_service.crud.crud_order.create_order", return_value=MagicMock(id=77))
+    create_items = mocker.patch("app.services.sales_case_service.crud.crud_order.create_order_items_bulk")
+    return_request = SalesCaseReturnRequest(items_sold=[
+        ItemSold(product_id=3, quantity_sold=1),
+        ItemSold(product_id=3, quantity_sold=1),
+    ])
+
+    # --- Act ---
+    report = SalesCaseService(db=mock_db).process_case_return(
+        case_id=9, return_request=return_request, current_user=User(id=1, email="ana@cida.pt", role=UserRole.SALES_REP)
+    )
+
+    # --- Assert ---
+    mark_returned.assert_called_once_with(mock_db, case_id=9)
+    lock.assert_called_once_with(mock_db, product_ids=[3, 7])
+    apply_deltas.assert_called_once_with(mock_db, stock_deltas={3: -2}, loan_deltas={3: -4, 7: -2})
+    create_items.assert_called_once_with(
+        mock_db, order_id=77, items=[{"product_id": 3, "quantity": 2, "price_at_purchase": Decimal("50.00")}]
+    )
+    assert (report.new_order_id, report.total_items_sold, report.total_value_sold) == (77, 2, 100.0)
+    mock_db.commit.assert_called_once()
+
+
+def test_process_case_return_losing_the_race_settles_nothing(mocker):
+    """Se outra devolução já marcou o estojo, nada é travado nem alterado e a transação é desfeita."""
+    # --- Arrange ---
+    from app.schemas import SalesCaseReturnRequest, User
+
+    mock_db = MagicMock()
+    mocker.patch("app.services.sales_case_service.crud.sales_case.get", return_value=_open_case())
+    mocker.patch("app.services.sales_case_service.crud.sales_case.mark_returned", return_value=False)
+    lock = mocker.patch("app.services.sales_case_service.crud.crud_product.get_stock_rows_for_update")
+    apply_deltas = mocker.patch("app.services.sales_case_service.crud.crud_product.apply_stock_deltas")
+
+    # --- Act ---
+    with pytest.raises(SalesCaseLogicError) as excinfo:
+        SalesCaseService(db=mock_db).process_case_return(
+            case_id=9,
+            return_request=SalesCaseReturnRequest(items_sold=[]),
+            current_user=User(id=1, email="ana@cida.pt", role=UserRole.SALES_REP),
+        )
+
+    # --- Assert ---
+    assert "already returned" in str(excinfo.value)
+    lock.assert_not_called()
+    apply_deltas.assert_not_called()
+    mock_db.commit.assert_not_called()
+    mock_db.rollback.assert_called_once()
@@ -0,0 +1,41 @@
+# NOVO ARQUIVO: tests/unit/test_scheduler.py
+
+from app.core.scheduler import Scheduler
+
+def test_run_once_records_result_and_timestamps():
+    """
+    Uma execução bem-sucedida deve guardar o resultado do job
+    (ex: número de linhas afetadas) e o momento da execução.
+    """
+    # --- Arrange ---
+    scheduler = Scheduler()
+    job = scheduler.register("contador", lambda: 42, interval_seconds=60)
+
+    # --- Act ---
+    job.run_once()
+
+    # --- Assert ---
+    status = scheduler.status()[0]
+    assert status["name"] == "contador"
+    assert status["run_count"] == 1
+    assert status["last_result"] == 42
+    assert status["last_error"] is None
+    assert status["last_finished_at"] >= status["last_started_at"]
+
+def test_run_once_records_error_without_raising():
+    """
+    Uma falha no job não deve derrubar a thread do agendador:
+    o erro fica registado no estado do job.
+    """
+    # --- Arrange ---
+    def failing_job():
+        raise RuntimeError("banco indisponível")
+
+    job = Scheduler().register("falha", failing_job, interval_seconds=60)
+
+    # --- Act ---
+    job.run_once()
+
+    # --- Assert ---
+    assert job.run_count == 1
+    assert job.last_error == "banco indisponível"
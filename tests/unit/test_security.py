@@ -0,0 +1,79 @@
+# NOVO ARQUIVO: tests/unit/test_security.py
+
+import asyncio
+import threading
+
+from app import security
+
+def test_verify_password_async_runs_in_hash_pool(mocker):
+    """A verificação do bcrypt deve correr numa thread da pool, fora do event loop."""
+    # --- Arrange ---
+    seen_threads = []
+    def fake_verify(plain, hashed):
+        seen_threads.append(threading.current_thread().name)
+        return plain == "segredo123"
+    mocker.patch("app.security.verify_password", side_effect=fake_verify)
+
+    # --- Act ---
+    ok = asyncio.run(security.verify_password_async("segredo123", "hash"))
+
+    # --- Assert ---
+    assert ok is True
+    assert seen_threads[0].startswith("password-hash")
+
+def test_verify_and_update_rehashes_hash_with_outdated_cost():
+    """Um hash com custo diferente do configurado é aceite e devolvido refeito com o custo atual."""
+    # --- Arrange ---
+    from passlib.hash import bcrypt
+    old_hash = bcrypt.using(rounds=4).hash("segredo123")
+
+    # --- Act ---
+    verified, new_hash = security.verify_and_update("segredo123", old_hash)
+
+    # --- Assert ---
+    assert verified is True
+    assert new_hash is not None
+    assert security.pwd_context.verify("segredo123", new_hash)
+    assert not security.pwd_context.needs_update(new_hash)
+
+def test_hash_pool_is_recreated_after_shutdown(mocker):
+    """Um segundo arranque da app no mesmo processo continua a conseguir verificar senhas."""
+    # --- Arrange ---
+    mocker.patch("app.security.verify_password", return_value=True)
+    asyncio.run(security.verify_password_async("segredo123", "hash"))
+    security.shutdown_hash_pool()
+
+    # --- Act ---
+    ok = asyncio.run(security.verify_password_async("segredo123", "hash"))
+
+    # --- Assert ---
+    assert ok is True
+
+def test_parallel_hashes_verify_and_keep_order(mocker):
+    """Os hashes feitos na pool de processos verificam contra as senhas, pela mesma ordem."""
+    # --- Arrange ---
+    mocker.patch.object(security.settings, "PASSWORD_BULK_HASH_PROCESSES", 2)
+    passwords = ["senha-ana-1", "senha-bia-1", "senha-carla-1"]
+
+    try:
+        # --- Act ---
+        hashes = asyncio.run(security.get_password_hashes_parallel_async(passwords))
+    finally:
+        security.shutdown_hash_pool()
+
+    # --- Assert ---
+    assert len(hashes) == len(passwords)
+    assert all(security.verify_password(p, h) for p, h in zip(passwords, hashes))
+    assert not security.verify_password(passwords[0], hashes[1])
+
+def test_bulk_hashes_are_sent_to_the_process_pool_in_chunks():
+    """1000 senhas com 4 processos dão 17 tarefas (não 1000), cobrindo todas as senhas pela ordem."""
+    # --- Arrange ---
+    passwords = [f"senha-{i}" for i in range(1000)]
+
+    # --- Act ---
+    chunks = security._chunk_passwords(passwords, workers=4)
+
+    # --- Assert ---
+    assert len(chunks) == 17
+    assert [p for chunk in chunks for p in chunk] == passwords
@@ -0,0 +1,40 @@
+# NOVO ARQUIVO: tests/unit/test_slow_queries.py
+
+import time
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.slow_queries import SlowQueryLog, normalize_sql
+
+def test_normalize_sql_collapses_whitespace_and_in_lists():
+    """Statements com listas IN de tamanhos diferentes devem ficar iguais depois de normalizados."""
+    # --- Act & Assert ---
+    assert normalize_sql("SELECT *\n  FROM products WHERE id IN (?, ?, ?)") == "SELECT * FROM products WHERE id IN (...)"
+    assert normalize_sql("SELECT * FROM products WHERE id IN (?, ?)") == "SELECT * FROM products WHERE id IN (...)"
+
+def test_slow_statement_is_recorded_with_plan(mocker, tmp_path):
+    """Uma query acima do limiar entra no buffer e recebe o plano (EXPLAIN QUERY PLAN) em background."""
+    # --- Arrange ---
+    mocker.patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    mocker.patch.object(settings, "SLOW_QUERY_EXPLAIN", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}") # Ficheiro: o EXPLAIN usa outra conexão
+    log = SlowQueryLog(max_entries=2)
+    log.install(engine)
+
+    # --- Act ---
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        conn.commit()
+        conn.execute(text("SELECT id FROM t WHERE id = :id"), {"id": 1})
+    deadline = time.monotonic() + 5
+    while log.entries()[0]["plan"] is None and log.entries()[0]["explain_error"] is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # --- Assert ---
+    entries = log.entries()
+    assert len(entries) <= 2 # Buffer circular limitado a max_entries
+    latest = entries[0]
+    assert latest["statement"] == "SELECT id FROM t WHERE id = ?"
+    assert latest["route"] is None
+    assert latest["plan"] and "t" in latest["plan"][0]
+    log.shutdown()
@@ -0,0 +1,25 @@
+# NOVO ARQUIVO: tests/unit/test_sync_service.py
+
+import pytest
+from datetime import datetime, timezone
+
+from app.services.sync_service import SyncService, SyncTokenError
+
+def test_sync_token_round_trip():
+    """O token emitido deve devolver exatamente o instante codificado."""
+    # --- Arrange ---
+    moment = datetime(2026, 10, 18, 14, 30, 5, 123456, tzinfo=timezone.utc)
+
+    # --- Act ---
+    token = SyncService._encode_token(moment)
+
+    # --- Assert ---
+    assert "=" not in token
+    assert SyncService._decode_token(token) == moment
+
+@pytest.mark.parametrize("token", ["nao-e-um-token", "e30", "eyJ0cyI6IDF9"])
+def test_invalid_sync_token_raises(token):
+    """Tokens corrompidos, sem `ts` ou com `ts` inválido devem gerar SyncTokenError."""
+    # --- Act & Assert ---
+    with pytest.raises(SyncTokenError):
+        SyncService._decode_token(token)
@@ -0,0 +1,80 @@
+# NOVO ARQUIVO: tests/unit/test_user_service.py
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+
+from app.models import UserRole
+from app.schemas import UserBulkCreate, UserCreate
+from app.services.user_service import create_users_bulk_async
+
+def test_create_users_bulk_skips_existing_and_repeated_emails(mocker):
+    """
+    Emails já registados (uma única query IN) e repetidos no pedido são
+    ignorados; os restantes são criados num único INSERT em lote.
+    """
+    # --- Arrange ---
+    sync_session = MagicMock()
+    db = MagicMock()
+    db.run_sync = AsyncMock(side_effect=lambda fn: fn(sync_session))
+    db.rollback = AsyncMock()
+    get_existing = mocker.patch("app.crud.user.get_existing_emails", return_value={"old@cida.pt"})
+    mocker.patch(
+        "app.security.get_password_hashes_parallel_async",
+        new=AsyncMock(side_effect=lambda passwords: [f"hash:{p}" for p in passwords]),
+    )
+    create_bulk = mocker.patch(
+        "app.crud.user.create_bulk",
+        side_effect=lambda db, rows: [
+            SimpleNamespace(id=i + 1, email=row["email"], role=row["role"]) for i, row in enumerate(rows)
+        ],
+    )
+    bulk = UserBulkCreate(users=[
+        UserCreate(email="ana@cida.pt", password="senha-ana-1", role=UserRole.SALES_REP),
+        UserCreate(email="old@cida.pt", password="senha-old-1"),
+        UserCreate(email="ana@cida.pt", password="senha-ana-2"),
+        UserCreate(email="bia@cida.pt", password="senha-bia-1"),
+    ])
+
+    # --- Act ---
+    result = asyncio.run(create_users_bulk_async(db, bulk_create=bulk))
+
+    # --- Assert ---
+    get_existing.assert_called_once_with(sync_session, emails=["ana@cida.pt", "bia@cida.pt", "old@cida.pt"])
+    rows = create_bulk.call_args.kwargs["rows"]
+    assert [(r["email"], r["hashed_password"]) for r in rows] == [
+        ("ana@cida.pt", "hash:senha-ana-1"), ("bia@cida.pt", "hash:senha-bia-1"),
+    ]
+    assert [u.email for u in result.created] == ["ana@cida.pt", "bia@cida.pt"]
+    assert [(s.index, s.email) for s in result.skipped] == [(1, "old@cida.pt"), (2, "ana@cida.pt")]
+    sync_session.commit.assert_called_once()
+
+def test_create_users_bulk_async_hashes_outside_the_session(mocker):
+    """O caminho assíncrono separa, calcula os hashes (aguardados) e insere numa segunda chamada à sessão."""
+    # --- Arrange ---
+    sync_session = MagicMock()
+    db = MagicMock()
+    db.run_sync = AsyncMock(side_effect=lambda fn: fn(sync_session))
+    db.rollback = AsyncMock()
+    mocker.patch("app.crud.user.get_existing_emails", return_value=set())
+    hash_async = mocker.patch(
+        "app.security.get_password_hashes_parallel_async",
+        new=AsyncMock(side_effect=lambda passwords: [f"hash:{p}" for p in passwords]),
+    )
+    create_bulk = mocker.patch(
+        "app.crud.user.create_bulk",
+        side_effect=lambda db, rows: [
+            SimpleNamespace(id=i + 1, email=row["email"], role=row["role"]) for i, row in enumerate(rows)
+        ],
+    )
+    bulk = UserBulkCreate(users=[UserCreate(email="ana@cida.pt", password="senha-ana-1")])
+
+    # --- Act ---
+    result = asyncio.run(create_users_bulk_async(db, bulk_create=bulk))
+
+    # --- Assert ---
+    hash_async.assert_awaited_once_with(["senha-ana-1"])
+    db.rollback.assert_awaited_once()
+    assert create_bulk.call_args.kwargs["rows"][0]["hashed_password"] == "hash:senha-ana-1"
+    assert [u.email for u in result.created] == ["ana@cida.pt"]
+    sync_session.commit.assert_called_once()
@@ -0,0 +1,59 @@
+# NOVO ARQUIVO: tests/unit/test_user_snapshot_cache.py
+
+import pytest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+
+from app.crud.crud_user import user, user_snapshot_cache
+from app.models import UserRole
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    user_snapshot_cache.clear()
+    yield
+    user_snapshot_cache.clear()
+
+def _db_returning(row):
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.first.return_value = row
+    return mock_db
+
+def test_snapshot_is_served_from_cache_after_first_lookup():
+    """A segunda autenticação com o mesmo email não deve consultar o banco."""
+    # --- Arrange ---
+    mock_db = _db_returning(SimpleNamespace(id=7, email="ana@cida.pt", role=UserRole.SALES_REP))
+
+    # --- Act ---
+    first = user.get_snapshot_by_email(mock_db, email="ana@cida.pt")
+    second = user.get_snapshot_by_email(mock_db, email="ana@cida.pt")
+
+    # --- Assert ---
+    assert (second.id, second.role) == (7, UserRole.SALES_REP)
+    assert second is first
+    assert mock_db.query.call_count == 1
+
+def test_unknown_email_is_not_cached():
+    """Emails sem utilizador não ficam em cache (um registo posterior deve ser visto)."""
+    # --- Arrange ---
+    mock_db = _db_returning(None)
+
+    # --- Act ---
+    user.get_snapshot_by_email(mock_db, email="novo@cida.pt")
+    user.get_snapshot_by_email(mock_db, email="novo@cida.pt")
+
+    # --- Assert ---
+    assert mock_db.query.call_count == 2
+
+def test_update_invalidates_cached_snapshot(mocker):
+    """Alterar o utilizador (ex: o role) deve invalidar o snapshot em cache."""
+    # --- Arrange ---
+    mock_db = _db_returning(SimpleNamespace(id=7, email="ana@cida.pt", role=UserRole.CUSTOMER))
+    user.get_snapshot_by_email(mock_db, email="ana@cida.pt")
+    db_obj = SimpleNamespace(id=7, email="ana@cida.pt", role=UserRole.CUSTOMER)
+    mocker.patch("app.crud.base.CRUDBase.update", return_value=db_obj)
+
+    # --- Act ---
+    user.update(mock_db, db_obj=db_obj, obj_in={"role": UserRole.SALES_REP})
+
+    # --- Assert ---
+    assert user_snapshot_cache.get("ana@cida.pt") is None
@@ -0,0 +1,55 @@
+# NOVO ARQUIVO: tests/utils/sales_case.py
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.models import SalesCaseStatus, UserRole
+
+DEFAULT_PASSWORD = "segredo-123"
+
+def create_user_with_role(db: Session, *, email: str, role: UserRole) -> models.User:
+    """Cria um utilizador com o `role` indicado e a senha DEFAULT_PASSWORD."""
+    return crud.user.create(db=db, obj_in=schemas.UserCreate(email=email, password=DEFAULT_PASSWORD, role=role))
+
+def login_headers(client: TestClient, *, email: str) -> dict[str, str]:
+    """Faz login em /token e devolve os headers Bearer."""
+    response = client.post("/token", data={"username": email, "password": DEFAULT_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def create_product(db: Session, *, name: str, selling_price: str = "100.00", stock_quantity: int = 50) -> models.Product:
+    """Cria um produto com preços fixos (sem dados aleatórios)."""
+    return crud.crud_product.create_product(
+        db,
+        schemas.ProductCreate(
+            name=name, selling_price=Decimal(selling_price), cost_price=Decimal("10.00"), stock_quantity=stock_quantity
+        ),
+    )
+
+def create_case(
+    db: Session,
+    *,
+    sales_rep_id: int,
+    status: SalesCaseStatus = SalesCaseStatus.ON_LOAN,
+    return_by_date: datetime | None = None,
+    items: dict[int, int] | None = None,
+) -> models.SalesCase:
+    """
+    Cria um estojo diretamente no banco (sem passar pelo serviço), com os
+    itens {product_id: quantidade}. Não altera o stock dos produtos.
+    """
+    db_case = models.SalesCase(
+        sales_rep_id=sales_rep_id,
+        status=status,
+        return_by_date=return_by_date or datetime.utcnow() + timedelta(days=30),
+    )
+    db.add(db_case)
+    db.flush()
+    for product_id, quantity in (items or {}).items():
+        db.add(models.SalesCaseItem(case_id=db_case.id, product_id=product_id, quantity=quantity))
+    db.commit()
+    return db_case